@@ -66,6 +66,14 @@ def benchmark_file(filepath):
         print(f"Conversion failed: {e}")
         return
 
+    try:
+        start_native = time.perf_counter()
+        _ = pylite3.from_json(json_bytes)
+        native_time = (time.perf_counter() - start_native) * 1e3
+        print(f"Native from_json:    {native_time:.2f} ms")
+    except (ValueError, OverflowError) as e:
+        print(f"Native from_json failed: {e}")
+
     # 3. Benchmark Comparison Libraries
     
     # standard json
@@ -1,15 +1,34 @@
-# cython: language_level=3
-from libc.stdint cimport uint8_t, int64_t, uint32_t, uint64_t
-from libc.string cimport memcpy, strlen
+# cython: language_level=3, freethreading_compatible=True
+cimport cython
+from libc.stdint cimport uint8_t, int64_t, uint32_t, uint64_t, uintptr_t, INT64_MAX, INT64_MIN
+from libc.string cimport memcpy, memcmp, memset, strlen
+from libc.stdio cimport snprintf
+from libc.math cimport isnan, isinf, fabs, INFINITY, NAN
 from libc.errno cimport errno, ENOBUFS
-from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, Py_buffer
+from cpython.buffer cimport PyObject_GetBuffer, PyObject_CheckBuffer, PyBuffer_Release, Py_buffer, PyBUF_SIMPLE
 from cpython.object cimport PyObject
 from cpython.bytes cimport PyBytes_FromStringAndSize
+from cpython.unicode cimport PyUnicode_AsUTF8AndSize
+from cpython.bytearray cimport PyByteArray_AS_STRING, PyByteArray_Resize
+from cpython.mem cimport PyMem_Malloc, PyMem_Realloc, PyMem_Free
+from cpython cimport array as carray
+from cpython.conversion cimport PyOS_double_to_string, PyOS_string_to_double, Py_DTSF_ADD_DOT_0
 
+cdef extern from "Python.h":
+    const Py_ssize_t PY_SSIZE_T_MAX
+
+import copy
+import dataclasses
+import enum
 import json
+import os
+import pickle
 import collections.abc
+import concurrent.futures
+import types
+import typing
 
-cdef extern from "lite3.h":
+cdef extern from "lite3.h" nogil:
     ctypedef unsigned char uint8_t
     
     # Use 'enum lite3_type' effectively by tricking Cython to use the right name or just 'enum'
@@ -75,7 +94,7 @@ cdef extern from "lite3.h":
     int lite3_set_f64(unsigned char *buf, size_t *inout_buflen, size_t ofs, size_t bufsz, const char *key, double value)
     int lite3_set_bytes(unsigned char *buf, size_t *inout_buflen, size_t ofs, size_t bufsz, const char *key, const unsigned char *bytes, size_t bytes_len)
     int lite3_set_str(unsigned char *buf, size_t *inout_buflen, size_t ofs, size_t bufsz, const char *key, const char *str)
-    # Note: Using set_str_n is more efficient if length is known, but requires exposing it.
+    int lite3_set_str_n(unsigned char *buf, size_t *inout_buflen, size_t ofs, size_t bufsz, const char *key, const char *str, size_t str_len)
     
     int lite3_set_obj(unsigned char *buf, size_t *inout_buflen, size_t ofs, size_t bufsz, const char *key, size_t *out_ofs)
     int lite3_set_arr(unsigned char *buf, size_t *inout_buflen, size_t ofs, size_t bufsz, const char *key, size_t *out_ofs)
@@ -87,6 +106,7 @@ cdef extern from "lite3.h":
     int lite3_arr_append_f64(unsigned char *buf, size_t *inout_buflen, size_t ofs, size_t bufsz, double value)
     int lite3_arr_append_bytes(unsigned char *buf, size_t *inout_buflen, size_t ofs, size_t bufsz, const unsigned char *bytes, size_t bytes_len)
     int lite3_arr_append_str(unsigned char *buf, size_t *inout_buflen, size_t ofs, size_t bufsz, const char *str)
+    int lite3_arr_append_str_n(unsigned char *buf, size_t *inout_buflen, size_t ofs, size_t bufsz, const char *str, size_t str_len)
     
     int lite3_arr_append_obj(unsigned char *buf, size_t *inout_buflen, size_t ofs, size_t bufsz, size_t *out_ofs)
     int lite3_arr_append_arr(unsigned char *buf, size_t *inout_buflen, size_t ofs, size_t bufsz, size_t *out_ofs)
@@ -103,6 +123,12 @@ cdef extern from "lite3.h":
     int _lite3_verify_obj_get(const unsigned char *buf, size_t buflen, size_t ofs)
     int _lite3_verify_arr_get(const unsigned char *buf, size_t buflen, size_t ofs)
 
+    # Node geometry, used by the deep validator and the trusted accessors.
+    enum:
+        LITE3_NODE_SIZE
+        LITE3_NODE_SIZE_SHIFT
+        LITE3_TREE_HEIGHT_MAX
+
     # Value accessors (static inline in header; use memcpy internally for alignment safety)
     bint lite3_val_bool(lite3_val *val)
     int64_t lite3_val_i64(lite3_val *val)
@@ -123,6 +149,104 @@ cdef inline size_t _iter_key_len_excluding_nul(lite3_str key):
     return key_size_including_nul - 1
 
 
+# Encoded probe for native array membership/index/count. Equality follows Python:
+# bool, int and float compare numerically with each other; str and bytes never
+# match each other. Values that have no lite3 scalar form use `_PROBE_PYTHON`.
+cdef enum:
+    _PROBE_PYTHON = 0
+    _PROBE_NONE = 1
+    _PROBE_INT = 2
+    _PROBE_FLOAT = 3
+    _PROBE_STR = 4
+    _PROBE_BYTES = 5
+    _PROBE_NEVER = 6
+
+
+cdef struct _Probe:
+    int kind
+    int64_t i
+    double d
+    const char *s
+    size_t n
+
+
+cdef object _make_probe(_Probe *p, object value):
+    """Fill `p` from `value`; returns the object that owns `p.s` (keep it alive while probing)."""
+    cdef bytes encoded
+    cdef type t = type(value)
+    p.kind = _PROBE_PYTHON
+    if value is None:
+        p.kind = _PROBE_NONE
+    elif t is bool or t is int:
+        try:
+            p.i = <int64_t>value
+        except OverflowError:
+            return None
+        p.kind = _PROBE_INT
+    elif t is float:
+        p.d = <double>value
+        p.kind = _PROBE_NEVER if isnan(p.d) else _PROBE_FLOAT
+    elif t is str:
+        try:
+            encoded = (<str>value).encode("utf-8")
+        except UnicodeEncodeError:
+            # Lone surrogates cannot appear in a decoded lite3 string.
+            p.kind = _PROBE_NEVER
+            return None
+        p.s = encoded
+        p.n = len(encoded)
+        p.kind = _PROBE_STR
+        return encoded
+    elif t is bytes:
+        p.s = <bytes>value
+        p.n = len(<bytes>value)
+        p.kind = _PROBE_BYTES
+        return value
+    return None
+
+
+cdef inline bint _i64_eq_f64(int64_t i, double d) noexcept nogil:
+    # Exact int/float equality, like Python's int.__eq__(float).
+    if not (d >= -9223372036854775808.0 and d < 9223372036854775808.0):
+        return False
+    return <double>(<int64_t>d) == d and <int64_t>d == i
+
+
+cdef bint _probe_match(const _Probe *p, lite3_val *val) noexcept nogil:
+    cdef lite3_type t = <lite3_type>val.type
+    cdef size_t n = 0
+    cdef const char *s
+    if p.kind == _PROBE_NONE:
+        return t == LITE3_TYPE_NULL
+    if p.kind == _PROBE_INT:
+        if t == LITE3_TYPE_I64:
+            return lite3_val_i64(val) == p.i
+        if t == LITE3_TYPE_BOOL:
+            return <int64_t>lite3_val_bool(val) == p.i
+        if t == LITE3_TYPE_F64:
+            return _i64_eq_f64(p.i, lite3_val_f64(val))
+        return False
+    if p.kind == _PROBE_FLOAT:
+        if t == LITE3_TYPE_F64:
+            return lite3_val_f64(val) == p.d
+        if t == LITE3_TYPE_I64:
+            return _i64_eq_f64(lite3_val_i64(val), p.d)
+        if t == LITE3_TYPE_BOOL:
+            return (1.0 if lite3_val_bool(val) else 0.0) == p.d
+        return False
+    if p.kind == _PROBE_STR:
+        if t != LITE3_TYPE_STRING:
+            return False
+        s = lite3_val_str_n(val, &n)
+        return s != NULL and n == p.n and memcmp(s, p.s, n) == 0
+    if p.kind == _PROBE_BYTES:
+        if t != LITE3_TYPE_BYTES:
+            return False
+        s = <const char *>lite3_val_bytes(val, &n)
+        return s != NULL and n == p.n and memcmp(s, p.s, n) == 0
+    return False
+
+
 cdef inline void _raise_lite3_write_error(int ret, object msg) except *:
     if ret >= 0:
         return
@@ -131,6 +255,587 @@ cdef inline void _raise_lite3_write_error(int ret, object msg) except *:
     raise RuntimeError(msg)
 
 
+# Guard for the C-level recursive walkers; lite3 allows arbitrarily deep nesting
+# but we don't want a hostile buffer to blow the C stack.
+cdef enum:
+    _MAX_DEPTH = 1024
+
+
+# ---------------------------------------------------------------------------
+# Trusted node access. Mirrors `struct node` in vendor/lite3/src/lite3.c for the
+# default LITE3_NODE_SIZE of 96 (7 keys per node). Only used on buffers that passed
+# `_verify_deep`, which checks every node and entry these helpers can reach.
+# ---------------------------------------------------------------------------
+cdef enum:
+    _NODE_KEYS = 7
+    _NODE_KEY_COUNT_MASK = 0x3F
+    _NODE_TYPE_MASK = 0xFF
+    _KEY_TAG_SIZE_MASK = 0x03
+    _KEY_TAG_KEY_SIZE_SHIFT = 2
+
+
+cdef struct _Node:
+    uint32_t gen_type
+    uint32_t hashes[_NODE_KEYS]
+    uint32_t size_kc
+    uint32_t kv_ofs[_NODE_KEYS]
+    uint32_t child_ofs[_NODE_KEYS + 1]
+
+
+cdef struct _NodeIter:
+    uint32_t node_ofs[LITE3_TREE_HEIGHT_MAX + 1]
+    uint8_t node_i[LITE3_TREE_HEIGHT_MAX + 1]
+    int depth
+
+
+cdef inline uint32_t _trusted_count(const uint8_t *buf, size_t ofs) noexcept nogil:
+    return (<const _Node *>(buf + ofs)).size_kc >> LITE3_NODE_SIZE_SHIFT
+
+
+cdef inline size_t _trusted_key(const uint8_t *buf, size_t ofs, const char **out_key,
+                                size_t *out_len) noexcept nogil:
+    # Decode the key entry at `ofs`; returns the offset of the value that follows.
+    cdef size_t tag_size = (buf[ofs] & _KEY_TAG_SIZE_MASK) + 1
+    cdef size_t key_size = 0
+    memcpy(&key_size, buf + ofs, tag_size)
+    key_size >>= _KEY_TAG_KEY_SIZE_SHIFT
+    out_key[0] = <const char *>(buf + ofs + tag_size)
+    out_len[0] = key_size - 1  # stored size includes the NUL terminator
+    return ofs + tag_size + key_size
+
+
+cdef inline lite3_val *_trusted_lookup(const uint8_t *buf, size_t ofs, uint32_t hash,
+                                       const char *key, size_t key_len) noexcept nogil:
+    """
+    B-tree lookup without lite3's per-call checks. `key` is NULL for array indexes
+    (where the hash is the index). NULL if absent, including hash collisions, which
+    lite3 reports as missing as well.
+    """
+    cdef const _Node *node = <const _Node *>(buf + ofs)
+    cdef uint32_t kc, i
+    cdef size_t entry
+    cdef const char *stored
+    cdef size_t stored_len
+    while True:
+        kc = node.size_kc & _NODE_KEY_COUNT_MASK
+        i = 0
+        while i < kc and node.hashes[i] < hash:
+            i += 1
+        if i < kc and node.hashes[i] == hash:
+            entry = node.kv_ofs[i]
+            if key != NULL:
+                entry = _trusted_key(buf, entry, &stored, &stored_len)
+                if stored_len != key_len or memcmp(stored, key, key_len) != 0:
+                    return NULL
+            return <lite3_val *>(buf + entry)
+        if node.child_ofs[0] == 0:
+            return NULL
+        node = <const _Node *>(buf + node.child_ofs[i])
+
+
+cdef inline void _trusted_iter_init(const uint8_t *buf, size_t ofs, _NodeIter *it) noexcept nogil:
+    cdef const _Node *node = <const _Node *>(buf + ofs)
+    it.depth = 0
+    it.node_ofs[0] = <uint32_t>ofs
+    it.node_i[0] = 0
+    while node.child_ofs[0]:
+        it.depth += 1
+        it.node_ofs[it.depth] = node.child_ofs[0]
+        it.node_i[it.depth] = 0
+        node = <const _Node *>(buf + node.child_ofs[0])
+
+
+cdef inline size_t _trusted_iter_next(const uint8_t *buf, _NodeIter *it) noexcept nogil:
+    """
+    In-order step over the entries of a container, same order as `lite3_iter_next`.
+    Returns the entry offset (key entry for objects), or 0 when done; offset 0 is
+    always the root node, never an entry.
+    """
+    cdef const _Node *node = <const _Node *>(buf + it.node_ofs[it.depth])
+    cdef size_t entry
+    if it.depth == 0 and it.node_i[0] == (node.size_kc & _NODE_KEY_COUNT_MASK):
+        return 0
+    entry = node.kv_ofs[it.node_i[it.depth]]
+    it.node_i[it.depth] += 1
+    while node.child_ofs[it.node_i[it.depth]]:
+        it.depth += 1
+        it.node_ofs[it.depth] = node.child_ofs[it.node_i[it.depth - 1]]
+        it.node_i[it.depth] = 0
+        node = <const _Node *>(buf + it.node_ofs[it.depth])
+    while it.depth > 0 and it.node_i[it.depth] == (node.size_kc & _NODE_KEY_COUNT_MASK):
+        it.depth -= 1
+        node = <const _Node *>(buf + it.node_ofs[it.depth])
+    return entry
+
+
+# ---------------------------------------------------------------------------
+# Growable output buffer used by the native JSON encoder.
+# ---------------------------------------------------------------------------
+
+cdef struct _OutBuf:
+    char *data
+    size_t len
+    size_t cap
+
+
+cdef int _outbuf_init(_OutBuf *ob, size_t cap) except -1:
+    ob.data = <char *>PyMem_Malloc(cap)
+    if ob.data == NULL:
+        raise MemoryError()
+    ob.len = 0
+    ob.cap = cap
+    return 0
+
+
+cdef inline int _outbuf_reserve(_OutBuf *ob, size_t extra) except -1:
+    cdef size_t new_cap
+    cdef char *new_data
+    if ob.len + extra <= ob.cap:
+        return 0
+    new_cap = ob.cap * 2
+    while new_cap < ob.len + extra:
+        new_cap *= 2
+    new_data = <char *>PyMem_Realloc(ob.data, new_cap)
+    if new_data == NULL:
+        raise MemoryError()
+    ob.data = new_data
+    ob.cap = new_cap
+    return 0
+
+
+cdef inline int _outbuf_write(_OutBuf *ob, const char *s, size_t n) except -1:
+    _outbuf_reserve(ob, n)
+    memcpy(ob.data + ob.len, s, n)
+    ob.len += n
+    return 0
+
+
+cdef inline int _outbuf_putc(_OutBuf *ob, char c) except -1:
+    _outbuf_reserve(ob, 1)
+    ob.data[ob.len] = c
+    ob.len += 1
+    return 0
+
+
+cdef const char *_HEX = b"0123456789abcdef"
+cdef const char *_B64 = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+
+cdef inline int _json_write_u_escape(_OutBuf *ob, uint32_t cp) except -1:
+    cdef char esc[6]
+    esc[0] = b'\\'
+    esc[1] = b'u'
+    esc[2] = _HEX[(cp >> 12) & 0xF]
+    esc[3] = _HEX[(cp >> 8) & 0xF]
+    esc[4] = _HEX[(cp >> 4) & 0xF]
+    esc[5] = _HEX[cp & 0xF]
+    return _outbuf_write(ob, esc, 6)
+
+
+cdef int _json_write_str(_OutBuf *ob, const char *s, size_t n, bint ensure_ascii) except -1:
+    """Write a JSON string literal for the UTF-8 text `s[:n]` (escaped like `json.dumps`)."""
+    cdef size_t i = 0
+    cdef size_t run = 0
+    cdef unsigned char c
+    cdef uint32_t cp
+    cdef size_t extra
+
+    _outbuf_reserve(ob, n + 2)
+    _outbuf_putc(ob, b'"')
+    while i < n:
+        c = <unsigned char>s[i]
+        if c >= 0x20 and c != b'"' and c != b'\\' and (c < 0x80 or not ensure_ascii):
+            i += 1
+            continue
+        if i > run:
+            _outbuf_write(ob, s + run, i - run)
+        if c == b'"':
+            _outbuf_write(ob, b'\\"', 2)
+        elif c == b'\\':
+            _outbuf_write(ob, b'\\\\', 2)
+        elif c == b'\n':
+            _outbuf_write(ob, b'\\n', 2)
+        elif c == b'\r':
+            _outbuf_write(ob, b'\\r', 2)
+        elif c == b'\t':
+            _outbuf_write(ob, b'\\t', 2)
+        elif c == 0x08:
+            _outbuf_write(ob, b'\\b', 2)
+        elif c == 0x0C:
+            _outbuf_write(ob, b'\\f', 2)
+        elif c < 0x20:
+            _json_write_u_escape(ob, c)
+        else:
+            # ensure_ascii: decode one UTF-8 sequence and emit \uXXXX (surrogate pair if needed).
+            if c >= 0xF0 and i + 3 < n:
+                cp = ((c & 0x07) << 18) | ((<unsigned char>s[i + 1] & 0x3F) << 12) | ((<unsigned char>s[i + 2] & 0x3F) << 6) | (<unsigned char>s[i + 3] & 0x3F)
+                extra = 3
+            elif c >= 0xE0 and i + 2 < n:
+                cp = ((c & 0x0F) << 12) | ((<unsigned char>s[i + 1] & 0x3F) << 6) | (<unsigned char>s[i + 2] & 0x3F)
+                extra = 2
+            elif c >= 0xC0 and i + 1 < n:
+                cp = ((c & 0x1F) << 6) | (<unsigned char>s[i + 1] & 0x3F)
+                extra = 1
+            else:
+                raise ValueError("Invalid UTF-8 in lite3 string")
+            if cp >= 0x10000:
+                cp -= 0x10000
+                _json_write_u_escape(ob, 0xD800 | (cp >> 10))
+                _json_write_u_escape(ob, 0xDC00 | (cp & 0x3FF))
+            else:
+                _json_write_u_escape(ob, cp)
+            i += extra
+        i += 1
+        run = i
+    if i > run:
+        _outbuf_write(ob, s + run, i - run)
+    _outbuf_putc(ob, b'"')
+    return 0
+
+
+cdef int _json_write_base64(_OutBuf *ob, const unsigned char *b, size_t n) except -1:
+    """Bytes have no JSON type; like lite3's own JSON encoder, emit them as a base64 string."""
+    cdef size_t i = 0
+    cdef uint32_t v
+    cdef char *out
+    _outbuf_reserve(ob, ((n + 2) // 3) * 4 + 2)
+    out = ob.data + ob.len
+    out[0] = b'"'
+    out += 1
+    while i + 2 < n:
+        v = (<uint32_t>b[i] << 16) | (<uint32_t>b[i + 1] << 8) | b[i + 2]
+        out[0] = _B64[(v >> 18) & 0x3F]
+        out[1] = _B64[(v >> 12) & 0x3F]
+        out[2] = _B64[(v >> 6) & 0x3F]
+        out[3] = _B64[v & 0x3F]
+        out += 4
+        i += 3
+    if i < n:
+        v = <uint32_t>b[i] << 16
+        if i + 1 < n:
+            v |= <uint32_t>b[i + 1] << 8
+        out[0] = _B64[(v >> 18) & 0x3F]
+        out[1] = _B64[(v >> 12) & 0x3F]
+        out[2] = _B64[(v >> 6) & 0x3F] if i + 1 < n else b'='
+        out[3] = b'='
+        out += 4
+    out[0] = b'"'
+    out += 1
+    ob.len = <size_t>(out - ob.data)
+    return 0
+
+
+cdef int _json_write_f64(_OutBuf *ob, double d, bint allow_nan) except -1:
+    cdef char *repr_ptr
+    if isnan(d) or isinf(d):
+        if not allow_nan:
+            raise ValueError("Out of range float values are not JSON compliant")
+        if isnan(d):
+            return _outbuf_write(ob, b"NaN", 3)
+        if d > 0:
+            return _outbuf_write(ob, b"Infinity", 8)
+        return _outbuf_write(ob, b"-Infinity", 9)
+    # Same shortest round-trip repr that `json.dumps` uses (float.__repr__).
+    repr_ptr = PyOS_double_to_string(d, b'r', 0, Py_DTSF_ADD_DOT_0, NULL)
+    try:
+        _outbuf_write(ob, repr_ptr, strlen(repr_ptr))
+    finally:
+        PyMem_Free(repr_ptr)
+    return 0
+
+
+cdef int _json_write_val(_OutBuf *ob, const uint8_t *buf, size_t buflen, size_t ofs,
+                         bint ensure_ascii, bint allow_nan, int depth) except -1:
+    """Encode the lite3 value at `buf + ofs` as JSON, walking containers with lite3 iterators."""
+    cdef lite3_val *val = <lite3_val *>(buf + ofs)
+    cdef lite3_type t = <lite3_type>val.type
+    cdef lite3_iter it
+    cdef lite3_str key
+    cdef size_t val_ofs
+    cdef size_t out_len = 0
+    cdef const char *s_ptr
+    cdef const unsigned char *b_ptr
+    cdef char num[32]
+    cdef int ret
+    cdef int n
+    cdef bint first = True
+    cdef bint is_object
+
+    if t == LITE3_TYPE_NULL:
+        return _outbuf_write(ob, b"null", 4)
+    elif t == LITE3_TYPE_BOOL:
+        if lite3_val_bool(val):
+            return _outbuf_write(ob, b"true", 4)
+        return _outbuf_write(ob, b"false", 5)
+    elif t == LITE3_TYPE_I64:
+        n = snprintf(num, sizeof(num), b"%lld", <long long>lite3_val_i64(val))
+        return _outbuf_write(ob, num, <size_t>n)
+    elif t == LITE3_TYPE_F64:
+        return _json_write_f64(ob, lite3_val_f64(val), allow_nan)
+    elif t == LITE3_TYPE_STRING:
+        s_ptr = lite3_val_str_n(val, &out_len)
+        return _json_write_str(ob, s_ptr, out_len, ensure_ascii)
+    elif t == LITE3_TYPE_BYTES:
+        b_ptr = lite3_val_bytes(val, &out_len)
+        return _json_write_base64(ob, b_ptr, out_len)
+    elif t != LITE3_TYPE_OBJECT and t != LITE3_TYPE_ARRAY:
+        raise ValueError(f"Unknown type: {t}")
+
+    if depth > _MAX_DEPTH:
+        raise ValueError("lite3 nesting too deep")
+    if lite3_iter_create(buf, buflen, ofs, &it) < 0:
+        raise ValueError("Invalid lite3 container")
+
+    is_object = t == LITE3_TYPE_OBJECT
+    _outbuf_putc(ob, b'{' if is_object else b'[')
+    while True:
+        ret = lite3_iter_next(buf, buflen, &it, &key if is_object else NULL, &val_ofs)
+        if ret == 0:
+            break
+        if ret < 0:
+            raise ValueError("Invalid lite3 data")
+        if not first:
+            _outbuf_putc(ob, b',')
+        first = False
+        if is_object:
+            if key.ptr == NULL:
+                raise RuntimeError("Iterator returned NULL key pointer")
+            _json_write_str(ob, key.ptr, _iter_key_len_excluding_nul(key), ensure_ascii)
+            _outbuf_putc(ob, b':')
+        _json_write_val(ob, buf, buflen, val_ofs, ensure_ascii, allow_nan, depth + 1)
+    return _outbuf_putc(ob, b'}' if is_object else b']')
+
+
+# Structural equality and fingerprints. Both follow `to_python()` equality: object
+# key order is ignored and bool/int/float compare (and hash) by numeric value.
+cdef uint64_t _FP_NULL = 0x9e3779b97f4a7c15
+cdef uint64_t _FP_NUM = 0x632be59bd9b4e019
+cdef uint64_t _FP_FLOAT = 0x8cb92ba72f3d8dd7
+cdef uint64_t _FP_STR = 0x2545f4914f6cdd1d
+cdef uint64_t _FP_BYTES = 0xd6e8feb86659fd93
+cdef uint64_t _FP_OBJECT = 0xa0761d6478bd642f
+cdef uint64_t _FP_ARRAY = 0xe7037ed1a0b428db
+
+
+cdef inline uint64_t _mix64(uint64_t x) noexcept nogil:
+    # splitmix64 finalizer
+    x ^= x >> 30
+    x *= <uint64_t>0xbf58476d1ce4e5b9
+    x ^= x >> 27
+    x *= <uint64_t>0x94d049bb133111eb
+    x ^= x >> 31
+    return x
+
+
+cdef inline uint64_t _fnv1a(const uint8_t *p, size_t n, uint64_t h) noexcept nogil:
+    cdef size_t i
+    h ^= <uint64_t>0xcbf29ce484222325
+    for i in range(n):
+        h = (h ^ p[i]) * <uint64_t>0x100000001b3
+    return _mix64(h ^ n)
+
+
+cdef inline bint _is_numeric(lite3_type t) noexcept nogil:
+    return t == LITE3_TYPE_BOOL or t == LITE3_TYPE_I64 or t == LITE3_TYPE_F64
+
+
+cdef inline bint _numeric_as_i64(lite3_val *val, int64_t *out) noexcept nogil:
+    """Store the value as int64 if it is integral (bool/int or an integral float)."""
+    cdef lite3_type t = <lite3_type>val.type
+    cdef double d
+    if t == LITE3_TYPE_BOOL:
+        out[0] = lite3_val_bool(val)
+        return True
+    if t == LITE3_TYPE_I64:
+        out[0] = lite3_val_i64(val)
+        return True
+    d = lite3_val_f64(val)
+    if d >= -9223372036854775808.0 and d < 9223372036854775808.0 and <double>(<int64_t>d) == d:
+        out[0] = <int64_t>d
+        return True
+    return False
+
+
+cdef int _values_equal(const uint8_t *a, size_t alen, size_t aofs,
+                       const uint8_t *b, size_t blen, size_t bofs, int depth) except -1:
+    cdef lite3_val *va = <lite3_val *>(a + aofs)
+    cdef lite3_val *vb = <lite3_val *>(b + bofs)
+    cdef lite3_type ta = <lite3_type>va.type
+    cdef lite3_type tb = <lite3_type>vb.type
+    cdef int64_t ia, ib
+    cdef bint a_int, b_int
+    cdef const char *sa
+    cdef const char *sb
+    cdef size_t na = 0
+    cdef size_t nb = 0
+    cdef uint32_t ca = 0
+    cdef uint32_t cb = 0
+    cdef lite3_iter ita, itb
+    cdef lite3_str key
+    cdef size_t oa, ob
+    cdef lite3_val *found
+    cdef int ra, rb
+
+    if _is_numeric(ta) and _is_numeric(tb):
+        a_int = _numeric_as_i64(va, &ia)
+        b_int = _numeric_as_i64(vb, &ib)
+        if a_int and b_int:
+            return ia == ib
+        if a_int or b_int:
+            return False
+        return lite3_val_f64(va) == lite3_val_f64(vb)
+    if ta != tb:
+        return False
+    if ta == LITE3_TYPE_NULL:
+        return True
+    if ta == LITE3_TYPE_STRING:
+        sa = lite3_val_str_n(va, &na)
+        sb = lite3_val_str_n(vb, &nb)
+        return na == nb and memcmp(sa, sb, na) == 0
+    if ta == LITE3_TYPE_BYTES:
+        sa = <const char *>lite3_val_bytes(va, &na)
+        sb = <const char *>lite3_val_bytes(vb, &nb)
+        return na == nb and memcmp(sa, sb, na) == 0
+    if ta != LITE3_TYPE_OBJECT and ta != LITE3_TYPE_ARRAY:
+        raise ValueError(f"Unknown type: {ta}")
+
+    if depth > _MAX_DEPTH:
+        raise ValueError("lite3 nesting too deep")
+    if lite3_count(<unsigned char *>a, alen, aofs, &ca) < 0 or lite3_count(<unsigned char *>b, blen, bofs, &cb) < 0:
+        raise ValueError("Invalid lite3 container")
+    if ca != cb:
+        return False
+    if lite3_iter_create(a, alen, aofs, &ita) < 0:
+        raise ValueError("Invalid lite3 container")
+
+    if ta == LITE3_TYPE_OBJECT:
+        # Same key count, so every key of `a` found in `b` with an equal value means equal.
+        while True:
+            ra = lite3_iter_next(a, alen, &ita, &key, &oa)
+            if ra == 0:
+                return True
+            if ra < 0 or key.ptr == NULL:
+                raise ValueError("Invalid lite3 container")
+            if lite3_get_impl(b, blen, bofs, key.ptr, lite3_get_key_data(key.ptr), &found) < 0:
+                return False
+            if not _values_equal(a, alen, oa, b, blen, <size_t>(<uint8_t *>found - b), depth + 1):
+                return False
+
+    if lite3_iter_create(b, blen, bofs, &itb) < 0:
+        raise ValueError("Invalid lite3 container")
+    while True:
+        ra = lite3_iter_next(a, alen, &ita, NULL, &oa)
+        rb = lite3_iter_next(b, blen, &itb, NULL, &ob)
+        if ra == 0 and rb == 0:
+            return True
+        if ra <= 0 or rb <= 0:
+            raise ValueError("Invalid lite3 container")
+        if not _values_equal(a, alen, oa, b, blen, ob, depth + 1):
+            return False
+
+
+cdef uint64_t _fingerprint(const uint8_t *buf, size_t buflen, size_t ofs, int depth) except? 0:
+    cdef lite3_val *val = <lite3_val *>(buf + ofs)
+    cdef lite3_type t = <lite3_type>val.type
+    cdef int64_t i
+    cdef double d
+    cdef uint64_t bits
+    cdef uint64_t h
+    cdef uint64_t acc
+    cdef size_t n = 0
+    cdef size_t klen
+    cdef const char *p
+    cdef uint32_t count = 0
+    cdef lite3_iter it
+    cdef lite3_str key
+    cdef size_t vofs
+    cdef int ret
+
+    if t == LITE3_TYPE_NULL:
+        return _mix64(_FP_NULL)
+    if _is_numeric(t):
+        if _numeric_as_i64(val, &i):
+            return _mix64(_FP_NUM ^ _mix64(<uint64_t>i))
+        d = lite3_val_f64(val)
+        memcpy(&bits, &d, sizeof(bits))
+        return _mix64(_FP_FLOAT ^ _mix64(bits))
+    if t == LITE3_TYPE_STRING:
+        p = lite3_val_str_n(val, &n)
+        return _fnv1a(<const uint8_t *>p, n, _FP_STR)
+    if t == LITE3_TYPE_BYTES:
+        p = <const char *>lite3_val_bytes(val, &n)
+        return _fnv1a(<const uint8_t *>p, n, _FP_BYTES)
+    if t != LITE3_TYPE_OBJECT and t != LITE3_TYPE_ARRAY:
+        raise ValueError(f"Unknown type: {t}")
+
+    if depth > _MAX_DEPTH:
+        raise ValueError("lite3 nesting too deep")
+    if lite3_count(<unsigned char *>buf, buflen, ofs, &count) < 0 or lite3_iter_create(buf, buflen, ofs, &it) < 0:
+        raise ValueError("Invalid lite3 container")
+    if t == LITE3_TYPE_OBJECT:
+        # Entries are combined with a commutative sum so key order does not matter.
+        acc = 0
+        while True:
+            ret = lite3_iter_next(buf, buflen, &it, &key, &vofs)
+            if ret == 0:
+                break
+            if ret < 0 or key.ptr == NULL:
+                raise ValueError("Invalid lite3 container")
+            klen = _iter_key_len_excluding_nul(key)
+            h = _fnv1a(<const uint8_t *>key.ptr, klen, _FP_STR)
+            acc += _mix64(h ^ (_fingerprint(buf, buflen, vofs, depth + 1) * <uint64_t>0x9e3779b97f4a7c15))
+        return _mix64(_FP_OBJECT ^ acc ^ _mix64(count))
+
+    h = _mix64(_FP_ARRAY ^ count)
+    while True:
+        ret = lite3_iter_next(buf, buflen, &it, NULL, &vofs)
+        if ret == 0:
+            return h
+        if ret < 0:
+            raise ValueError("Invalid lite3 container")
+        h = _mix64(h * <uint64_t>0x100000001b3 + _fingerprint(buf, buflen, vofs, depth + 1))
+
+
+@cython.final
+cdef class _Projection:
+    """Compiled `to_python(fields=...)` spec for one level of the document."""
+    cdef bint include_only
+    cdef dict fields       # key -> True | False | _Projection
+    cdef object wildcard   # "*" rule, or None
+
+
+cdef bint _spec_has_true(spec) except -1:
+    for v in spec.values():
+        if v is True or (isinstance(v, collections.abc.Mapping) and _spec_has_true(v)):
+            return True
+    return False
+
+
+cdef object _compile_projection(spec):
+    """Return True, False or a `_Projection` for a projection spec."""
+    cdef _Projection proj
+    if spec is True or spec is False:
+        return spec
+    if not isinstance(spec, collections.abc.Mapping):
+        raise TypeError(f"Projection spec values must be True, False or a dict, got {type(spec).__name__}")
+    proj = _Projection.__new__(_Projection)
+    proj.include_only = _spec_has_true(spec)
+    proj.fields = {}
+    proj.wildcard = None
+    for k, v in spec.items():
+        if not isinstance(k, str):
+            raise TypeError(f"Projection keys must be strings, got {k!r}")
+        if k == "*":
+            proj.wildcard = _compile_projection(v)
+        else:
+            proj.fields[k] = _compile_projection(v)
+    return proj
+
+
+_EXCLUDE_ALL = _compile_projection({"*": False})
+
+
+@cython.freelist(64)
 cdef class Lite3Object:
     """
     Lazy proxy for Lite3 data.
@@ -141,11 +846,17 @@ cdef class Lite3Object:
         size_t _len        # Total length of the buffer
         size_t _ofs        # Offset of THIS object/element within the buffer
         lite3_type _type_cache # Cache the type of this element to avoid re-calls
+        bint _trusted      # Passed deep validation on an immutable (bytes) buffer
 
     def __init__(self, data, size_t offset=0, lite3_type type_hint=LITE3_TYPE_INVALID):
         """
         Internal constructor. Use loads() or internal creation.
         """
+        # Proxies are immutable once built so they can be shared between threads
+        # (including free-threaded builds); re-running __init__ would swap the
+        # pointer under concurrent readers.
+        if self._owner is not None:
+            raise TypeError("Lite3Object is already initialized")
         # Keep a stable exported buffer alive.
         #
         # If the input is mutable (e.g. bytearray), holding a memoryview prevents resizing
@@ -208,30 +919,28 @@ cdef class Lite3Object:
     def is_valid(self):
         return self._type_cache <= LITE3_TYPE_ARRAY
 
+    @property
+    def is_trusted(self):
+        """True if this proxy reads through the unchecked paths enabled by `validate="deep"`."""
+        return self._trusted
+
     def keys(self):
-        """Return an iterator over the keys of an object."""
+        """Return a set-like view of the keys of an object."""
         if self._type_cache != LITE3_TYPE_OBJECT:
             raise TypeError("Lite3Object is not an object")
-        for k, _ in self._iter_gen(True):
-            yield k
+        return Lite3KeysView(self)
 
     def values(self):
-        """Return an iterator over the values of an object or array."""
-        if self._type_cache == LITE3_TYPE_OBJECT:
-            for _, v in self._iter_gen(True):
-                yield v
-        elif self._type_cache == LITE3_TYPE_ARRAY:
-            for v in self._iter_gen(False):
-                yield v
-        else:
+        """Return a view of the values of an object or array."""
+        if self._type_cache != LITE3_TYPE_OBJECT and self._type_cache != LITE3_TYPE_ARRAY:
             raise TypeError("Scalar Lite3Object does not have values")
+        return Lite3ValuesView(self)
 
     def items(self):
-        """Return an iterator over the (key, value) pairs of an object."""
+        """Return a set-like view of the (key, value) pairs of an object."""
         if self._type_cache != LITE3_TYPE_OBJECT:
             raise TypeError("Lite3Object is not an object")
-        return self._iter_gen(True)
-
+        return Lite3ItemsView(self)
 
     def __getitem__(self, key):
         if self._type_cache == LITE3_TYPE_OBJECT:
@@ -241,57 +950,165 @@ cdef class Lite3Object:
         elif self._type_cache == LITE3_TYPE_ARRAY:
             if isinstance(key, int):
                 if key < 0:
-                    key = key + len(self)
+                    key = key + self._count()
                 return self._get_arr_item_by_index(key)
             elif isinstance(key, slice):
-                start, stop, step = key.indices(len(self))
-                return [self[i] for i in range(start, stop, step)]
+                return Lite3Slice._from_range(self, range(self._count())[key])
             else:
                 raise TypeError("Array indices must be integers")
         else:
             raise TypeError("Scalar Lite3Object is not subscriptable")
 
     def __contains__(self, key):
-        cdef bytes k_bytes
-        cdef const char *k_cstr
-
         if self._type_cache == LITE3_TYPE_OBJECT:
             if not isinstance(key, str):
                 return False
-            k_bytes = (<str>key).encode("utf-8")
-            k_cstr = k_bytes
-            return lite3_get_type(self._ptr, self._len, self._ofs, k_cstr) != LITE3_TYPE_INVALID
+            return self._find_key(key) != NULL
         if self._type_cache == LITE3_TYPE_ARRAY:
-            for v in self:
-                if v == key:
-                    return True
-            return False
+            return self._find(key, 0, PY_SSIZE_T_MAX, False) >= 0
         return False
 
+    cdef Py_ssize_t _find(self, object value, Py_ssize_t start, Py_ssize_t stop, bint count_all) except -2:
+        """
+        Scan array positions [start, stop) for `value`.
+
+        Returns the first matching position (or -1), or the number of matches if
+        `count_all`. Scalars are compared against the raw lite3 values.
+        """
+        cdef _Probe probe
+        cdef object keep = _make_probe(&probe, value)
+        cdef lite3_iter it
+        cdef size_t val_ofs
+        cdef Py_ssize_t pos = 0
+        cdef Py_ssize_t found = 0
+        cdef int ret
+        cdef bint hit
+
+        if probe.kind == _PROBE_NEVER:
+            return 0 if count_all else -1
+        if lite3_iter_create(self._ptr, self._len, self._ofs, &it) < 0:
+            raise RuntimeError("Failed to create iterator")
+        while pos < stop:
+            ret = lite3_iter_next(self._ptr, self._len, &it, NULL, &val_ofs)
+            if ret == 0:
+                break
+            if ret < 0:
+                raise RuntimeError("Lite3 iteration failed")
+            if pos >= start:
+                if probe.kind == _PROBE_PYTHON:
+                    v = self._materialize_val(<lite3_val *>(self._ptr + val_ofs))
+                    hit = v is value or v == value
+                else:
+                    hit = _probe_match(&probe, <lite3_val *>(self._ptr + val_ofs))
+                if hit:
+                    if not count_all:
+                        return pos
+                    found += 1
+            pos += 1
+        return found if count_all else -1
+
+    def index(self, value, Py_ssize_t start=0, Py_ssize_t stop=PY_SSIZE_T_MAX):
+        """Return the first position of `value` in an array (like `list.index`)."""
+        cdef Py_ssize_t n
+        cdef Py_ssize_t pos
+        if self._type_cache != LITE3_TYPE_ARRAY:
+            raise TypeError("Lite3Object is not an array")
+        if start < 0 or stop < 0:
+            n = self._count()
+            if start < 0:
+                start = max(start + n, 0)
+            if stop < 0:
+                stop = max(stop + n, 0)
+        pos = self._find(value, start, stop, False)
+        if pos < 0:
+            raise ValueError(f"{value!r} is not in list")
+        return pos
+
+    def count(self, value):
+        """Return the number of array elements equal to `value`."""
+        if self._type_cache != LITE3_TYPE_ARRAY:
+            raise TypeError("Lite3Object is not an array")
+        return self._find(value, 0, PY_SSIZE_T_MAX, True)
+
     def get(self, key, default=None):
+        """Return the value for `key`, or `default` if the key is absent (never raises KeyError)."""
         if self._type_cache != LITE3_TYPE_OBJECT:
             raise TypeError("Lite3Object is not an object")
-        try:
-            return self[key]
-        except KeyError:
+        cdef lite3_val *val = self._find_key(key)
+        if val == NULL:
             return default
+        return self._materialize_val(val)
 
-    cdef object _get_obj_item_by_key(self, str key):
-        cdef:
-            bytes k_bytes = key.encode('utf-8')
-            const char* k_cstr = k_bytes
-            lite3_val *val = NULL
-            int ret
-        
-        # We need to use generic lite3_get to find the value pointer
-        # Manually compute key data hash to avoid macro expansion issues
-        cdef lite3_key_data kd = lite3_get_key_data(k_cstr)
-        ret = lite3_get_impl(self._ptr, self._len, self._ofs, k_cstr, kd, &val)
-        if ret < 0:
-            raise KeyError(key) # Or more specific error based on errno?
+    def get_int(self, key, default=None):
+        """Return the value for `key` if it is stored as an int, else `default`."""
+        if self._type_cache != LITE3_TYPE_OBJECT:
+            raise TypeError("Lite3Object is not an object")
+        cdef lite3_val *val = self._find_key(key)
+        if val == NULL or val.type != LITE3_TYPE_I64:
+            return default
+        return lite3_val_i64(val)
+
+    def get_float(self, key, default=None):
+        """Return the value for `key` as a float if it is stored as a float or int, else `default`."""
+        if self._type_cache != LITE3_TYPE_OBJECT:
+            raise TypeError("Lite3Object is not an object")
+        cdef lite3_val *val = self._find_key(key)
+        if val == NULL:
+            return default
+        if val.type == LITE3_TYPE_F64:
+            return lite3_val_f64(val)
+        if val.type == LITE3_TYPE_I64:
+            return <double>lite3_val_i64(val)
+        return default
+
+    def get_str(self, key, default=None):
+        """Return the value for `key` if it is stored as a string, else `default`."""
+        if self._type_cache != LITE3_TYPE_OBJECT:
+            raise TypeError("Lite3Object is not an object")
+        cdef lite3_val *val = self._find_key(key)
+        if val == NULL or val.type != LITE3_TYPE_STRING:
+            return default
+        return self._materialize_val(val)
+
+    def get_bytes(self, key, default=None):
+        """Return the value for `key` if it is stored as bytes, else `default`."""
+        if self._type_cache != LITE3_TYPE_OBJECT:
+            raise TypeError("Lite3Object is not an object")
+        cdef lite3_val *val = self._find_key(key)
+        if val == NULL or val.type != LITE3_TYPE_BYTES:
+            return default
+        return self._materialize_val(val)
+
+    def get_bool(self, key, default=None):
+        """Return the value for `key` if it is stored as a bool, else `default`."""
+        if self._type_cache != LITE3_TYPE_OBJECT:
+            raise TypeError("Lite3Object is not an object")
+        cdef lite3_val *val = self._find_key(key)
+        if val == NULL or val.type != LITE3_TYPE_BOOL:
+            return default
+        return lite3_val_bool(val) != 0
+
+    cdef lite3_val *_find_key(self, object key) except? NULL:
+        # Look `key` up in this object; NULL if absent or not a str. Uses the str's
+        # cached UTF-8 form, so no bytes object is built per lookup.
+        cdef const char *k_cstr
+        cdef Py_ssize_t k_len
+        cdef lite3_val *val = NULL
+        if not isinstance(key, str):
+            return NULL
+        k_cstr = PyUnicode_AsUTF8AndSize(key, &k_len)
+        if <size_t>k_len != strlen(k_cstr):
+            return NULL  # embedded NUL: lite3 keys cannot contain one
+        if self._trusted:
+            return _trusted_lookup(self._ptr, self._ofs, lite3_get_key_data(k_cstr).hash, k_cstr, <size_t>k_len)
+        if lite3_get_impl(self._ptr, self._len, self._ofs, k_cstr, lite3_get_key_data(k_cstr), &val) < 0:
+            return NULL
+        return val
 
-        # Now we have a pointer to the value inside the buffer.
-        # We need to determine its type and return appropriate Python object or Proxy.
+    cdef object _get_obj_item_by_key(self, str key):
+        cdef lite3_val *val = self._find_key(key)
+        if val == NULL:
+            raise KeyError(key)
         return self._materialize_val(val)
 
     cdef object _get_arr_item_by_index(self, int index):
@@ -299,7 +1116,13 @@ cdef class Lite3Object:
             uint32_t idx = <uint32_t>index
             int ret
             lite3_val *val = NULL
-        
+
+        if self._trusted:
+            if idx < _trusted_count(self._ptr, self._ofs):
+                val = _trusted_lookup(self._ptr, self._ofs, idx, NULL, 0)
+            if val == NULL:
+                raise IndexError(f"List index out of range: {index}")
+            return self._materialize_val(val)
         ret = _lite3_get_by_index(self._ptr, self._len, self._ofs, idx, &val)
         if ret < 0:
              raise IndexError(f"List index out of range: {index}")
@@ -333,85 +1156,47 @@ cdef class Lite3Object:
                  raise ValueError("Invalid lite3 bytes pointer")
              return <bytes>PyBytes_FromStringAndSize(<const char *>b_ptr, out_len)
         elif t == LITE3_TYPE_OBJECT:
-             return Lite3Object(self._owner, sub_ofs, LITE3_TYPE_OBJECT)
+             return _child_proxy(self, sub_ofs, LITE3_TYPE_OBJECT)
         elif t == LITE3_TYPE_ARRAY:
-             return Lite3Object(self._owner, sub_ofs, LITE3_TYPE_ARRAY)
+             return _child_proxy(self, sub_ofs, LITE3_TYPE_ARRAY)
         else:
              raise ValueError(f"Unknown type: {t}")
 
+    cdef Py_ssize_t _count(self):
+        cdef uint32_t count = 0
+        if self._trusted and (self._type_cache == LITE3_TYPE_OBJECT or self._type_cache == LITE3_TYPE_ARRAY):
+            return _trusted_count(self._ptr, self._ofs)
+        if lite3_count(<unsigned char*>self._ptr, self._len, self._ofs, &count) == 0:
+            return count
+        return 0
+
     def __len__(self):
         cdef uint32_t count = 0
         if self._type_cache in (LITE3_TYPE_OBJECT, LITE3_TYPE_ARRAY):
+            if self._trusted:
+                return _trusted_count(self._ptr, self._ofs)
             if lite3_count(<unsigned char*>self._ptr, self._len, self._ofs, &count) == 0:
                 return count
         return 0
 
     def __iter__(self):
-        cdef lite3_iter it
-        cdef size_t val_ofs
-        cdef int ret
-
         if self._type_cache == LITE3_TYPE_ARRAY:
-             if lite3_iter_create(self._ptr, self._len, self._ofs, &it) < 0:
-                 raise RuntimeError("Failed to create iterator")
-
-             while True:
-                 ret = lite3_iter_next(self._ptr, self._len, &it, NULL, &val_ofs)
-                 if ret == 0:  # LITE3_ITER_DONE
-                     break
-                 yield self._materialize_val(<lite3_val *>(self._ptr + val_ofs))
-        elif self._type_cache == LITE3_TYPE_OBJECT:
-             # Iterator for object: yield KEYS
-             iter_obj = self._get_iterator()
-             while True:
-                 try:
-                     key = next(iter_obj)
-                     yield key[0] # Yield key only
-                 except StopIteration:
-                     break
-        else:
-             raise TypeError("Scalar Lite3Object is not iterable")
-
-    def _get_iterator(self):
-        # Helper to generator iterator yielding (key, value_proxy)
+            return _Lite3Iterator(self, _ITER_VALUES)
         if self._type_cache == LITE3_TYPE_OBJECT:
-            return self._iter_gen(True)
-        return self._iter_gen(False)
-        
-    def _iter_gen(self, bint is_object):
-        cdef lite3_iter it
-        cdef lite3_str key
-        cdef size_t val_ofs
-        cdef int ret
-        cdef size_t klen
-        
-        if lite3_iter_create(self._ptr, self._len, self._ofs, &it) < 0:
-            raise RuntimeError("Failed to create iterator")
-            
-        while True:
-            ret = lite3_iter_next(self._ptr, self._len, &it, &key if is_object else NULL, &val_ofs)
-            if ret == 0: # LITE3_ITER_DONE
-                break
-            
-            # Create value proxy
-            val = Lite3Object(self._owner, val_ofs)
-            
-            if is_object:
-                # Key is in lite3_str key. string is at key.ptr, len is key.len.
-                # key.ptr is pointer inside buffer.
-                # print(f"DEBUG: key len={key.len} ptr={ <size_t>key.ptr } gen={key.gen}")
-                if key.ptr == NULL:
-                    raise RuntimeError("Iterator returned NULL key pointer")
-                klen = _iter_key_len_excluding_nul(key)
-                py_key = key.ptr[:klen].decode('utf-8')
-                yield (py_key, val)
-            else:
-                yield val
+            return _Lite3Iterator(self, _ITER_KEYS)
+        raise TypeError("Scalar Lite3Object is not iterable")
 
-    def to_python(self, object_hook=None, parse_float=None, parse_int=None, parse_constant=None, object_pairs_hook=None):
+    def to_python(self, object_hook=None, parse_float=None, parse_int=None, parse_constant=None, object_pairs_hook=None,
+                  fields=None):
         """
         Recursively convert to standard Python objects (dict/list).
         Support standard json hooks.
+
+        `fields` limits conversion to a nested projection, e.g.
+        `{"user": {"id": True}, "items": {"*": {"sku": True}}}`: `True` includes a
+        subtree, a dict projects into it, `False` excludes it and `"*"` matches every
+        key (or every array element). A level is an include list if its spec contains
+        any `True`, otherwise everything not excluded is kept.
         """
         cdef lite3_iter it
         cdef lite3_str key
@@ -419,6 +1204,17 @@ cdef class Lite3Object:
         cdef int ret
         cdef size_t klen
 
+        if fields is not None:
+            rule = _compile_projection(fields)
+            hooks = {"object_hook": object_hook, "parse_float": parse_float, "parse_int": parse_int,
+                     "parse_constant": parse_constant, "object_pairs_hook": object_pairs_hook}
+            if rule is True or not (self._type_cache == LITE3_TYPE_OBJECT or self._type_cache == LITE3_TYPE_ARRAY):
+                return self.to_python(**hooks)
+            if rule is False:
+                # Everything is excluded: an empty container of the same type.
+                rule = _EXCLUDE_ALL
+            return self._project(<_Projection?>rule, hooks)
+
         if self._type_cache == LITE3_TYPE_ARRAY:
             if lite3_iter_create(self._ptr, self._len, self._ofs, &it) < 0:
                 raise RuntimeError("Failed to create iterator")
@@ -490,47 +1286,830 @@ cdef class Lite3Object:
             # lite3 doesn't have Infinity/NaN logic mapped to constants generally?
             return val
 
-    def as_dict(self):
-        """Reflect access as dict (recursive)"""
-        if self._type_cache != LITE3_TYPE_OBJECT:
-             raise TypeError("Not an object")
-        return self.to_python()
-        
-    def as_list(self):
-        """Reflect access as list (recursive)"""
-        if self._type_cache != LITE3_TYPE_ARRAY:
-             raise TypeError("Not an array")
-        return self.to_python()
+    cdef object _project_value(self, size_t vofs, object rule, dict hooks):
+        v = self._materialize_val(<lite3_val *>(self._ptr + vofs))
+        if isinstance(v, Lite3Object):
+            if rule is True:
+                return (<Lite3Object>v).to_python(**hooks)
+            return (<Lite3Object>v)._project(<_Projection?>rule, hooks)
+        # A nested projection over a scalar keeps the scalar.
+        return v
 
-    cdef object _materialize_scalar(self):
-         # For scalars, to_python just returns the value
-         # But we might need to re-read it if we don't have it?
-         # _materialize_val checks type cache and reads from offset.
-         # self is a proxy, pointing to a value.
-         # _materialize_val expects a lite3_val pointer.
-         # We have _ptr + _ofs = LITE3 VAL.
-         return self._materialize_val(<lite3_val*>(self._ptr + self._ofs))
+    cdef object _project(self, _Projection proj, dict hooks):
+        cdef lite3_iter it
+        cdef lite3_str key
+        cdef size_t val_ofs
+        cdef lite3_val *found
+        cdef int ret
+        cdef size_t klen
+        cdef bytes k_encoded
+        cdef list pairs = []
 
-    def __repr__(self):
-        return f"<Lite3Object type={self._type_cache} offset={self._ofs}>"
+        if self._type_cache == LITE3_TYPE_ARRAY:
+            rule = proj.wildcard if proj.wildcard is not None else proj
+            if rule is False:
+                return []
+            if lite3_iter_create(self._ptr, self._len, self._ofs, &it) < 0:
+                raise RuntimeError("Failed to create iterator")
+            out = []
+            while True:
+                ret = lite3_iter_next(self._ptr, self._len, &it, NULL, &val_ofs)
+                if ret == 0:
+                    return out
+                if ret < 0:
+                    raise RuntimeError("Lite3 iteration failed")
+                out.append(self._project_value(val_ofs, rule, hooks))
 
+        if proj.include_only and proj.wildcard is None:
+            # Pure include list: hashed lookups, the rest of the object is never visited.
+            for k, rule in proj.fields.items():
+                if rule is False:
+                    continue
+                k_encoded = (<str>k).encode("utf-8")
+                if lite3_get_impl(self._ptr, self._len, self._ofs, k_encoded, lite3_get_key_data(k_encoded), &found) < 0:
+                    continue
+                pairs.append((k, self._project_value(<size_t>(<uint8_t *>found - self._ptr), rule, hooks)))
+        else:
+            default_rule = proj.wildcard if proj.wildcard is not None else (not proj.include_only)
+            if lite3_iter_create(self._ptr, self._len, self._ofs, &it) < 0:
+                raise RuntimeError("Failed to create iterator")
+            while True:
+                ret = lite3_iter_next(self._ptr, self._len, &it, &key, &val_ofs)
+                if ret == 0:
+                    break
+                if ret < 0 or key.ptr == NULL:
+                    raise RuntimeError("Lite3 iteration failed")
+                klen = _iter_key_len_excluding_nul(key)
+                k = key.ptr[:klen].decode("utf-8")
+                rule = proj.fields.get(k, default_rule)
+                if rule is not False:
+                    pairs.append((k, self._project_value(val_ofs, rule, hooks)))
 
-# Need to expose the static inline function from header
-cdef extern from "lite3.h":
+        if hooks["object_pairs_hook"] is not None:
+            return hooks["object_pairs_hook"](pairs)
+        d = dict(pairs)
+        if hooks["object_hook"] is not None:
+            return hooks["object_hook"](d)
+        return d
+
+    def select(self, where=None, fields=None, order_by=None, limit=None):
+        """
+        Filter an array of objects and return the matching rows as Python values.
+
+        Arguments:
+            where: List of `(field, op, value)` predicates, all of which must hold. `field`
+                   is a key or a tuple of keys; `op` is one of `==`, `!=`, `<`, `<=`, `>`,
+                   `>=`, `in`, `not in`. Predicates are evaluated on the raw lite3 values;
+                   rows missing the field (or with an unordered type for `<`...) don't match.
+            fields: Keys to keep per row, or a `to_python(fields=...)` projection spec.
+            order_by: Field to sort by; prefix with "-" for descending. Numbers, strings and
+                      bytes are sorted within their own group, in that order; rows where the
+                      field is missing, null or a container go last.
+            limit (int): Maximum number of rows returned.
+
+        Returns:
+            list: Matching rows (dicts, or the element value for non-object rows).
+        """
+        return _select(self, where, fields, order_by, limit)
+
+    def events(self):
+        """
+        Return a `Lite3Events` iterator over the `(event, value)` pairs of this value,
+        read straight from the buffer without building child proxies.
+        """
+        return Lite3Events(self)
+
+    def decode_as(self, tp):
+        """
+        Decode this value into `tp` with a plan compiled once per type.
+
+        `tp` may be a dataclass, NamedTuple or TypedDict (nested freely), `int`,
+        `float`, `str`, `bytes`, `bool`, `None`, `list[T]`, `tuple[...]`, `set[T]`,
+        `dict[str, T]`, `Optional`/`Union`, `Literal`, an `Enum`, `Any`, or
+        `Lite3Object` to keep a zero-copy proxy. Record fields are looked up by
+        precomputed key hash; undeclared keys are never materialized.
+
+        Raises:
+            TypeError: A value has the wrong type (the message includes its path).
+            ValueError: A required field is missing or a value is out of range.
+        """
+        return _decode_typed(self, <lite3_val *>(self._ptr + self._ofs), tp)
+
+    def aggregate(self, field=None, ops=("sum", "min", "max", "count", "mean")):
+        """
+        Aggregate the numeric values of an array natively.
+
+        Arguments:
+            field: Key (or tuple of keys) to read from each object row; None aggregates
+                   the array elements themselves.
+            ops: Any of "sum", "min", "max", "count", "mean".
+
+        Only int and float values take part (bools, strings and missing fields are
+        skipped); `count` is the number of values aggregated.
+
+        Returns:
+            dict: `{op: value}`; `min`/`max`/`mean` are None when nothing was aggregated.
+        """
+        return _aggregate(self, field, ops)
+
+    def group_by(self, key_field, agg=None):
+        """
+        Group the object rows of an array by `key_field` and aggregate per group.
+
+        Arguments:
+            key_field: Key (or tuple of keys) whose value identifies the group. Rows
+                       without it are skipped.
+            agg (dict): `{field: ops}` aggregates computed per group, as in `aggregate()`.
+
+        Returns:
+            dict: `{key: {field: {op: value}}}`, or `{key: row_count}` when `agg` is None.
+        """
+        return _group_by(self, key_field, agg)
+
+    def as_dict(self):
+        """Reflect access as dict (recursive)"""
+        if self._type_cache != LITE3_TYPE_OBJECT:
+             raise TypeError("Not an object")
+        return self.to_python()
+        
+    def as_list(self):
+        """Reflect access as list (recursive)"""
+        if self._type_cache != LITE3_TYPE_ARRAY:
+             raise TypeError("Not an array")
+        return self.to_python()
+
+    cdef object _materialize_scalar(self):
+         # For scalars, to_python just returns the value
+         # But we might need to re-read it if we don't have it?
+         # _materialize_val checks type cache and reads from offset.
+         # self is a proxy, pointing to a value.
+         # _materialize_val expects a lite3_val pointer.
+         # We have _ptr + _ofs = LITE3 VAL.
+         return self._materialize_val(<lite3_val*>(self._ptr + self._ofs))
+
+    def to_json(self, *, bint ensure_ascii=False, bint allow_nan=True):
+        """
+        Encode this value as compact UTF-8 JSON bytes.
+
+        The buffer is walked natively and written straight into the output, without
+        building intermediate Python dicts/lists. Bytes values are emitted as base64
+        strings (as in lite3's own JSON encoder).
+
+        Arguments:
+            ensure_ascii (bool): Escape non-ASCII characters as `\\uXXXX` (default: False).
+            allow_nan (bool): Emit `NaN`/`Infinity` like `json.dumps`; if False, raise ValueError.
+        """
+        cdef _OutBuf ob
+        if self._type_cache > LITE3_TYPE_ARRAY:
+            raise ValueError("Invalid lite3 value")
+        _outbuf_init(&ob, 256 if self._type_cache < LITE3_TYPE_OBJECT else 4096)
+        try:
+            _json_write_val(&ob, self._ptr, self._len, self._ofs, ensure_ascii, allow_nan, 0)
+            return PyBytes_FromStringAndSize(ob.data, ob.len)
+        finally:
+            PyMem_Free(ob.data)
+
+    def __repr__(self):
+        return f"<Lite3Object type={self._type_cache} offset={self._ofs}>"
+
+    def __eq__(self, other):
+        cdef Lite3Object o
+        if isinstance(other, Lite3Object):
+            o = <Lite3Object>other
+            if self._type_cache > LITE3_TYPE_ARRAY or o._type_cache > LITE3_TYPE_ARRAY:
+                return self is o
+            return bool(_values_equal(self._ptr, self._len, self._ofs, o._ptr, o._len, o._ofs, 0))
+        # Only unhashable containers compare equal, so `a == b` always implies
+        # `hash(a) == hash(b)`; like `[1] != (1,)`, an array never equals a tuple.
+        if (self._type_cache == LITE3_TYPE_OBJECT and isinstance(other, collections.abc.Mapping)
+                and type(other).__hash__ is None):
+            if len(other) != self._count():
+                return False
+            for k, v in other.items():
+                if not isinstance(k, str) or k not in self or not (self._get_obj_item_by_key(k) == v):
+                    return False
+            return True
+        if self._type_cache == LITE3_TYPE_ARRAY and isinstance(other, (list, Lite3Slice)):
+            if len(other) != self._count():
+                return False
+            for mine, theirs in zip(self, other):
+                if not (mine == theirs):
+                    return False
+            return True
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        cdef Py_hash_t h
+        if self._type_cache > LITE3_TYPE_ARRAY or self._ofs >= self._len:
+            raise ValueError("Invalid lite3 value")
+        h = <Py_hash_t>_fingerprint(self._ptr, self._len, self._ofs, 0)
+        return -2 if h == -1 else h
+
+    @property
+    def retained_nbytes(self):
+        """
+        Size in bytes of the buffer this proxy keeps alive.
+
+        A nested proxy pins its whole parent buffer (or the object a memoryview was
+        sliced from); compare with `len(obj.detach())` to spot oversized retention.
+        """
+        base = self._owner.obj if isinstance(self._owner, memoryview) else self._owner
+        try:
+            return memoryview(base).nbytes
+        except TypeError:
+            return self._len
+
+    def detach(self):
+        """
+        Return a standalone copy of this object/array in a fresh, minimal buffer.
+
+        The copy no longer references the parent buffer, so keeping it alive (e.g. in a
+        cache) does not pin the rest of the document.
+        """
+        if self._type_cache != LITE3_TYPE_OBJECT and self._type_cache != LITE3_TYPE_ARRAY:
+            raise TypeError("detach() requires a lite3 object or array")
+        return Lite3Object(_copy_document(self))
+
+    def fingerprint(self):
+        """
+        Return a stable 64-bit content digest as an `int`.
+
+        Documents that compare equal have the same fingerprint: object key order is
+        ignored and numbers are normalized (`1`, `1.0` and `True` hash alike). The
+        value does not depend on the buffer layout or on `PYTHONHASHSEED`.
+        """
+        if self._type_cache > LITE3_TYPE_ARRAY or self._ofs >= self._len:
+            raise ValueError("Invalid lite3 value")
+        return _fingerprint(self._ptr, self._len, self._ofs, 0)
+
+    def __reduce_ex__(self, protocol):
+        # The proxy travels as its whole underlying buffer plus its offset. With
+        # protocol 5 the buffer is a PickleBuffer, so it is sent out-of-band (zero
+        # copy) when the pickler has a `buffer_callback`.
+        if protocol >= 5:
+            data = pickle.PickleBuffer(self._owner)
+        else:
+            data = self._owner.tobytes()
+        return (Lite3Object, (data, self._ofs, self._type_cache))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+cdef inline Lite3Object _child_proxy(Lite3Object parent, size_t ofs, lite3_type t):
+    # Build a proxy over the parent's buffer without going through __init__: the
+    # export is already pinned by `parent._owner`, so pointer and length are copied.
+    cdef Lite3Object child = Lite3Object.__new__(Lite3Object)
+    child._owner = parent._owner
+    child._ptr = parent._ptr
+    child._len = parent._len
+    child._ofs = ofs
+    child._type_cache = t
+    child._trusted = parent._trusted
+    return child
+
+
+cdef enum:
+    _ITER_KEYS = 0
+    _ITER_VALUES = 1
+    _ITER_ITEMS = 2
+
+
+@cython.final
+cdef class _Lite3Iterator:
+    """
+    Iterator over the entries of an object or array, driven by `lite3_iter`.
+
+    Keys are decoded from the buffer. Values are materialized like `__getitem__`
+    does: scalars come back as Python values, containers as child proxies. Trusted
+    proxies walk the nodes directly instead.
+    """
+    cdef:
+        Lite3Object _obj
+        lite3_iter _it
+        _NodeIter _nit
+        int _mode
+        bint _want_key
+
+    def __cinit__(self, Lite3Object obj, int mode):
+        self._obj = obj
+        self._mode = mode
+        # lite3_iter_next requires a key slot when walking objects.
+        self._want_key = obj._type_cache == LITE3_TYPE_OBJECT
+        if obj._trusted:
+            _trusted_iter_init(obj._ptr, obj._ofs, &self._nit)
+        elif lite3_iter_create(obj._ptr, obj._len, obj._ofs, &self._it) < 0:
+            raise RuntimeError("Failed to create iterator")
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        cdef Lite3Object obj = self._obj
+        cdef lite3_str key
+        cdef size_t val_ofs
+        cdef size_t klen = 0
+        cdef int ret
+
+        if obj._trusted:
+            val_ofs = _trusted_iter_next(obj._ptr, &self._nit)
+            if val_ofs == 0:
+                raise StopIteration
+            if self._want_key:
+                val_ofs = _trusted_key(obj._ptr, val_ofs, &key.ptr, &klen)
+        else:
+            ret = lite3_iter_next(obj._ptr, obj._len, &self._it, &key if self._want_key else NULL, &val_ofs)
+            if ret == 0:  # LITE3_ITER_DONE
+                raise StopIteration
+            if ret < 0:
+                raise RuntimeError("Lite3 iteration failed")
+            if self._want_key:
+                if key.ptr == NULL:
+                    raise RuntimeError("Iterator returned NULL key pointer")
+                klen = _iter_key_len_excluding_nul(key)
+
+        if self._mode != _ITER_KEYS:
+            val = obj._materialize_val(<lite3_val *>(obj._ptr + val_ofs))
+            if self._mode != _ITER_ITEMS:
+                return val
+
+        py_key = key.ptr[:klen].decode("utf-8")
+        if self._mode == _ITER_KEYS:
+            return py_key
+        return (py_key, val)
+
+
+cdef class _Lite3View:
+    cdef Lite3Object _obj
+
+    def __cinit__(self, Lite3Object obj):
+        self._obj = obj
+
+    def __len__(self):
+        # Element counts live in the root node header, so this is O(1).
+        return len(self._obj)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+cdef class _Lite3SetView(_Lite3View):
+    # Set operations mirror dict views: the result is a plain `set`.
+    def __and__(self, other):
+        return set(self) & set(other)
+
+    def __rand__(self, other):
+        return set(other) & set(self)
+
+    def __or__(self, other):
+        return set(self) | set(other)
+
+    def __ror__(self, other):
+        return set(other) | set(self)
+
+    def __sub__(self, other):
+        return set(self) - set(other)
+
+    def __rsub__(self, other):
+        return set(other) - set(self)
+
+    def __xor__(self, other):
+        return set(self) ^ set(other)
+
+    def __rxor__(self, other):
+        return set(other) ^ set(self)
+
+    def isdisjoint(self, other):
+        for value in other:
+            if value in self:
+                return False
+        return True
+
+    def __eq__(self, other):
+        if not isinstance(other, (collections.abc.Set, _Lite3SetView)):
+            return NotImplemented
+        return len(self) == len(other) and all(value in self for value in other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+
+@cython.final
+cdef class Lite3KeysView(_Lite3SetView):
+    """Set-like view of an object's keys with hashed membership tests."""
+
+    def __iter__(self):
+        return _Lite3Iterator(self._obj, _ITER_KEYS)
+
+    def __contains__(self, key):
+        return key in self._obj
+
+
+@cython.final
+cdef class Lite3ItemsView(_Lite3SetView):
+    """Set-like view of an object's `(key, value)` pairs."""
+
+    def __iter__(self):
+        return _Lite3Iterator(self._obj, _ITER_ITEMS)
+
+    def __contains__(self, item):
+        if not isinstance(item, tuple) or len(item) != 2:
+            return False
+        key, value = item
+        if not isinstance(key, str) or key not in self._obj:
+            return False
+        found = self._obj[key]
+        return found is value or found == value
+
+
+@cython.final
+cdef class Lite3ValuesView(_Lite3View):
+    """View of the values of an object or array."""
+
+    def __iter__(self):
+        return _Lite3Iterator(self._obj, _ITER_VALUES)
+
+    def __contains__(self, value):
+        for v in self:
+            if v is value or v == value:
+                return True
+        return False
+
+
+@cython.final
+cdef class Lite3Slice:
+    """
+    Lazy view over a slice of a lite3 array, returned by `arr[start:stop:step]`.
+
+    Elements are looked up in the parent array on access; nothing is materialized
+    until it is indexed, iterated or converted with `to_python()`.
+    """
+    cdef:
+        Lite3Object _arr
+        Py_ssize_t _start
+        Py_ssize_t _step
+        Py_ssize_t _n
+
+    @staticmethod
+    cdef Lite3Slice _from_range(Lite3Object arr, object r):
+        cdef Lite3Slice view = Lite3Slice.__new__(Lite3Slice)
+        view._arr = arr
+        view._start = r.start
+        view._step = r.step
+        view._n = len(r)
+        return view
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, key):
+        cdef Py_ssize_t i
+        if isinstance(key, slice):
+            return Lite3Slice._from_range(
+                self._arr, range(self._start, self._start + self._n * self._step, self._step)[key])
+        if not isinstance(key, int):
+            raise TypeError("Array indices must be integers")
+        i = key
+        if i < 0:
+            i += self._n
+        if i < 0 or i >= self._n:
+            raise IndexError(f"List index out of range: {key}")
+        return self._arr._get_arr_item_by_index(self._start + i * self._step)
+
+    def __iter__(self):
+        cdef Py_ssize_t i
+        for i in range(self._n):
+            yield self._arr._get_arr_item_by_index(self._start + i * self._step)
+
+    def __reversed__(self):
+        return iter(self[::-1])
+
+    cdef Py_ssize_t _find(self, object value, bint count_all) except -2:
+        cdef Lite3Object arr = self._arr
+        cdef _Probe probe
+        cdef object keep
+        cdef lite3_val *val = NULL
+        cdef Py_ssize_t i
+        cdef Py_ssize_t found = 0
+        cdef bint hit
+
+        if self._step == 1:
+            found = arr._find(value, self._start, self._start + self._n, count_all)
+            return found if count_all or found < 0 else found - self._start
+
+        keep = _make_probe(&probe, value)
+        if probe.kind == _PROBE_NEVER:
+            return 0 if count_all else -1
+        for i in range(self._n):
+            if _lite3_get_by_index(arr._ptr, arr._len, arr._ofs, <uint32_t>(self._start + i * self._step), &val) < 0:
+                raise IndexError(f"List index out of range: {self._start + i * self._step}")
+            if probe.kind == _PROBE_PYTHON:
+                v = arr._materialize_val(val)
+                hit = v is value or v == value
+            else:
+                hit = _probe_match(&probe, val)
+            if hit:
+                if not count_all:
+                    return i
+                found += 1
+        return found if count_all else -1
+
+    def __contains__(self, value):
+        return self._find(value, False) >= 0
+
+    def index(self, value, start=0, stop=None):
+        """Return the first position of `value` in the slice (like `list.index`)."""
+        cdef Py_ssize_t lo
+        cdef Py_ssize_t pos
+        lo, hi, _ = slice(start, stop).indices(self._n)
+        pos = (<Lite3Slice>self[lo:hi])._find(value, False) if lo < hi else -1
+        if pos < 0:
+            raise ValueError(f"{value!r} is not in list")
+        return lo + pos
+
+    def count(self, value):
+        """Return the number of elements equal to `value`."""
+        return self._find(value, True)
+
+    def __eq__(self, other):
+        # Same rule as Lite3Object arrays: tuples never compare equal (arrays handle
+        # slice comparisons through the reflected __eq__).
+        if not isinstance(other, (list, Lite3Slice)):
+            return NotImplemented
+        return len(self) == len(other) and list(self) == list(other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def to_python(self, **hooks):
+        """Materialize the slice as a `list`, converting nested values recursively (accepts `to_python` hooks)."""
+        out = []
+        for v in self:
+            if isinstance(v, Lite3Object):
+                v = v.to_python(**hooks)
+            out.append(v)
+        return out
+
+    def __repr__(self):
+        return f"<Lite3Slice start={self._start} step={self._step} len={self._n}>"
+
+
+collections.abc.Sequence.register(Lite3Slice)
+collections.abc.KeysView.register(Lite3KeysView)
+collections.abc.ItemsView.register(Lite3ItemsView)
+collections.abc.ValuesView.register(Lite3ValuesView)
+
+
+# Need to expose the static inline function from header
+cdef extern from "lite3.h" nogil:
     int _lite3_get_by_index(const uint8_t *buf, size_t buflen, size_t ofs, uint32_t index, lite3_val **out)
 
-def loads(data, *, bint recursive=False, cls=None, object_hook=None, parse_float=None,
-          parse_int=None, parse_constant=None, object_pairs_hook=None, **kwargs):
+# Mutable module state, kept safe for free-threaded builds:
+# - the JSON fallback counters (see `fallback_stats()`), read and written under
+#   `_fallback_lock` so the counts stay exact;
+# - the per-type plan caches `_ENCODE_PLANS` (record encoding) and `_TYPE_PLANS`
+#   (typed decoding). Lookups are plain dict reads; plans are only inserted, fully
+#   built, under `_plan_lock`, and are never mutated afterwards.
+cdef Py_ssize_t _loads_json_fallbacks = 0
+cdef Py_ssize_t _dumps_json_fallbacks = 0
+cdef cython.pymutex _fallback_lock
+cdef cython.pymutex _plan_lock
+
+
+def fallback_stats():
+    """
+    Return how often `loads()`/`dumps()` fell back to JSON.
+
+    Returns:
+        dict: `{"loads": int, "dumps": int}` counts since import (or the last reset).
+    """
+    with _fallback_lock:
+        return {"loads": _loads_json_fallbacks, "dumps": _dumps_json_fallbacks}
+
+
+def reset_fallback_stats():
+    """Reset the counters reported by `fallback_stats()`."""
+    global _loads_json_fallbacks, _dumps_json_fallbacks
+    with _fallback_lock:
+        _loads_json_fallbacks = 0
+        _dumps_json_fallbacks = 0
+
+
+cdef const char *_check_root(const uint8_t *buf, size_t buflen, size_t ofs) noexcept nogil:
+    """
+    Sanity-check the root value at `buf + ofs` without raising.
+
+    lite3 expects root-level object/array; for other tags we do minimal bounds checks.
+
+    Returns:
+        NULL if the value looks valid, otherwise a static error message.
+    """
+    cdef uint8_t tag
+    cdef uint32_t len32 = 0
+
+    if ofs >= buflen:
+        return "Invalid lite3 offset"
+    tag = buf[ofs]
+    if tag == LITE3_TYPE_OBJECT:
+        if _lite3_verify_obj_get(<const unsigned char *>buf, buflen, ofs) < 0:
+            return "Invalid lite3 object"
+    elif tag == LITE3_TYPE_ARRAY:
+        if _lite3_verify_arr_get(<const unsigned char *>buf, buflen, ofs) < 0:
+            return "Invalid lite3 array"
+    elif tag == LITE3_TYPE_NULL:
+        pass
+    elif tag == LITE3_TYPE_BOOL:
+        if buflen - ofs < 2:
+            return "Invalid lite3 bool"
+    elif tag == LITE3_TYPE_I64 or tag == LITE3_TYPE_F64:
+        if buflen - ofs < 1 + 8:
+            return "Invalid lite3 number"
+    elif tag == LITE3_TYPE_BYTES:
+        if buflen - ofs < 1 + 4:
+            return "Invalid lite3 bytes header"
+        memcpy(&len32, <const void *>(buf + ofs + 1), 4)
+        if buflen - ofs < 1 + 4 + <size_t>len32:
+            return "Invalid lite3 bytes length"
+    elif tag == LITE3_TYPE_STRING:
+        if buflen - ofs < 1 + 4:
+            return "Invalid lite3 string header"
+        memcpy(&len32, <const void *>(buf + ofs + 1), 4)
+        if len32 < 1:
+            return "Invalid lite3 string length"
+        if buflen - ofs < 1 + 4 + <size_t>len32:
+            return "Invalid lite3 string length"
+    else:
+        return "Invalid lite3 type tag"
+    return NULL
+
+
+# Deep validation: one walk over every node and entry of the tree. A document that
+# passes can be read through the `_trusted_*` helpers above without further checks.
+cdef struct _DeepCheck:
+    const uint8_t *buf
+    size_t buflen
+    size_t node_budget      # a tree has at most buflen / LITE3_NODE_SIZE nodes
+
+
+cdef const char *_verify_entry(_DeepCheck *chk, size_t ofs, bint keyed, int depth) noexcept nogil:
+    cdef size_t tag_size
+    cdef size_t key_size = 0
+    cdef uint8_t t
+    if keyed:
+        if ofs >= chk.buflen:
+            return "lite3 key out of bounds"
+        tag_size = (chk.buf[ofs] & _KEY_TAG_SIZE_MASK) + 1
+        if tag_size > chk.buflen - ofs:
+            return "lite3 key out of bounds"
+        memcpy(&key_size, chk.buf + ofs, tag_size)
+        key_size >>= _KEY_TAG_KEY_SIZE_SHIFT
+        ofs += tag_size
+        if key_size == 0 or key_size > chk.buflen - ofs:
+            return "lite3 key out of bounds"
+        if chk.buf[ofs + key_size - 1] != 0:
+            return "lite3 key is not NUL-terminated"
+        ofs += key_size
+    if ofs >= chk.buflen:
+        return "lite3 value out of bounds"
+    t = chk.buf[ofs]
+    if t == LITE3_TYPE_OBJECT or t == LITE3_TYPE_ARRAY:
+        return _verify_container(chk, ofs, depth + 1)
+    return _check_root(chk.buf, chk.buflen, ofs)
+
+
+cdef const char *_verify_node(_DeepCheck *chk, size_t ofs, uint8_t tag, int height, int depth,
+                              uint32_t *count) noexcept nogil:
+    cdef const _Node *node
+    cdef uint32_t kc, i
+    cdef bint internal
+    cdef const char *err
+    if chk.buflen < LITE3_NODE_SIZE or ofs > chk.buflen - LITE3_NODE_SIZE:
+        return "lite3 node out of bounds"
+    if (<uintptr_t>(chk.buf + ofs)) & 3:
+        return "lite3 node is misaligned"
+    if chk.node_budget == 0:
+        return "lite3 nodes are shared or cyclic"
+    chk.node_budget -= 1
+    node = <const _Node *>(chk.buf + ofs)
+    if (node.gen_type & _NODE_TYPE_MASK) != tag:
+        return "lite3 node type mismatch"
+    kc = node.size_kc & _NODE_KEY_COUNT_MASK
+    if kc > _NODE_KEYS:
+        return "lite3 node key count out of range"
+    internal = node.child_ofs[0] != 0
+    # Only an empty container's root may hold no keys; the trusted iterator reads
+    # kv_ofs[0] of every other node it lands on.
+    if kc == 0 and (internal or height > 0):
+        return "lite3 node is empty"
+    if internal and height >= LITE3_TREE_HEIGHT_MAX:
+        return "lite3 tree is too tall"
+    count[0] += kc
+    for i in range(kc + 1):
+        if (node.child_ofs[i] != 0) != internal:
+            return "lite3 node children are inconsistent"
+        if internal:
+            err = _verify_node(chk, node.child_ofs[i], tag, height + 1, depth, count)
+            if err != NULL:
+                return err
+        if i < kc:
+            err = _verify_entry(chk, node.kv_ofs[i], tag == LITE3_TYPE_OBJECT, depth)
+            if err != NULL:
+                return err
+    return NULL
+
+
+cdef const char *_verify_container(_DeepCheck *chk, size_t ofs, int depth) noexcept nogil:
+    cdef uint32_t count = 0
+    cdef const char *err
+    if depth > _MAX_DEPTH:
+        return "lite3 document is nested too deeply"
+    err = _verify_node(chk, ofs, chk.buf[ofs], 0, depth, &count)
+    if err != NULL:
+        return err
+    if count != _trusted_count(chk.buf, ofs):
+        return "lite3 entry count mismatch"
+    return NULL
+
+
+cdef bint _immutable_buffer(object data):
+    # Only bytes can be trusted after `_verify_deep`: a read-only export (a
+    # `toreadonly()` view of a bytearray, an ACCESS_READ mmap, shared memory) may
+    # still be rewritten by its owner while proxies are alive.
+    if isinstance(data, memoryview):
+        data = (<memoryview>data).obj
+    return type(data) is bytes
+
+
+cdef const char *_verify_deep(const uint8_t *buf, size_t buflen, size_t ofs) noexcept nogil:
+    """
+    Check the root like `_check_root`, then every node, key and value below it.
+
+    Returns:
+        NULL if the whole document is readable, otherwise a static error message.
+    """
+    cdef _DeepCheck chk
+    cdef const char *err = _check_root(buf, buflen, ofs)
+    if err != NULL or (buf[ofs] != LITE3_TYPE_OBJECT and buf[ofs] != LITE3_TYPE_ARRAY):
+        return err
+    chk.buf = buf
+    chk.buflen = buflen
+    chk.node_budget = buflen // LITE3_NODE_SIZE
+    return _verify_container(&chk, ofs, 0)
+
+
+cdef object _json_fallback(object data, object json_loads, object cls, object object_hook,
+                           object parse_float, object parse_int, object parse_constant,
+                           object object_pairs_hook, dict kwargs):
+    # A custom decoder (e.g. orjson.loads) only receives the data; if any json.loads
+    # option is in play we stay on the stdlib decoder so those options are honoured.
+    if json_loads is not None and cls is None and object_hook is None and parse_float is None \
+            and parse_int is None and parse_constant is None and object_pairs_hook is None and not kwargs:
+        return json_loads(data)
+    return json.loads(data, cls=cls, object_hook=object_hook, parse_float=parse_float,
+                      parse_int=parse_int, parse_constant=parse_constant,
+                      object_pairs_hook=object_pairs_hook, **kwargs)
+
+
+def loads(data, *, bint recursive=False, str format="auto", json_loads=None, cls=None,
+          object_hook=None, parse_float=None, parse_int=None, parse_constant=None,
+          object_pairs_hook=None, type=None, str validate="root", **kwargs):
     """
     Load lite3 data with fallback to standard JSON.
     
     This function mimics `json.loads` but attempts to parse `data` as zero-copy `Lite3Object` first.
+
+    The input format is sniffed from its first byte without raising: JSON text can only
+    start with whitespace or `{["-0-9tfnNI`, while lite3 roots start with a type tag (0-7).
     
     Arguments:
         data: bytes-like object (lite3) or string/bytes (json).
         recursive (bool): If True, fully decode `Lite3Object` into Python dict/list/scalars 
                           immediately (default: False).
                           Ignored if fallback to JSON occurs (JSON always full decodes).
+        format (str): "auto" (default) sniffs the input, "lite3" requires lite3 and raises
+                      on anything else, "json" skips lite3 detection entirely.
+        json_loads (callable): Decoder used for JSON input instead of `json.loads`
+                               (e.g. `orjson.loads`). It receives only `data`; when any of the
+                               `json.loads` arguments below are given, `json.loads` is used.
+        type: Decode into this type instead (see `Lite3Object.decode_as`). JSON input is
+              converted to lite3 first, so the same checks apply.
+        validate (str): "root" (default) checks the root node only; every later access is
+                        bounds-checked by lite3. "deep" checks every node, key and value once
+                        with the GIL released; proxies over `bytes` that pass are
+                        trusted (see `Lite3Object.is_trusted`) and skip the per-access checks.
     
     Standard `json.loads` Arguments (Used ONLY during fallback):
         cls, object_hook, parse_float, parse_int, parse_constant, object_pairs_hook, **kwargs
@@ -538,111 +2117,340 @@ def loads(data, *, bint recursive=False, cls=None, object_hook=None, parse_float
     Returns:
         Lite3Object: If `data` is valid lite3 and `recursive` is False.
         dict/list/scalar: If `recursive` is True OR if fallback to `json.loads` occurs.
+        instance of `type`: If `type` is given.
     """
-    cdef size_t ofs
-    cdef size_t buflen
-    cdef const uint8_t *buf
-    cdef uint8_t tag
-    cdef uint32_t len32
+    global _loads_json_fallbacks
+    cdef Py_buffer pybuf
+    cdef const char *err = NULL
+    cdef bint deep
+    cdef bint trusted = False
+    cdef Lite3Object obj
 
-    # Try parsing as Lite3
-    try:
-        # Lite3Object expects bytes supports buffer protocol.
-        # Strings will fail here (TypeError/BufferError).
-        if isinstance(data, str):
-             raise TypeError("Lite3 requires bytes")
-             
-        obj = Lite3Object(data)
-        if not obj.is_valid:
-            # First byte didn't look like a valid type tag
-            raise ValueError("Invalid lite3 header")
+    if validate != "root" and validate != "deep":
+        raise ValueError(f"validate must be 'root' or 'deep', got {validate!r}")
+    deep = validate == "deep"
+    if format == "json":
+        result = _json_fallback(data, json_loads, cls, object_hook, parse_float, parse_int,
+                                parse_constant, object_pairs_hook, kwargs)
+        return result if type is None else _decode_python_typed(result, type)
+    if format != "auto" and format != "lite3":
+        raise ValueError(f"format must be 'auto', 'lite3' or 'json', got {format!r}")
 
-        # Verify buffer bounds early to avoid unsafe reads on malformed inputs.
-        #
-        # lite3 expects root-level object/array; for other tags we do minimal bounds checks.
-        ofs = obj._ofs
-        buflen = obj._len
-        buf = obj._ptr
-
-        if ofs >= buflen:
-            raise ValueError("Invalid lite3 offset")
-
-        tag = buf[ofs]
-        if tag == LITE3_TYPE_OBJECT:
-            if _lite3_verify_obj_get(<const unsigned char *>buf, buflen, ofs) < 0:
-                raise ValueError("Invalid lite3 object")
-        elif tag == LITE3_TYPE_ARRAY:
-            if _lite3_verify_arr_get(<const unsigned char *>buf, buflen, ofs) < 0:
-                raise ValueError("Invalid lite3 array")
-        elif tag == LITE3_TYPE_NULL:
-            pass
-        elif tag == LITE3_TYPE_BOOL:
-            if buflen - ofs < 2:
-                raise ValueError("Invalid lite3 bool")
-        elif tag == LITE3_TYPE_I64 or tag == LITE3_TYPE_F64:
-            if buflen - ofs < 1 + 8:
-                raise ValueError("Invalid lite3 number")
-        elif tag == LITE3_TYPE_BYTES:
-            if buflen - ofs < 1 + 4:
-                raise ValueError("Invalid lite3 bytes header")
-            len32 = 0
-            memcpy(&len32, <const void *>(buf + ofs + 1), 4)
-            if buflen - ofs < 1 + 4 + <size_t>len32:
-                raise ValueError("Invalid lite3 bytes length")
-        elif tag == LITE3_TYPE_STRING:
-            if buflen - ofs < 1 + 4:
-                raise ValueError("Invalid lite3 string header")
-            len32 = 0
-            memcpy(&len32, <const void *>(buf + ofs + 1), 4)
-            if len32 < 1:
-                raise ValueError("Invalid lite3 string length")
-            if buflen - ofs < 1 + 4 + <size_t>len32:
-                raise ValueError("Invalid lite3 string length")
-        else:
-            raise ValueError("Invalid lite3 type tag")
-             
+    if isinstance(data, str):
+        if format == "lite3":
+            raise TypeError("Lite3 requires bytes")
+        err = "Lite3 requires bytes"
+    elif not PyObject_CheckBuffer(data):
+        if format == "lite3":
+            raise TypeError(f"Lite3 requires a bytes-like object, got {data.__class__.__name__}")
+        err = "Lite3 requires bytes"
+    else:
+        PyObject_GetBuffer(data, &pybuf, PyBUF_SIMPLE)
+        try:
+            if pybuf.len > 0 and (<const uint8_t *>pybuf.buf)[0] <= LITE3_TYPE_ARRAY:
+                if deep:
+                    with nogil:
+                        err = _verify_deep(<const uint8_t *>pybuf.buf, <size_t>pybuf.len, 0)
+                    trusted = err == NULL and _immutable_buffer(data)
+                else:
+                    err = _check_root(<const uint8_t *>pybuf.buf, <size_t>pybuf.len, 0)
+            else:
+                err = "Invalid lite3 header"
+        finally:
+            PyBuffer_Release(&pybuf)
+
+    if err == NULL:
+        obj = Lite3Object(data)
+        obj._trusted = trusted
+        if type is not None:
+            return obj.decode_as(type)
         if recursive:
             return obj.to_python(object_hook=object_hook, parse_float=parse_float, 
                                  parse_int=parse_int, parse_constant=parse_constant,
                                  object_pairs_hook=object_pairs_hook)
         return obj
-    except (TypeError, ValueError, BufferError):
-        # Fallback to JSON
-        return json.loads(data, cls=cls, object_hook=object_hook, parse_float=parse_float,
-                          parse_int=parse_int, parse_constant=parse_constant,
-                          object_pairs_hook=object_pairs_hook, **kwargs)
+    if format == "lite3":
+        raise ValueError((<bytes>err).decode("ascii"))
 
-cdef int _dumps_recursive(unsigned char *ptr, size_t *used_len, size_t ofs, size_t bufsz, object obj, object default_fn) except -1:
-    cdef int ret = 0
-    cdef size_t new_ofs = 0
-    cdef const char* k_enc_ptr
-    cdef const char* v_str_ptr
-    cdef const unsigned char* v_bytes_ptr
-    cdef bytes k_encoded
-    cdef bytes v_encoded
-    
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            if not isinstance(k, str):
-                raise TypeError(f"Keys must be strings, got {type(k)}")
-            if "\x00" in k:
-                raise TypeError("Keys must not contain NUL bytes")
-            k_encoded = k.encode('utf-8')
-            k_enc_ptr = k_encoded
+    # Fallback to JSON
+    with _fallback_lock:
+        _loads_json_fallbacks += 1
+    result = _json_fallback(data, json_loads, cls, object_hook, parse_float, parse_int,
+                            parse_constant, object_pairs_hook, kwargs)
+    return result if type is None else _decode_python_typed(result, type)
 
-            if v is None:
-                ret = lite3_set_null(ptr, used_len, ofs, bufsz, k_enc_ptr)
-                _raise_lite3_write_error(ret, f"lite3 set failed for key {k}")
-            elif isinstance(v, bool):
-                ret = lite3_set_bool(ptr, used_len, ofs, bufsz, k_enc_ptr, v)
-                _raise_lite3_write_error(ret, f"lite3 set failed for key {k}")
-            elif isinstance(v, int):
-                ret = lite3_set_i64(ptr, used_len, ofs, bufsz, k_enc_ptr, v)
-                _raise_lite3_write_error(ret, f"lite3 set failed for key {k}")
-            elif isinstance(v, float):
-                ret = lite3_set_f64(ptr, used_len, ofs, bufsz, k_enc_ptr, v)
-                _raise_lite3_write_error(ret, f"lite3 set failed for key {k}")
-            elif isinstance(v, str):
+cdef class _BatchValidator:
+    """
+    Holds exported buffers for `loads_many()` so workers can validate them without the GIL.
+    """
+    cdef:
+        Py_buffer *views
+        const char **errors
+        char *held
+        Py_ssize_t n
+        Py_ssize_t acquired
+
+    def __cinit__(self, Py_ssize_t n):
+        self.views = <Py_buffer *>PyMem_Malloc(max(n, 1) * sizeof(Py_buffer))
+        self.errors = <const char **>PyMem_Malloc(max(n, 1) * sizeof(const char *))
+        self.held = <char *>PyMem_Malloc(max(n, 1))
+        if self.views == NULL or self.errors == NULL or self.held == NULL:
+            raise MemoryError()
+        self.n = n
+        self.acquired = 0
+
+    def __dealloc__(self):
+        cdef Py_ssize_t i
+        if self.views != NULL:
+            for i in range(self.acquired):
+                if self.held[i]:
+                    PyBuffer_Release(&self.views[i])
+            PyMem_Free(self.views)
+        PyMem_Free(self.errors)
+        PyMem_Free(self.held)
+
+    cdef int acquire(self, Py_ssize_t i, object data) except -1:
+        # Mark the slot empty first so __dealloc__ only releases real exports.
+        self.held[i] = 0
+        self.acquired = i + 1
+        self.errors[i] = NULL
+        if isinstance(data, str) or not PyObject_CheckBuffer(data):
+            self.errors[i] = "Lite3 requires a bytes-like object"
+            return 0
+        PyObject_GetBuffer(data, &self.views[i], PyBUF_SIMPLE)
+        self.held[i] = 1
+        return 0
+
+    def run(self, Py_ssize_t start, Py_ssize_t stop, bint deep=False):
+        cdef Py_ssize_t i
+        with nogil:
+            for i in range(start, stop):
+                if self.errors[i] != NULL:
+                    continue
+                if deep:
+                    self.errors[i] = _verify_deep(<const uint8_t *>self.views[i].buf,
+                                                  <size_t>self.views[i].len, 0)
+                else:
+                    self.errors[i] = _check_root(<const uint8_t *>self.views[i].buf,
+                                                 <size_t>self.views[i].len, 0)
+
+
+def loads_many(buffers, *, int workers=0, str errors="return", executor=None, str validate="root"):
+    """
+    Validate many lite3 buffers concurrently and return proxies.
+
+    Buffers are exported once with the GIL held, then validated in chunks on a thread
+    pool with the GIL released, so a batch of messages uses several cores.
+
+    Arguments:
+        buffers: Iterable of bytes-like objects.
+        workers (int): Number of threads (default: `os.cpu_count()`). `1` validates inline.
+        errors (str): "return" (default) puts an exception instance in place of each
+                      invalid item; "raise" raises `ValueError` for the first invalid item.
+        executor: Optional `concurrent.futures.Executor` to reuse instead of creating a pool.
+        validate (str): "root" (default) or "deep", as for `loads()`.
+
+    Returns:
+        list: One `Lite3Object` (or exception instance) per input buffer, in order.
+    """
+    cdef list items = list(buffers)
+    cdef Py_ssize_t n = len(items)
+    cdef Py_ssize_t i
+    cdef Py_ssize_t chunk
+    cdef _BatchValidator batch
+    cdef Lite3Object obj
+    cdef list out
+    cdef bint deep = validate == "deep"
+
+    if errors != "return" and errors != "raise":
+        raise ValueError(f"errors must be 'return' or 'raise', got {errors!r}")
+    if validate != "root" and validate != "deep":
+        raise ValueError(f"validate must be 'root' or 'deep', got {validate!r}")
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+
+    batch = _BatchValidator(n)
+    for i in range(n):
+        batch.acquire(i, items[i])
+
+    if workers == 1 or n < 2 * workers:
+        batch.run(0, n, deep)
+    else:
+        chunk = (n + workers - 1) // workers
+        if executor is not None:
+            futures = [executor.submit(batch.run, i, min(i + chunk, n), deep) for i in range(0, n, chunk)]
+            for f in futures:
+                f.result()
+        else:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                for _ in pool.map(lambda start: batch.run(start, min(start + chunk, n), deep),
+                                  range(0, n, chunk)):
+                    pass
+
+    out = []
+    for i in range(n):
+        if batch.errors[i] == NULL:
+            obj = Lite3Object(items[i])
+            obj._trusted = deep and _immutable_buffer(items[i])
+            out.append(obj)
+            continue
+        err = (<bytes>batch.errors[i]).decode("ascii")
+        if errors == "raise":
+            raise ValueError(f"Item {i}: {err}")
+        out.append(TypeError(err) if not batch.held[i] else ValueError(err))
+    return out
+
+
+# Record encoders: dataclass, NamedTuple and __slots__ instances are written as
+# lite3 objects through a per-class plan holding the attribute names and the
+# pre-encoded keys, so no intermediate dict is built per instance.
+cdef enum:
+    _ENC_ATTRS = 0       # dataclass: getattr by name
+    _ENC_TUPLE = 1       # NamedTuple: positional items
+    _ENC_SLOTS = 2       # __slots__ only: getattr by name, `default` takes precedence
+
+
+@cython.final
+cdef class _EncodePlan:
+    cdef int kind
+    cdef list attrs         # attribute names (mangled for private slots)
+    cdef list keys          # NUL-free UTF-8 key bytes, one per attribute
+    cdef Py_ssize_t n
+
+
+_ENCODE_PLANS = {}
+
+
+cdef list _slot_names(type tp):
+    # Only classes whose instances have no __dict__ anywhere in the MRO qualify.
+    names = []
+    for klass in reversed(tp.__mro__[:-1]):
+        slots = klass.__dict__.get("__slots__")
+        if slots is None:
+            return None
+        for name in ((slots,) if isinstance(slots, str) else slots):
+            if name in ("__dict__", "__weakref__"):
+                return None if name == "__dict__" else names
+            if name.startswith("__") and not name.endswith("__"):
+                names.append((f"_{klass.__name__.lstrip('_')}{name}", name))
+            else:
+                names.append((name, name))
+    return names
+
+
+cdef _EncodePlan _compile_encode_plan(type tp):
+    cdef _EncodePlan plan = _EncodePlan()
+    if dataclasses.is_dataclass(tp):
+        fields = [(f.name, f.name) for f in dataclasses.fields(tp)]
+        plan.kind = _ENC_ATTRS
+    elif issubclass(tp, tuple) and hasattr(tp, "_fields"):
+        fields = [(name, name) for name in tp._fields]
+        plan.kind = _ENC_TUPLE
+    else:
+        fields = _slot_names(tp) if "__slots__" in tp.__dict__ else None
+        if not fields:
+            return None
+        plan.kind = _ENC_SLOTS
+    plan.attrs = [attr for attr, _ in fields]
+    plan.keys = []
+    for _, key in fields:
+        if "\x00" in key:
+            raise TypeError("Keys must not contain NUL bytes")
+        plan.keys.append(key.encode("utf-8"))
+    plan.n = len(fields)
+    return plan
+
+
+cdef inline _EncodePlan _record_plan(object v, bint nt_obj, object default_fn):
+    # NamedTuples stay arrays unless `namedtuple_as_object` was requested, and
+    # slotted classes (e.g. Fraction, IPv4Address) go through `default` when given.
+    cdef type tp = type(v)
+    cdef _EncodePlan plan
+    if tp is list or tp is tuple or tp is dict:
+        return None
+    plan = _ENCODE_PLANS.get(tp)
+    if plan is None:
+        plan = _compile_encode_plan(tp)
+        if plan is None:
+            # Not cached, so unrelated types are not kept alive by the cache.
+            return None
+        with _plan_lock:
+            plan = _ENCODE_PLANS.setdefault(tp, plan)
+    if plan.kind == _ENC_TUPLE and not nt_obj:
+        return None
+    if plan.kind == _ENC_SLOTS and default_fn is not None:
+        return None
+    return plan
+
+
+cdef int _dumps_record(unsigned char *ptr, size_t *used_len, size_t ofs, size_t bufsz,
+                       object obj, _EncodePlan plan, object default_fn, bint nt_obj) except -1:
+    cdef Py_ssize_t i
+    for i in range(plan.n):
+        if plan.kind == _ENC_TUPLE:
+            v = (<tuple>obj)[i]
+        else:
+            try:
+                v = getattr(obj, <str>plan.attrs[i])
+            except AttributeError:
+                continue    # unset slot
+        _dumps_set_value(ptr, used_len, ofs, bufsz, <const char *>(<bytes>plan.keys[i]), v, default_fn, True, nt_obj)
+    return 0
+
+
+cdef int _dumps_record_value(unsigned char *ptr, size_t *used_len, size_t ofs, size_t bufsz, const char *key,
+                             object obj, _EncodePlan plan, object default_fn, bint nt_obj) except -1:
+    # Writes `obj` as a new object under `key`, or appends it when `key` is NULL.
+    cdef size_t new_ofs = 0
+    cdef int ret
+    if key == NULL:
+        ret = lite3_arr_append_obj(ptr, used_len, ofs, bufsz, &new_ofs)
+    else:
+        ret = lite3_set_obj(ptr, used_len, ofs, bufsz, key, &new_ofs)
+    _raise_lite3_write_error(ret, "lite3 set object failed")
+    return _dumps_record(ptr, used_len, new_ofs, bufsz, obj, plan, default_fn, nt_obj)
+
+
+cdef int _dumps_lite3(unsigned char *ptr, size_t *used_len, size_t ofs, size_t bufsz, const char *key, Lite3Object v) except -1:
+    # Nested proxies are copied natively from their buffer (no to_python()).
+    if v._type_cache > LITE3_TYPE_ARRAY or v._ofs >= v._len:
+        raise TypeError("Invalid Lite3Object value")
+    return _copy_value(v._ptr, v._len, v._ofs, ptr, used_len, ofs, bufsz, key, 1)
+
+
+cdef int _dumps_recursive(unsigned char *ptr, size_t *used_len, size_t ofs, size_t bufsz, object obj, object default_fn,
+                          bint nt_obj=False) except -1:
+    cdef int ret = 0
+    cdef size_t new_ofs = 0
+    cdef _EncodePlan plan
+    cdef const char* k_enc_ptr
+    cdef const char* v_str_ptr
+    cdef const unsigned char* v_bytes_ptr
+    cdef bytes k_encoded
+    cdef bytes v_encoded
+    
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            if not isinstance(k, str):
+                raise TypeError(f"Keys must be strings, got {type(k)}")
+            if "\x00" in k:
+                raise TypeError("Keys must not contain NUL bytes")
+            k_encoded = k.encode('utf-8')
+            k_enc_ptr = k_encoded
+
+            if v is None:
+                ret = lite3_set_null(ptr, used_len, ofs, bufsz, k_enc_ptr)
+                _raise_lite3_write_error(ret, f"lite3 set failed for key {k}")
+            elif isinstance(v, bool):
+                ret = lite3_set_bool(ptr, used_len, ofs, bufsz, k_enc_ptr, v)
+                _raise_lite3_write_error(ret, f"lite3 set failed for key {k}")
+            elif isinstance(v, int):
+                ret = lite3_set_i64(ptr, used_len, ofs, bufsz, k_enc_ptr, v)
+                _raise_lite3_write_error(ret, f"lite3 set failed for key {k}")
+            elif isinstance(v, float):
+                ret = lite3_set_f64(ptr, used_len, ofs, bufsz, k_enc_ptr, v)
+                _raise_lite3_write_error(ret, f"lite3 set failed for key {k}")
+            elif isinstance(v, str):
                 v_encoded = v.encode('utf-8')
                 v_str_ptr = v_encoded
                 ret = lite3_set_str(ptr, used_len, ofs, bufsz, k_enc_ptr, v_str_ptr)
@@ -651,14 +2459,18 @@ cdef int _dumps_recursive(unsigned char *ptr, size_t *used_len, size_t ofs, size
                 v_bytes_ptr = <const unsigned char*>v
                 ret = lite3_set_bytes(ptr, used_len, ofs, bufsz, k_enc_ptr, v_bytes_ptr, len(v))
                 _raise_lite3_write_error(ret, f"lite3 set failed for key {k}")
+            elif isinstance(v, Lite3Object):
+                _dumps_lite3(ptr, used_len, ofs, bufsz, k_enc_ptr, <Lite3Object>v)
             elif isinstance(v, dict):
                 ret = lite3_set_obj(ptr, used_len, ofs, bufsz, k_enc_ptr, &new_ofs)
                 _raise_lite3_write_error(ret, f"lite3 set object failed for key {k}")
-                _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn)
+                _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn, nt_obj)
+            elif (plan := _record_plan(v, nt_obj, default_fn)) is not None:
+                _dumps_record_value(ptr, used_len, ofs, bufsz, k_enc_ptr, v, plan, default_fn, nt_obj)
             elif isinstance(v, (list, tuple)):
                 ret = lite3_set_arr(ptr, used_len, ofs, bufsz, k_enc_ptr, &new_ofs)
                 _raise_lite3_write_error(ret, f"lite3 set array failed for key {k}")
-                _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn)
+                _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn, nt_obj)
             else:
                  # Try default hook
                  if default_fn is not None:
@@ -676,7 +2488,7 @@ cdef int _dumps_recursive(unsigned char *ptr, size_t *used_len, size_t ofs, size
                          # Let's recursive call a helper that does "set value at key".
                          # But we are inside the 'dict' loop. 
                          # Let's try to handle 'new_v' with same logic.
-                         _dumps_set_value(ptr, used_len, ofs, bufsz, k_enc_ptr, new_v, default_fn)
+                         _dumps_set_value(ptr, used_len, ofs, bufsz, k_enc_ptr, new_v, default_fn, False, nt_obj)
                      except Exception:
                          raise TypeError(f"Object of type {type(v).__name__} is not JSON serializable")
                  else:
@@ -706,20 +2518,24 @@ cdef int _dumps_recursive(unsigned char *ptr, size_t *used_len, size_t ofs, size
                 v_bytes_ptr = <const unsigned char*>v
                 ret = lite3_arr_append_bytes(ptr, used_len, ofs, bufsz, v_bytes_ptr, len(v))
                 _raise_lite3_write_error(ret, "lite3 append failed")
+            elif isinstance(v, Lite3Object):
+                _dumps_lite3(ptr, used_len, ofs, bufsz, NULL, <Lite3Object>v)
             elif isinstance(v, dict):
                 ret = lite3_arr_append_obj(ptr, used_len, ofs, bufsz, &new_ofs)
                 _raise_lite3_write_error(ret, "lite3 append failed")
-                _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn)
+                _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn, nt_obj)
+            elif (plan := _record_plan(v, nt_obj, default_fn)) is not None:
+                _dumps_record_value(ptr, used_len, ofs, bufsz, NULL, v, plan, default_fn, nt_obj)
             elif isinstance(v, (list, tuple)):
                 ret = lite3_arr_append_arr(ptr, used_len, ofs, bufsz, &new_ofs)
                 _raise_lite3_write_error(ret, "lite3 append failed")
-                _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn)
+                _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn, nt_obj)
             else:
                  # Try default hook
                  if default_fn is not None:
                      try:
                          new_v = default_fn(v)
-                         _dumps_append_value(ptr, used_len, ofs, bufsz, new_v, default_fn)
+                         _dumps_append_value(ptr, used_len, ofs, bufsz, new_v, default_fn, nt_obj)
                      except Exception:
                           raise TypeError(f"Object of type {type(v).__name__} is not JSON serializable")
                  else:
@@ -727,9 +2543,11 @@ cdef int _dumps_recursive(unsigned char *ptr, size_t *used_len, size_t ofs, size
     
     return 0
 
-cdef int _dumps_set_value(unsigned char *ptr, size_t *used_len, size_t ofs, size_t bufsz, const char* k_enc_ptr, object v, object default_fn) except -1:
+cdef int _dumps_set_value(unsigned char *ptr, size_t *used_len, size_t ofs, size_t bufsz, const char* k_enc_ptr, object v, object default_fn,
+                          bint apply_default=False, bint nt_obj=False) except -1:
     cdef int ret = 0
     cdef size_t new_ofs = 0
+    cdef _EncodePlan plan
     cdef bytes v_encoded
     cdef const char* v_str_ptr
     cdef const unsigned char* v_bytes_ptr
@@ -755,33 +2573,36 @@ cdef int _dumps_set_value(unsigned char *ptr, size_t *used_len, size_t ofs, size
         v_bytes_ptr = <const unsigned char*>v
         ret = lite3_set_bytes(ptr, used_len, ofs, bufsz, k_enc_ptr, v_bytes_ptr, len(v))
         _raise_lite3_write_error(ret, "lite3 set failed")
+    elif isinstance(v, Lite3Object):
+        _dumps_lite3(ptr, used_len, ofs, bufsz, k_enc_ptr, <Lite3Object>v)
     elif isinstance(v, dict):
         ret = lite3_set_obj(ptr, used_len, ofs, bufsz, k_enc_ptr, &new_ofs)
         _raise_lite3_write_error(ret, "lite3 set failed")
-        _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn)
+        _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn, nt_obj)
+    elif (plan := _record_plan(v, nt_obj, default_fn)) is not None:
+        _dumps_record_value(ptr, used_len, ofs, bufsz, k_enc_ptr, v, plan, default_fn, nt_obj)
     elif isinstance(v, (list, tuple)):
         ret = lite3_set_arr(ptr, used_len, ofs, bufsz, k_enc_ptr, &new_ofs)
         _raise_lite3_write_error(ret, "lite3 set failed")
-        _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn)
+        _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn, nt_obj)
+    elif apply_default and default_fn is not None:
+        # Record fields get the `default` hook like dict values do.
+        try:
+            new_v = default_fn(v)
+            _dumps_set_value(ptr, used_len, ofs, bufsz, k_enc_ptr, new_v, default_fn, False, nt_obj)
+        except Exception:
+            raise TypeError(f"Object of type {type(v).__name__} is not JSON serializable")
     else:
-        # If we are here recursively (from default hook), we don't recurse default hook again?
-        # Standard json recurses default hook results too?
-        # Yes, "If specified, default is a function... that returns a serializable version"
-        # It doesn't say if it recurses. Usually it operates on the result.
-        # But if the result is ALSO unknown, does it call default again?
-        # "If the return value is not JSON serializable, a TypeError is raised."
-        # So we don't loop default calls.
-        if default_fn is not None:
-             # But we are effectively calling this from a context where we already tried.
-             # If we call _dumps_set_value from _dumps_recursive, we already tried default logic there.
-             # Wait, `_dumps_recursive` calls `_dumps_set_value` ONLY IF IT WAS A DEFAULT CALL.
-             # No, I should structure it so `_dumps_recursive` calls `_dumps_set_value` for EVERYTHING.
-             pass
+        # Reached with the result of a `default` hook (or a patch value); the hook is
+        # not applied again, matching json.dumps.
+        raise TypeError(f"Object of type {type(v).__name__} is not JSON serializable")
     return ret
 
-cdef int _dumps_append_value(unsigned char *ptr, size_t *used_len, size_t ofs, size_t bufsz, object v, object default_fn) except -1:
+cdef int _dumps_append_value(unsigned char *ptr, size_t *used_len, size_t ofs, size_t bufsz, object v, object default_fn,
+                             bint nt_obj=False) except -1:
     cdef int ret = 0
     cdef size_t new_ofs = 0
+    cdef _EncodePlan plan
     cdef bytes v_encoded
     cdef const char* v_str_ptr
     cdef const unsigned char* v_bytes_ptr
@@ -807,20 +2628,24 @@ cdef int _dumps_append_value(unsigned char *ptr, size_t *used_len, size_t ofs, s
         v_bytes_ptr = <const unsigned char*>v
         ret = lite3_arr_append_bytes(ptr, used_len, ofs, bufsz, v_bytes_ptr, len(v))
         _raise_lite3_write_error(ret, "lite3 append failed")
+    elif isinstance(v, Lite3Object):
+        _dumps_lite3(ptr, used_len, ofs, bufsz, NULL, <Lite3Object>v)
     elif isinstance(v, dict):
         ret = lite3_arr_append_obj(ptr, used_len, ofs, bufsz, &new_ofs)
         _raise_lite3_write_error(ret, "lite3 append failed")
-        _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn)
+        _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn, nt_obj)
+    elif (plan := _record_plan(v, nt_obj, default_fn)) is not None:
+        _dumps_record_value(ptr, used_len, ofs, bufsz, NULL, v, plan, default_fn, nt_obj)
     elif isinstance(v, (list, tuple)):
         ret = lite3_arr_append_arr(ptr, used_len, ofs, bufsz, &new_ofs)
         _raise_lite3_write_error(ret, "lite3 append failed")
-        _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn)
+        _dumps_recursive(ptr, used_len, new_ofs, bufsz, v, default_fn, nt_obj)
     else:
          # Try default hook
          if default_fn is not None:
              try:
                  new_v = default_fn(v)
-                 _dumps_append_value(ptr, used_len, ofs, bufsz, new_v, default_fn)
+                 _dumps_append_value(ptr, used_len, ofs, bufsz, new_v, default_fn, nt_obj)
              except Exception:
                   raise TypeError(f"Object of type {type(v).__name__} is not JSON serializable")
          else:
@@ -830,9 +2655,52 @@ cdef int _dumps_append_value(unsigned char *ptr, size_t *used_len, size_t ofs, s
 
 
 
+cdef int _dumps_root(unsigned char *ptr, size_t *used_len, size_t bufsz, object obj, object default_fn,
+                     bint nt_obj=False) except -1:
+    # Encode `obj` as a complete document at the start of `ptr`.
+    cdef _EncodePlan plan
+    cdef int ret
+    if isinstance(obj, dict):
+        if lite3_init_obj(ptr, used_len, bufsz) < 0:
+            raise RuntimeError("Failed to init object")
+        _dumps_recursive(ptr, used_len, 0, bufsz, obj, default_fn, nt_obj)
+    elif isinstance(obj, Lite3Object) and (<Lite3Object>obj)._type_cache in (LITE3_TYPE_OBJECT, LITE3_TYPE_ARRAY):
+        # Re-emit a (possibly nested) proxy as a standalone document.
+        if (<Lite3Object>obj)._type_cache == LITE3_TYPE_OBJECT:
+            ret = lite3_init_obj(ptr, used_len, bufsz)
+        else:
+            ret = lite3_init_arr(ptr, used_len, bufsz)
+        if ret < 0:
+            raise RuntimeError("Failed to init root")
+        _copy_entries((<Lite3Object>obj)._ptr, (<Lite3Object>obj)._len, (<Lite3Object>obj)._ofs,
+                      ptr, used_len, 0, bufsz, 1)
+    elif (plan := _record_plan(obj, nt_obj, default_fn)) is not None:
+        if lite3_init_obj(ptr, used_len, bufsz) < 0:
+            raise RuntimeError("Failed to init object")
+        _dumps_record(ptr, used_len, 0, bufsz, obj, plan, default_fn, nt_obj)
+    elif isinstance(obj, (list, tuple)):
+        if lite3_init_arr(ptr, used_len, bufsz) < 0:
+            raise RuntimeError("Failed to init array")
+        _dumps_recursive(ptr, used_len, 0, bufsz, obj, default_fn, nt_obj)
+    else:
+        raise TypeError("Root object must be dict or list")
+    return 0
+
+
+cdef object _namedtuples_as_dicts(object obj):
+    # JSON fallback for `namedtuple_as_object=True`, so both outputs have one shape.
+    if isinstance(obj, tuple) and hasattr(type(obj), "_fields"):
+        return {k: _namedtuples_as_dicts(v) for k, v in zip(type(obj)._fields, obj)}
+    if isinstance(obj, dict):
+        return {k: _namedtuples_as_dicts(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_namedtuples_as_dicts(v) for v in obj]
+    return obj
+
+
 def dumps(obj, *, skipkeys=False, ensure_ascii=True, check_circular=True,
           allow_nan=True, cls=None, indent=None, separators=None,
-          default=None, sort_keys=False, fallback="json", **kwargs):
+          default=None, sort_keys=False, fallback="json", bint namedtuple_as_object=False, **kwargs):
     """
     Serialize to lite3 bytes, falling back to JSON string if failed.
     
@@ -841,13 +2709,17 @@ def dumps(obj, *, skipkeys=False, ensure_ascii=True, check_circular=True,
     
     Arguments:
         obj: The Python object to serialize.
+        namedtuple_as_object (bool): Encode NamedTuples as objects keyed by field name
+                                     (also in the JSON fallback) instead of arrays.
         
     Standard `json.dumps` Arguments (Used ONLY during fallback):
         skipkeys, ensure_ascii, check_circular, allow_nan, cls, indent,
         separators, default, sort_keys, **kwargs
         
     Note:
-        Native `lite3` serialization currently supports: dict, list, tuple, str, int, float, bool, None, bytes.
+        Native `lite3` serialization currently supports: dict, list, tuple, str, int, float, bool, None, bytes,
+        and dataclass / `__slots__` instances (encoded as objects by a per-class plan;
+        `default`, when given, takes precedence for `__slots__`-only classes).
         It does NOT support `skipkeys`, `indent`, `canonical` (sort_keys), or `default` serializers natively yet.
         Passing these arguments effectively forces them to be ignored UNLESS fallback occurs.
     
@@ -855,6 +2727,7 @@ def dumps(obj, *, skipkeys=False, ensure_ascii=True, check_circular=True,
         bytes: If `lite3` serialization succeeds.
         str: If fallback to `json.dumps` occurs.
     """
+    global _dumps_json_fallbacks
     cdef size_t bufsz = 64 * 1024
     cdef size_t used_len = 0
     cdef size_t max_bufsz = 1024 * 1024 * 512
@@ -867,17 +2740,7 @@ def dumps(obj, *, skipkeys=False, ensure_ascii=True, check_circular=True,
         used_len = 0
 
         try:
-            if isinstance(obj, dict):
-                if lite3_init_obj(ptr, &used_len, bufsz) < 0:
-                    raise RuntimeError("Failed to init object")
-                _dumps_recursive(ptr, &used_len, 0, bufsz, obj, default)
-            elif isinstance(obj, (list, tuple)):
-                if lite3_init_arr(ptr, &used_len, bufsz) < 0:
-                    raise RuntimeError("Failed to init array")
-                _dumps_recursive(ptr, &used_len, 0, bufsz, obj, default)
-            else:
-                raise TypeError("Root object must be dict or list")
-
+            _dumps_root(ptr, &used_len, bufsz, obj, default, namedtuple_as_object)
             return bytes(buf[:used_len])
         except BufferError:
             if bufsz >= max_bufsz:
@@ -887,8 +2750,10 @@ def dumps(obj, *, skipkeys=False, ensure_ascii=True, check_circular=True,
             # Fallback to JSON
             if fallback != "json":
                 raise
+            with _fallback_lock:
+                _dumps_json_fallbacks += 1
             return json.dumps(
-                obj,
+                _namedtuples_as_dicts(obj) if namedtuple_as_object else obj,
                 skipkeys=skipkeys,
                 ensure_ascii=ensure_ascii,
                 check_circular=check_circular,
@@ -901,5 +2766,2438 @@ def dumps(obj, *, skipkeys=False, ensure_ascii=True, check_circular=True,
                 **kwargs,
             )
 
+
+# Framed layout used by `dumps_many(framed=True)` / `iter_framed()`: every document
+# is preceded by its length as a little-endian u32 and followed by zero padding up
+# to a 4-byte boundary, so each payload stays aligned for zero-copy reads.
+cdef enum:
+    _FRAME_HEADER = 4
+    _ARENA_SLACK = 256      # minimum free space before attempting a document
+
+
+cdef size_t _grow_arena(bytearray arena, size_t cap, size_t max_cap) except 0:
+    # Double the arena; the new tail is zeroed like a fresh dumps() buffer.
+    cdef size_t new_cap
+    if cap >= max_cap:
+        raise BufferError("lite3 arena too large")
+    new_cap = cap * 2 if cap < max_cap // 2 else max_cap
+    PyByteArray_Resize(arena, new_cap)
+    memset(<unsigned char *>PyByteArray_AS_STRING(arena) + cap, 0, new_cap - cap)
+    return new_cap
+
+
+def dumps_many(objs, *, bint framed=False, default=None, bint namedtuple_as_object=False):
+    """
+    Serialize many documents back to back into one contiguous buffer.
+
+    All documents share a single growable arena: no per-document allocation,
+    zero-fill or trimming copy. Each document starts on a 4-byte boundary (zero
+    padding in between), so slices of the arena are valid lite3 buffers.
+
+    Arguments:
+        objs: Iterable of values accepted by `dumps()` as a root.
+        framed (bool): Prefix every document with its length (u32, little-endian),
+                       readable with `iter_framed()`.
+        default (callable): Same as `dumps(default=...)`.
+        namedtuple_as_object (bool): Same as `dumps(namedtuple_as_object=...)`.
+
+    Returns:
+        tuple: `(buffer, offsets)` where `buffer` is a `bytearray` and `offsets` is an
+        `array('Q')` of `n + 1` boundaries: document (or frame) `i` occupies
+        `buffer[offsets[i]:offsets[i + 1]]`, padding included.
+
+    Raises:
+        TypeError/ValueError: If a document cannot be encoded natively (there is no
+        JSON fallback).
+    """
+    cdef size_t cap = 64 * 1024
+    cdef size_t max_cap = 0xFFFFFFFF
+    cdef size_t pos = 0
+    cdef size_t used_len
+    cdef size_t header = _FRAME_HEADER if framed else 0
+    cdef size_t end, pad
+    cdef unsigned char *base
+    cdef bytearray arena = bytearray(cap)
+    cdef carray.array offsets = carray.array("Q")
+    cdef Py_ssize_t n = 0
+
+    for obj in objs:
+        carray.resize_smart(offsets, n + 1)
+        offsets.data.as_ulonglongs[n] = pos
+        n += 1
+        while True:
+            if cap - pos < header + _ARENA_SLACK:
+                cap = _grow_arena(arena, cap, max_cap)
+            base = <unsigned char *>PyByteArray_AS_STRING(arena)
+            used_len = 0
+            try:
+                # Reserve room for the alignment padding after the document.
+                _dumps_root(base + pos + header, &used_len, cap - pos - header - 3, obj, default,
+                            namedtuple_as_object)
+                break
+            except BufferError:
+                # Wipe the partial attempt: the writer skips alignment bytes, and the
+                # output should match dumps() byte for byte.
+                memset(base + pos, 0, cap - pos)
+                cap = _grow_arena(arena, cap, max_cap)
+        if framed:
+            base[pos] = used_len & 0xFF
+            base[pos + 1] = (used_len >> 8) & 0xFF
+            base[pos + 2] = (used_len >> 16) & 0xFF
+            base[pos + 3] = (used_len >> 24) & 0xFF
+        end = pos + header + used_len
+        pad = (-end) & 3
+        memset(base + end, 0, pad)
+        pos = end + pad
+
+    carray.resize_smart(offsets, n + 1)
+    offsets.data.as_ulonglongs[n] = pos
+    PyByteArray_Resize(arena, pos)
+    return arena, offsets
+
+
+def iter_framed(data):
+    """
+    Iterate over the documents of a framed buffer produced by `dumps_many(framed=True)`.
+
+    Yields validated `Lite3Object` proxies that point into `data` (zero-copy).
+
+    Raises:
+        ValueError: If a frame is truncated or does not hold a valid lite3 document.
+    """
+    cdef size_t pos = 0
+    cdef size_t size, length
+    view = memoryview(data).cast("B")
+    size = view.nbytes
+    while pos < size:
+        if size - pos < _FRAME_HEADER:
+            raise ValueError(f"Truncated frame header at offset {pos}")
+        header = view[pos:pos + _FRAME_HEADER]
+        length = int.from_bytes(header, "little")
+        if length > size - pos - _FRAME_HEADER:
+            raise ValueError(f"Truncated frame at offset {pos}")
+        yield loads(view[pos + _FRAME_HEADER:pos + _FRAME_HEADER + length], format="lite3")
+        pos += _FRAME_HEADER + length
+        pos += (-pos) & 3
+
+
+# ---------------------------------------------------------------------------
+# Native JSON -> lite3 transcoder.
+#
+# A small recursive-descent JSON parser that writes every value straight into a
+# lite3 buffer through the writer API, without building Python objects.
+# ---------------------------------------------------------------------------
+
+cdef struct _JsonReader:
+    const char *s
+    size_t n
+    size_t pos
+    char *kbuf          # scratch for unescaped keys (must be NUL-terminated)
+    size_t kcap
+    char *vbuf          # scratch for unescaped string values
+    size_t vcap
+
+
+cdef struct _Lite3Writer:
+    unsigned char *buf
+    size_t *used
+    size_t bufsz
+
+
+cdef int _jr_error(_JsonReader *r, str msg) except -1:
+    raise ValueError(f"{msg} at position {r.pos}")
+
+
+cdef inline void _jr_skip_ws(_JsonReader *r) noexcept:
+    cdef char c
+    while r.pos < r.n:
+        c = r.s[r.pos]
+        if c == b' ' or c == b'\n' or c == b'\r' or c == b'\t':
+            r.pos += 1
+        else:
+            break
+
+
+cdef inline int _jr_expect_literal(_JsonReader *r, const char *lit, size_t n) except -1:
+    if r.n - r.pos < n or memcmp(r.s + r.pos, lit, n) != 0:
+        _jr_error(r, "Invalid JSON literal")
+    r.pos += n
+    return 0
+
+
+cdef int _scratch_reserve(char **buf, size_t *cap, size_t need) except -1:
+    cdef size_t new_cap
+    cdef char *new_buf
+    if need <= cap[0]:
+        return 0
+    new_cap = cap[0] * 2 if cap[0] else 256
+    while new_cap < need:
+        new_cap *= 2
+    new_buf = <char *>PyMem_Realloc(buf[0], new_cap)
+    if new_buf == NULL:
+        raise MemoryError()
+    buf[0] = new_buf
+    cap[0] = new_cap
+    return 0
+
+
+cdef inline int _jr_hex4(_JsonReader *r, uint32_t *out) except -1:
+    cdef uint32_t v = 0
+    cdef size_t i
+    cdef char c
+    if r.n - r.pos < 4:
+        _jr_error(r, "Invalid \\uXXXX escape")
+    for i in range(4):
+        c = r.s[r.pos + i]
+        v <<= 4
+        if b'0' <= c <= b'9':
+            v |= <uint32_t>(c - c'0')
+        elif b'a' <= c <= b'f':
+            v |= <uint32_t>(c - c'a' + 10)
+        elif b'A' <= c <= b'F':
+            v |= <uint32_t>(c - c'A' + 10)
+        else:
+            _jr_error(r, "Invalid \\uXXXX escape")
+    r.pos += 4
+    out[0] = v
+    return 0
+
+
+cdef inline size_t _utf8_encode(char *out, uint32_t cp) noexcept:
+    if cp < 0x80:
+        out[0] = <char>cp
+        return 1
+    if cp < 0x800:
+        out[0] = <char>(0xC0 | (cp >> 6))
+        out[1] = <char>(0x80 | (cp & 0x3F))
+        return 2
+    if cp < 0x10000:
+        out[0] = <char>(0xE0 | (cp >> 12))
+        out[1] = <char>(0x80 | ((cp >> 6) & 0x3F))
+        out[2] = <char>(0x80 | (cp & 0x3F))
+        return 3
+    out[0] = <char>(0xF0 | (cp >> 18))
+    out[1] = <char>(0x80 | ((cp >> 12) & 0x3F))
+    out[2] = <char>(0x80 | ((cp >> 6) & 0x3F))
+    out[3] = <char>(0x80 | (cp & 0x3F))
+    return 4
+
+
+cdef inline size_t _utf8_seq_len(const unsigned char *p, size_t avail) noexcept:
+    """Length of the well-formed UTF-8 sequence at `p`, or 0 if malformed."""
+    cdef unsigned char c = p[0]
+    cdef size_t n
+    cdef size_t i
+    if c < 0xC2:
+        return 0
+    elif c < 0xE0:
+        n = 2
+    elif c < 0xF0:
+        n = 3
+    elif c < 0xF5:
+        n = 4
+    else:
+        return 0
+    if avail < n:
+        return 0
+    for i in range(1, n):
+        if (p[i] & 0xC0) != 0x80:
+            return 0
+    if c == 0xE0 and p[1] < 0xA0:
+        return 0
+    if c == 0xED and p[1] >= 0xA0:
+        return 0
+    if c == 0xF0 and p[1] < 0x90:
+        return 0
+    if c == 0xF4 and p[1] >= 0x90:
+        return 0
+    return n
+
+
+cdef int _jr_string(_JsonReader *r, bint is_key, const char **out, size_t *out_len) except -1:
+    """
+    Parse a JSON string starting at the opening quote.
+
+    Unescaped values are returned as a pointer into the input; keys and escaped
+    strings are decoded into the reader's scratch buffers (keys are NUL-terminated).
+    """
+    cdef size_t start = r.pos + 1
+    cdef size_t i = start
+    cdef size_t seq
+    cdef unsigned char c
+    cdef bint escaped = False
+    cdef char **scratch
+    cdef size_t *cap
+    cdef size_t w = 0
+    cdef uint32_t cp
+    cdef uint32_t lo
+    cdef size_t esc
+
+    while True:
+        if i >= r.n:
+            r.pos = start - 1
+            _jr_error(r, "Unterminated string")
+        c = <unsigned char>r.s[i]
+        if c == b'"':
+            break
+        if c == b'\\':
+            escaped = True
+            i += 2
+            continue
+        if c < 0x20:
+            r.pos = i
+            _jr_error(r, "Invalid control character in string")
+        if c >= 0x80:
+            seq = _utf8_seq_len(<const unsigned char *>r.s + i, r.n - i)
+            if seq == 0:
+                r.pos = i
+                _jr_error(r, "Invalid UTF-8 in string")
+            i += seq
+            continue
+        i += 1
+
+    if not escaped and not is_key:
+        out[0] = r.s + start
+        out_len[0] = i - start
+        r.pos = i + 1
+        return 0
+
+    if is_key:
+        scratch = &r.kbuf
+        cap = &r.kcap
+    else:
+        scratch = &r.vbuf
+        cap = &r.vcap
+    # Decoded text is never longer than the escaped source (+1 for the NUL terminator).
+    _scratch_reserve(scratch, cap, i - start + 1)
+
+    r.pos = start
+    while r.pos < i:
+        c = <unsigned char>r.s[r.pos]
+        if c != b'\\':
+            scratch[0][w] = <char>c
+            w += 1
+            r.pos += 1
+            continue
+        r.pos += 1
+        c = <unsigned char>r.s[r.pos]
+        r.pos += 1
+        if c == b'"' or c == b'\\' or c == b'/':
+            scratch[0][w] = <char>c
+        elif c == b'n':
+            scratch[0][w] = b'\n'
+        elif c == b't':
+            scratch[0][w] = b'\t'
+        elif c == b'r':
+            scratch[0][w] = b'\r'
+        elif c == b'b':
+            scratch[0][w] = 0x08
+        elif c == b'f':
+            scratch[0][w] = 0x0C
+        elif c == b'u':
+            esc = r.pos - 2
+            _jr_hex4(r, &cp)
+            if 0xD800 <= cp < 0xE000:
+                # Only a high + low pair is valid; a lone surrogate has no UTF-8 form.
+                lo = 0
+                if cp < 0xDC00 and r.n - r.pos >= 6 and r.s[r.pos] == b'\\' and r.s[r.pos + 1] == b'u':
+                    r.pos += 2
+                    _jr_hex4(r, &lo)
+                if not 0xDC00 <= lo < 0xE000:
+                    r.pos = esc
+                    _jr_error(r, "Unpaired surrogate in string")
+                cp = 0x10000 + ((cp - 0xD800) << 10) + (lo - 0xDC00)
+            if is_key and cp == 0:
+                _jr_error(r, "Keys must not contain NUL bytes")
+            w += _utf8_encode(scratch[0] + w, cp)
+            continue
+        else:
+            r.pos -= 2
+            _jr_error(r, "Invalid escape")
+        w += 1
+
+    r.pos = i + 1
+    scratch[0][w] = 0
+    out[0] = scratch[0]
+    out_len[0] = w
+    return 0
+
+
+cdef int _jr_number(_JsonReader *r, _Lite3Writer *wr, size_t ofs, const char *key) except -1:
+    cdef size_t start = r.pos
+    cdef bint is_float = False
+    cdef bint neg = False
+    cdef uint64_t acc = 0
+    cdef uint64_t limit
+    cdef uint64_t digit
+    cdef int64_t iv
+    cdef double dv
+    cdef char local[64]
+    cdef char *tok
+    cdef size_t tok_len
+    cdef char *end_ptr = NULL
+    cdef size_t i
+    cdef int ret
+
+    if r.s[r.pos] == b'-':
+        neg = True
+        r.pos += 1
+    if r.pos < r.n and r.s[r.pos] == b'I':
+        _jr_expect_literal(r, b"Infinity", 8)
+        dv = -INFINITY if neg else INFINITY
+        return _jw_f64(wr, ofs, key, dv)
+    if r.pos >= r.n or not (b'0' <= r.s[r.pos] <= b'9'):
+        _jr_error(r, "Invalid number")
+    if r.s[r.pos] == b'0':
+        r.pos += 1
+    else:
+        while r.pos < r.n and b'0' <= r.s[r.pos] <= b'9':
+            r.pos += 1
+    if r.pos < r.n and r.s[r.pos] == b'.':
+        is_float = True
+        r.pos += 1
+        if r.pos >= r.n or not (b'0' <= r.s[r.pos] <= b'9'):
+            _jr_error(r, "Invalid number")
+        while r.pos < r.n and b'0' <= r.s[r.pos] <= b'9':
+            r.pos += 1
+    if r.pos < r.n and (r.s[r.pos] == b'e' or r.s[r.pos] == b'E'):
+        is_float = True
+        r.pos += 1
+        if r.pos < r.n and (r.s[r.pos] == b'+' or r.s[r.pos] == b'-'):
+            r.pos += 1
+        if r.pos >= r.n or not (b'0' <= r.s[r.pos] <= b'9'):
+            _jr_error(r, "Invalid number")
+        while r.pos < r.n and b'0' <= r.s[r.pos] <= b'9':
+            r.pos += 1
+
+    if not is_float:
+        limit = <uint64_t>9223372036854775808ULL if neg else <uint64_t>9223372036854775807ULL
+        for i in range(start + neg, r.pos):
+            digit = <uint64_t>(r.s[i] - c'0')
+            if acc > (limit - digit) // 10:
+                r.pos = start
+                raise OverflowError(f"JSON integer out of range for lite3 int64 at position {start}")
+            acc = acc * 10 + digit
+        iv = <int64_t>(0 - acc) if neg else <int64_t>acc
+        if key != NULL:
+            ret = lite3_set_i64(wr.buf, wr.used, ofs, wr.bufsz, key, iv)
+        else:
+            ret = lite3_arr_append_i64(wr.buf, wr.used, ofs, wr.bufsz, iv)
+        _raise_lite3_write_error(ret, "lite3 write failed")
+        return 0
+
+    # Copy the (already validated) token so the float parser sees a NUL-terminated string.
+    tok_len = r.pos - start
+    if tok_len < sizeof(local):
+        tok = local
+    else:
+        _scratch_reserve(&r.vbuf, &r.vcap, tok_len + 1)
+        tok = r.vbuf
+    memcpy(tok, r.s + start, tok_len)
+    tok[tok_len] = 0
+    dv = PyOS_string_to_double(tok, &end_ptr, NULL)
+    return _jw_f64(wr, ofs, key, dv)
+
+
+cdef inline int _jw_f64(_Lite3Writer *wr, size_t ofs, const char *key, double dv) except -1:
+    cdef int ret
+    if key != NULL:
+        ret = lite3_set_f64(wr.buf, wr.used, ofs, wr.bufsz, key, dv)
+    else:
+        ret = lite3_arr_append_f64(wr.buf, wr.used, ofs, wr.bufsz, dv)
+    _raise_lite3_write_error(ret, "lite3 write failed")
+    return 0
+
+
+cdef int _jr_container(_JsonReader *r, _Lite3Writer *wr, size_t ofs, bint is_object, int depth) except -1:
+    """Parse the members of the object/array whose opening bracket was just consumed."""
+    cdef const char *k
+    cdef size_t k_len
+    cdef char close = b'}' if is_object else b']'
+
+    if depth > _MAX_DEPTH:
+        _jr_error(r, "JSON nesting too deep")
+    _jr_skip_ws(r)
+    if r.pos < r.n and r.s[r.pos] == close:
+        r.pos += 1
+        return 0
+    while True:
+        _jr_skip_ws(r)
+        if is_object:
+            if r.pos >= r.n or r.s[r.pos] != b'"':
+                _jr_error(r, "Expecting property name enclosed in double quotes")
+            _jr_string(r, True, &k, &k_len)
+            _jr_skip_ws(r)
+            if r.pos >= r.n or r.s[r.pos] != b':':
+                _jr_error(r, "Expecting ':' delimiter")
+            r.pos += 1
+            _jr_skip_ws(r)
+            _jr_value(r, wr, ofs, k, depth)
+        else:
+            _jr_value(r, wr, ofs, NULL, depth)
+        _jr_skip_ws(r)
+        if r.pos >= r.n:
+            _jr_error(r, "Unterminated container")
+        if r.s[r.pos] == b',':
+            r.pos += 1
+            continue
+        if r.s[r.pos] == close:
+            r.pos += 1
+            return 0
+        _jr_error(r, "Expecting ',' delimiter")
+
+
+cdef int _jr_value(_JsonReader *r, _Lite3Writer *wr, size_t ofs, const char *key, int depth) except -1:
+    """Parse one JSON value and write it under `key` (object) or append it (array, key == NULL)."""
+    cdef char c
+    cdef int ret
+    cdef size_t new_ofs = 0
+    cdef const char *v
+    cdef size_t v_len
+
+    if r.pos >= r.n:
+        _jr_error(r, "Expecting value")
+    c = r.s[r.pos]
+    if c == b'"':
+        _jr_string(r, False, &v, &v_len)
+        if key != NULL:
+            ret = lite3_set_str_n(wr.buf, wr.used, ofs, wr.bufsz, key, v, v_len)
+        else:
+            ret = lite3_arr_append_str_n(wr.buf, wr.used, ofs, wr.bufsz, v, v_len)
+    elif c == b'{' or c == b'[':
+        r.pos += 1
+        if key != NULL:
+            if c == b'{':
+                ret = lite3_set_obj(wr.buf, wr.used, ofs, wr.bufsz, key, &new_ofs)
+            else:
+                ret = lite3_set_arr(wr.buf, wr.used, ofs, wr.bufsz, key, &new_ofs)
+        else:
+            if c == b'{':
+                ret = lite3_arr_append_obj(wr.buf, wr.used, ofs, wr.bufsz, &new_ofs)
+            else:
+                ret = lite3_arr_append_arr(wr.buf, wr.used, ofs, wr.bufsz, &new_ofs)
+        _raise_lite3_write_error(ret, "lite3 write failed")
+        return _jr_container(r, wr, new_ofs, c == b'{', depth + 1)
+    elif c == b'-' or b'0' <= c <= b'9':
+        return _jr_number(r, wr, ofs, key)
+    elif c == b't' or c == b'f':
+        if c == b't':
+            _jr_expect_literal(r, b"true", 4)
+        else:
+            _jr_expect_literal(r, b"false", 5)
+        if key != NULL:
+            ret = lite3_set_bool(wr.buf, wr.used, ofs, wr.bufsz, key, c == b't')
+        else:
+            ret = lite3_arr_append_bool(wr.buf, wr.used, ofs, wr.bufsz, c == b't')
+    elif c == b'n':
+        _jr_expect_literal(r, b"null", 4)
+        if key != NULL:
+            ret = lite3_set_null(wr.buf, wr.used, ofs, wr.bufsz, key)
+        else:
+            ret = lite3_arr_append_null(wr.buf, wr.used, ofs, wr.bufsz)
+    elif c == b'N':
+        _jr_expect_literal(r, b"NaN", 3)
+        return _jw_f64(wr, ofs, key, NAN)
+    elif c == b'I':
+        _jr_expect_literal(r, b"Infinity", 8)
+        return _jw_f64(wr, ofs, key, INFINITY)
+    else:
+        _jr_error(r, "Expecting value")
+    _raise_lite3_write_error(ret, "lite3 write failed")
+    return 0
+
+
+def from_json(data):
+    """
+    Transcode JSON text directly into lite3 bytes.
+
+    The JSON is parsed natively and every value is written straight through the lite3
+    writer API, so no intermediate Python objects are created. Equivalent to
+    `dumps(json.loads(data), fallback="raise")`, but in a single pass.
+
+    Arguments:
+        data: JSON as `str` or a UTF-8 bytes-like object.
+
+    Returns:
+        bytes: lite3-encoded document.
+
+    Raises:
+        ValueError: If `data` is not valid JSON or its root is not an object/array.
+        OverflowError: If an integer does not fit in lite3's int64.
+    """
+    cdef Py_buffer pybuf
+    cdef _JsonReader r
+    cdef _Lite3Writer wr
+    cdef size_t bufsz
+    cdef size_t used_len = 0
+    cdef size_t max_bufsz = 0xFFFFFFFF
+    cdef bytearray buf
+    cdef char c
+
+    if isinstance(data, str):
+        data = (<str>data).encode("utf-8")
+    PyObject_GetBuffer(data, &pybuf, 0)
+    r.kbuf = NULL
+    r.kcap = 0
+    r.vbuf = NULL
+    r.vcap = 0
+    try:
+        r.s = <const char *>pybuf.buf
+        r.n = <size_t>pybuf.len
+        # lite3 documents are typically a few times larger than compact JSON.
+        bufsz = 4 * r.n + 1024
+        if bufsz > max_bufsz:
+            bufsz = max_bufsz
+        while True:
+            buf = bytearray(bufsz)
+            wr.buf = buf
+            wr.used = &used_len
+            wr.bufsz = bufsz
+            used_len = 0
+            r.pos = 0
+            try:
+                if r.n >= 3 and memcmp(r.s, b"\xef\xbb\xbf", 3) == 0:
+                    r.pos = 3
+                _jr_skip_ws(&r)
+                if r.pos >= r.n:
+                    _jr_error(&r, "Expecting value")
+                c = r.s[r.pos]
+                if c == b'{':
+                    if lite3_init_obj(wr.buf, &used_len, bufsz) < 0:
+                        raise RuntimeError("Failed to init object")
+                elif c == b'[':
+                    if lite3_init_arr(wr.buf, &used_len, bufsz) < 0:
+                        raise RuntimeError("Failed to init array")
+                else:
+                    _jr_error(&r, "Root JSON value must be an object or array")
+                r.pos += 1
+                _jr_container(&r, &wr, 0, c == b'{', 1)
+                _jr_skip_ws(&r)
+                if r.pos != r.n:
+                    _jr_error(&r, "Extra data")
+                return PyBytes_FromStringAndSize(<const char *>wr.buf, used_len)
+            except BufferError:
+                if bufsz >= max_bufsz:
+                    raise
+                bufsz = bufsz * 2 if bufsz < max_bufsz // 2 else max_bufsz
+    finally:
+        PyMem_Free(r.kbuf)
+        PyMem_Free(r.vbuf)
+        PyBuffer_Release(&pybuf)
+
+
+# ---------------------------------------------------------------------------
+# Query kernels over arrays of objects.
+#
+# Field paths and predicates are compiled once (key hashes included), then every
+# row is tested against the raw lite3 values; only the rows and fields that are
+# returned get materialized.
+# ---------------------------------------------------------------------------
+
+@cython.final
+cdef class _FieldPath:
+    """A key path (`"a"` or `("a", "b")`) with precomputed lite3 key hashes."""
+    cdef list _encoded          # keeps the key bytes alive
+    cdef const char **keys
+    cdef lite3_key_data *kds
+    cdef Py_ssize_t n
+    cdef readonly object spec
+
+    def __cinit__(self, spec):
+        cdef Py_ssize_t i
+        cdef bytes k
+        parts = (spec,) if isinstance(spec, str) else tuple(spec)
+        if not parts or not all(isinstance(p, str) for p in parts):
+            raise TypeError(f"Field must be a key or a tuple of keys, got {spec!r}")
+        self.spec = spec
+        self._encoded = [(<str>p).encode("utf-8") for p in parts]
+        self.n = len(parts)
+        self.keys = <const char **>PyMem_Malloc(self.n * sizeof(const char *))
+        self.kds = <lite3_key_data *>PyMem_Malloc(self.n * sizeof(lite3_key_data))
+        if self.keys == NULL or self.kds == NULL:
+            raise MemoryError()
+        for i in range(self.n):
+            k = self._encoded[i]
+            self.keys[i] = k
+            self.kds[i] = lite3_get_key_data(self.keys[i])
+
+    def __dealloc__(self):
+        PyMem_Free(self.keys)
+        PyMem_Free(self.kds)
+
+    cdef lite3_val *lookup(self, const uint8_t *buf, size_t buflen, size_t ofs) noexcept:
+        """Return the value at this path under the object at `ofs`, or NULL if absent."""
+        cdef lite3_val *val = NULL
+        cdef Py_ssize_t i
+        for i in range(self.n):
+            if buf[ofs] != LITE3_TYPE_OBJECT:
+                return NULL
+            if lite3_get_impl(buf, buflen, ofs, self.keys[i], self.kds[i], &val) < 0:
+                return NULL
+            ofs = <size_t>(<uint8_t *>val - buf)
+        return val
+
+
+cdef enum:
+    _OP_EQ = 0
+    _OP_NE = 1
+    _OP_LT = 2
+    _OP_LE = 3
+    _OP_GT = 4
+    _OP_GE = 5
+    _OP_IN = 6
+    _OP_NOT_IN = 7
+
+# select(order_by=...) type groups, indexed by lite3 type tag.
+_SORT_RANKS = (3, 0, 0, 0, 2, 1, 3, 3)
+
+_QUERY_OPS = {"==": _OP_EQ, "!=": _OP_NE, "<": _OP_LT, "<=": _OP_LE, ">": _OP_GT, ">=": _OP_GE,
+              "in": _OP_IN, "not in": _OP_NOT_IN}
+
+
+cdef bint _probe_order(const _Probe *p, lite3_val *val, int *out) noexcept nogil:
+    """Compare `val` with the probe; store -1/0/1 in `out`. False if the types are not ordered."""
+    cdef lite3_type t = <lite3_type>val.type
+    cdef double d
+    cdef int64_t i
+    cdef size_t n = 0
+    cdef const char *s
+    cdef int c
+    if p.kind == _PROBE_INT or p.kind == _PROBE_FLOAT:
+        if t == LITE3_TYPE_I64 and p.kind == _PROBE_INT:
+            i = lite3_val_i64(val)
+            out[0] = (i > p.i) - (i < p.i)
+            return True
+        if t == LITE3_TYPE_I64:
+            d = <double>lite3_val_i64(val)
+        elif t == LITE3_TYPE_F64:
+            d = lite3_val_f64(val)
+        elif t == LITE3_TYPE_BOOL:
+            d = 1.0 if lite3_val_bool(val) else 0.0
+        else:
+            return False
+        if isnan(d) or (p.kind == _PROBE_FLOAT and isnan(p.d)):
+            return False
+        if p.kind == _PROBE_FLOAT:
+            out[0] = (d > p.d) - (d < p.d)
+        else:
+            out[0] = (d > <double>p.i) - (d < <double>p.i)
+        return True
+    if p.kind == _PROBE_STR or p.kind == _PROBE_BYTES:
+        if p.kind == _PROBE_STR and t == LITE3_TYPE_STRING:
+            s = lite3_val_str_n(val, &n)
+        elif p.kind == _PROBE_BYTES and t == LITE3_TYPE_BYTES:
+            s = <const char *>lite3_val_bytes(val, &n)
+        else:
+            return False
+        # UTF-8 byte order is code point order, so this matches str comparison.
+        c = memcmp(s, p.s, n if n < p.n else p.n)
+        if c == 0:
+            c = (n > p.n) - (n < p.n)
+        out[0] = (c > 0) - (c < 0)
+        return True
+    return False
+
+
+@cython.final
+cdef class _Predicate:
+    cdef _FieldPath path
+    cdef int op
+    cdef _Probe *probes
+    cdef Py_ssize_t n
+    cdef list _keep
+    cdef list _python   # probes without a lite3 scalar form (compared after materializing)
+
+    def __cinit__(self, field, str op, value):
+        cdef Py_ssize_t i
+        if op not in _QUERY_OPS:
+            raise ValueError(f"Unknown operator {op!r}; expected one of {sorted(_QUERY_OPS)}")
+        self.path = _FieldPath(field)
+        self.op = _QUERY_OPS[op]
+        if (self.op == _OP_IN or self.op == _OP_NOT_IN) and isinstance(value, (str, bytes, bytearray)):
+            raise TypeError(f"'{op}' expects a collection of values, not {type(value).__name__}")
+        values = list(value) if self.op == _OP_IN or self.op == _OP_NOT_IN else [value]
+        self.n = len(values)
+        self.probes = <_Probe *>PyMem_Malloc(max(self.n, 1) * sizeof(_Probe))
+        if self.probes == NULL:
+            raise MemoryError()
+        self._keep = []
+        self._python = []
+        for i in range(self.n):
+            self._keep.append(_make_probe(&self.probes[i], values[i]))
+            if self.probes[i].kind == _PROBE_PYTHON:
+                if self.op != _OP_EQ and self.op != _OP_NE and self.op != _OP_IN and self.op != _OP_NOT_IN:
+                    raise TypeError(f"Cannot order-compare against {type(values[i]).__name__}")
+                self._python.append(values[i])
+
+    def __dealloc__(self):
+        PyMem_Free(self.probes)
+
+    cdef bint _equal_any(self, Lite3Object rows, lite3_val *val) except -1:
+        cdef Py_ssize_t i
+        for i in range(self.n):
+            if _probe_match(&self.probes[i], val):
+                return True
+        if self._python:
+            v = rows._materialize_val(val)
+            for other in self._python:
+                if v == other:
+                    return True
+        return False
+
+    cdef bint matches(self, Lite3Object rows, size_t row_ofs) except -1:
+        cdef lite3_val *val = self.path.lookup(rows._ptr, rows._len, row_ofs)
+        cdef int c = 0
+        if val == NULL:
+            return False
+        if self.op == _OP_EQ or self.op == _OP_IN:
+            return self._equal_any(rows, val)
+        if self.op == _OP_NE or self.op == _OP_NOT_IN:
+            return not self._equal_any(rows, val)
+        if not _probe_order(&self.probes[0], val, &c):
+            return False
+        if self.op == _OP_LT:
+            return c < 0
+        if self.op == _OP_LE:
+            return c <= 0
+        if self.op == _OP_GT:
+            return c > 0
+        return c >= 0
+
+
+cdef list _compile_where(where):
+    if where is None:
+        return []
+    preds = []
+    for item in where:
+        if len(item) != 3:
+            raise ValueError(f"Predicates must be (field, op, value) tuples, got {item!r}")
+        preds.append(_Predicate(item[0], item[1], item[2]))
+    return preds
+
+
+cdef list _select(Lite3Object arr, where, fields, order_by, limit):
+    cdef list preds = _compile_where(where)
+    cdef _Predicate pred
+    cdef _FieldPath sort_path = None
+    cdef bint desc = False
+    cdef lite3_iter it
+    cdef size_t row_ofs
+    cdef lite3_val *val
+    cdef int ret
+    cdef bint ok
+    cdef Py_ssize_t max_rows = -1
+    cdef list matched = []
+
+    if arr._type_cache != LITE3_TYPE_ARRAY:
+        raise TypeError("select() requires a lite3 array")
+    if limit is not None:
+        max_rows = limit
+        if max_rows < 0:
+            raise ValueError("limit must be >= 0")
+    if order_by is not None:
+        if isinstance(order_by, str) and order_by.startswith("-"):
+            desc, order_by = True, order_by[1:]
+        sort_path = _FieldPath(order_by)
+    if fields is not None and not isinstance(fields, collections.abc.Mapping):
+        if isinstance(fields, str):
+            fields = (fields,)
+        fields = {f: True for f in fields}
+
+    if lite3_iter_create(arr._ptr, arr._len, arr._ofs, &it) < 0:
+        raise RuntimeError("Failed to create iterator")
+    while sort_path is not None or max_rows < 0 or len(matched) < max_rows:
+        ret = lite3_iter_next(arr._ptr, arr._len, &it, NULL, &row_ofs)
+        if ret == 0:
+            break
+        if ret < 0:
+            raise RuntimeError("Lite3 iteration failed")
+        ok = True
+        for pred in preds:
+            if not pred.matches(arr, row_ofs):
+                ok = False
+                break
+        if ok:
+            matched.append(row_ofs)
+
+    if sort_path is not None:
+        # Only the sort field is materialized. Values are sorted within their type
+        # group (numbers, strings, bytes); rows where it is missing, null or a
+        # container sort last, in their original order.
+        groups = ([], [], [], [])
+        for ofs in matched:
+            val = sort_path.lookup(arr._ptr, arr._len, ofs)
+            rank = 3 if val == NULL else _SORT_RANKS[val.type]
+            groups[rank].append((arr._materialize_val(val) if rank < 3 else None, ofs))
+        matched = []
+        for rank in range(4):
+            if rank < 3:
+                groups[rank].sort(key=lambda k: k[0], reverse=desc)
+            matched.extend([k[1] for k in groups[rank]])
+        if max_rows >= 0:
+            matched = matched[:max_rows]
+
+    out = []
+    for ofs in matched:
+        row = arr._materialize_val(<lite3_val *>(arr._ptr + <size_t>ofs))
+        if isinstance(row, Lite3Object):
+            row = (<Lite3Object>row).to_python(fields=fields)
+        out.append(row)
+    return out
+
+
+# Aggregation kernels: numbers are read straight from the buffer into C
+# accumulators; only the final results are boxed.
+_AGG_OPS = ("sum", "min", "max", "count", "mean")
+
+
+@cython.final
+cdef class _Acc:
+    cdef Py_ssize_t count
+    cdef int64_t isum
+    cdef object big_isum    # Python int once the int64 sum would overflow
+    cdef double fsum
+    cdef double fcomp       # Neumaier compensation for fsum
+    cdef bint seen_float
+    cdef bint has_minmax
+    cdef bint min_is_int, max_is_int
+    cdef int64_t imin, imax
+    cdef double dmin, dmax
+
+    def __cinit__(self):
+        self.big_isum = None
+
+    cdef void _add_float(self, double d) noexcept:
+        cdef double t = self.fsum + d
+        if fabs(self.fsum) >= fabs(d):
+            self.fcomp += (self.fsum - t) + d
+        else:
+            self.fcomp += (d - t) + self.fsum
+        self.fsum = t
+
+    cdef int add(self, lite3_val *val) except -1:
+        cdef lite3_type t = <lite3_type>val.type
+        cdef int64_t i
+        cdef double d
+        cdef bint is_int
+        if t == LITE3_TYPE_I64:
+            i = lite3_val_i64(val)
+            d = <double>i
+            is_int = True
+            if (i > 0 and self.isum > INT64_MAX - i) or (i < 0 and self.isum < INT64_MIN - i):
+                self.big_isum = (0 if self.big_isum is None else self.big_isum) + self.isum
+                self.isum = 0
+            self.isum += i
+        elif t == LITE3_TYPE_F64:
+            d = lite3_val_f64(val)
+            is_int = False
+            self.seen_float = True
+            self._add_float(d)
+        else:
+            return 0
+        self.count += 1
+        if isnan(d):
+            return 0
+        if not self.has_minmax:
+            self.has_minmax = True
+            self.min_is_int = self.max_is_int = is_int
+            self.imin = self.imax = i if is_int else 0
+            self.dmin = self.dmax = d
+            return 0
+        if d < self.dmin or (d == self.dmin and is_int and self.min_is_int and i < self.imin):
+            self.dmin, self.imin, self.min_is_int = d, (i if is_int else 0), is_int
+        if d > self.dmax or (d == self.dmax and is_int and self.max_is_int and i > self.imax):
+            self.dmax, self.imax, self.max_is_int = d, (i if is_int else 0), is_int
+        return 0
+
+    cdef object total(self):
+        isum = self.isum if self.big_isum is None else self.big_isum + self.isum
+        if not self.seen_float:
+            return isum
+        return float(isum) + (self.fsum + self.fcomp)
+
+    cdef dict result(self, tuple ops):
+        out = {}
+        for op in ops:
+            if op == "count":
+                out[op] = self.count
+            elif op == "sum":
+                out[op] = self.total()
+            elif op == "mean":
+                out[op] = self.total() / self.count if self.count else None
+            elif op == "min":
+                out[op] = None if not self.has_minmax else (self.imin if self.min_is_int else self.dmin)
+            else:
+                out[op] = None if not self.has_minmax else (self.imax if self.max_is_int else self.dmax)
+        return out
+
+
+cdef tuple _check_agg_ops(ops):
+    ops = (ops,) if isinstance(ops, str) else tuple(ops)
+    for op in ops:
+        if op not in _AGG_OPS:
+            raise ValueError(f"Unknown aggregate {op!r}; expected some of {_AGG_OPS}")
+    return ops
+
+
+cdef dict _aggregate(Lite3Object arr, field, ops):
+    cdef tuple agg_ops = _check_agg_ops(ops)
+    cdef _FieldPath path = None if field is None else _FieldPath(field)
+    cdef _Acc acc = _Acc()
+    cdef lite3_iter it
+    cdef size_t ofs
+    cdef lite3_val *val
+    cdef int ret
+
+    if arr._type_cache != LITE3_TYPE_ARRAY:
+        raise TypeError("aggregate() requires a lite3 array")
+    if lite3_iter_create(arr._ptr, arr._len, arr._ofs, &it) < 0:
+        raise RuntimeError("Failed to create iterator")
+    while True:
+        ret = lite3_iter_next(arr._ptr, arr._len, &it, NULL, &ofs)
+        if ret == 0:
+            break
+        if ret < 0:
+            raise RuntimeError("Lite3 iteration failed")
+        val = <lite3_val *>(arr._ptr + ofs) if path is None else path.lookup(arr._ptr, arr._len, ofs)
+        if val != NULL:
+            acc.add(val)
+    return acc.result(agg_ops)
+
+
+cdef dict _group_by(Lite3Object arr, key_field, agg):
+    cdef _FieldPath key_path = _FieldPath(key_field)
+    cdef list paths = []
+    cdef list field_ops = []
+    cdef list accs
+    cdef _FieldPath path
+    cdef _Acc acc
+    cdef lite3_iter it
+    cdef size_t ofs
+    cdef lite3_val *val
+    cdef int ret
+    cdef Py_ssize_t j, nfields
+    cdef dict groups = {}
+
+    if arr._type_cache != LITE3_TYPE_ARRAY:
+        raise TypeError("group_by() requires a lite3 array")
+    if agg is not None:
+        for field, ops in agg.items():
+            paths.append(_FieldPath(field))
+            field_ops.append((field, _check_agg_ops(ops)))
+    nfields = len(paths)
+
+    if lite3_iter_create(arr._ptr, arr._len, arr._ofs, &it) < 0:
+        raise RuntimeError("Failed to create iterator")
+    while True:
+        ret = lite3_iter_next(arr._ptr, arr._len, &it, NULL, &ofs)
+        if ret == 0:
+            break
+        if ret < 0:
+            raise RuntimeError("Lite3 iteration failed")
+        val = key_path.lookup(arr._ptr, arr._len, ofs)
+        if val == NULL:
+            continue
+        key = arr._materialize_val(val)
+        accs = groups.get(key)
+        if accs is None:
+            # Slot 0 counts rows; one accumulator per aggregated field follows.
+            accs = [0] + [_Acc() for _ in range(nfields)]
+            groups[key] = accs
+        accs[0] += 1
+        for j in range(nfields):
+            val = (<_FieldPath>paths[j]).lookup(arr._ptr, arr._len, ofs)
+            if val != NULL:
+                (<_Acc>accs[j + 1]).add(val)
+
+    if agg is None:
+        return {key: accs[0] for key, accs in groups.items()}
+    return {
+        key: {field_ops[j][0]: (<_Acc>accs[j + 1]).result(field_ops[j][1]) for j in range(nfields)}
+        for key, accs in groups.items()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Event streaming.
+#
+# A depth-first walk driven by `lite3_iter_next`, with the open containers kept on
+# an explicit stack of iterators: no proxy is built per container and no Python
+# recursion is involved.
+# ---------------------------------------------------------------------------
+
+cdef struct _EventFrame:
+    lite3_iter it
+    bint is_object
+
+cdef str _EV_START_OBJECT = "start_object"
+cdef str _EV_END_OBJECT = "end_object"
+cdef str _EV_START_ARRAY = "start_array"
+cdef str _EV_END_ARRAY = "end_array"
+cdef str _EV_KEY = "key"
+cdef str _EV_SCALAR = "scalar"
+
+
+@cython.final
+cdef class Lite3Events:
+    """
+    Pull iterator over the `(event, value)` pairs of a lite3 value.
+
+    Events are `start_object`, `key`, `end_object`, `start_array`, `end_array` and
+    `scalar`; `value` is the key for `key`, the Python value for `scalar`, and None
+    otherwise.
+    """
+    cdef Lite3Object _obj
+    cdef _EventFrame *_stack
+    cdef Py_ssize_t _depth
+    cdef Py_ssize_t _cap
+    cdef size_t _pending_ofs
+    cdef bint _has_pending
+
+    def __cinit__(self, Lite3Object obj):
+        self._obj = obj
+        self._pending_ofs = obj._ofs
+        self._has_pending = True
+
+    def __dealloc__(self):
+        PyMem_Free(self._stack)
+
+    def __iter__(self):
+        return self
+
+    @property
+    def depth(self):
+        """Number of containers currently open."""
+        return self._depth
+
+    cdef object _emit_value(self, size_t ofs):
+        cdef Lite3Object obj = self._obj
+        cdef lite3_type t = <lite3_type>obj._ptr[ofs]
+        cdef _EventFrame *stack
+        if t != LITE3_TYPE_OBJECT and t != LITE3_TYPE_ARRAY:
+            return (_EV_SCALAR, obj._materialize_val(<lite3_val *>(obj._ptr + ofs)))
+        if self._depth > _MAX_DEPTH:
+            raise ValueError("lite3 nesting too deep")
+        if self._depth == self._cap:
+            stack = <_EventFrame *>PyMem_Realloc(self._stack, (self._cap * 2 + 8) * sizeof(_EventFrame))
+            if stack == NULL:
+                raise MemoryError()
+            self._stack = stack
+            self._cap = self._cap * 2 + 8
+        if lite3_iter_create(obj._ptr, obj._len, ofs, &self._stack[self._depth].it) < 0:
+            raise ValueError("Invalid lite3 container")
+        self._stack[self._depth].is_object = t == LITE3_TYPE_OBJECT
+        self._depth += 1
+        return (_EV_START_OBJECT, None) if t == LITE3_TYPE_OBJECT else (_EV_START_ARRAY, None)
+
+    def __next__(self):
+        cdef Lite3Object obj = self._obj
+        cdef _EventFrame *top
+        cdef lite3_str key
+        cdef size_t vofs
+        cdef int ret
+
+        if self._has_pending:
+            self._has_pending = False
+            return self._emit_value(self._pending_ofs)
+        if self._depth == 0:
+            raise StopIteration
+        top = &self._stack[self._depth - 1]
+        ret = lite3_iter_next(obj._ptr, obj._len, &top.it, &key if top.is_object else NULL, &vofs)
+        if ret < 0:
+            raise RuntimeError("Lite3 iteration failed")
+        if ret == 0:
+            self._depth -= 1
+            return (_EV_END_OBJECT, None) if top.is_object else (_EV_END_ARRAY, None)
+        if not top.is_object:
+            return self._emit_value(vofs)
+        if key.ptr == NULL:
+            raise RuntimeError("Iterator returned NULL key pointer")
+        self._pending_ofs = vofs
+        self._has_pending = True
+        return (_EV_KEY, key.ptr[:_iter_key_len_excluding_nul(key)].decode("utf-8"))
+
+    def skip(self):
+        """
+        Skip the rest of the innermost open container, including its end event.
+        After a `key` event, skip that key's value instead.
+        """
+        if self._has_pending:
+            self._has_pending = False
+        elif self._depth > 0:
+            self._depth -= 1
+        else:
+            raise ValueError("No open container to skip")
+
+
+def walk(doc, handler):
+    """
+    Walk a lite3 value depth-first and call `handler` methods for each event.
+
+    `handler` may define any of `start_object()`, `end_object()`, `start_array()`,
+    `end_array()`, `key(name)` and `scalar(value)`; missing methods are ignored.
+    A `start_object`/`start_array` callback returning False skips that container
+    (its children and its end event).
+
+    Arguments:
+        doc: Lite3Object, or lite3 bytes-like data.
+        handler: Object receiving the callbacks.
+    """
+    cdef Lite3Object obj = _as_document(doc, True)
+    cdef Lite3Events events = Lite3Events(obj)
+    callbacks = {
+        _EV_START_OBJECT: getattr(handler, _EV_START_OBJECT, None),
+        _EV_END_OBJECT: getattr(handler, _EV_END_OBJECT, None),
+        _EV_START_ARRAY: getattr(handler, _EV_START_ARRAY, None),
+        _EV_END_ARRAY: getattr(handler, _EV_END_ARRAY, None),
+        _EV_KEY: getattr(handler, _EV_KEY, None),
+        _EV_SCALAR: getattr(handler, _EV_SCALAR, None),
+    }
+    for event, value in events:
+        fn = callbacks[event]
+        if fn is None:
+            continue
+        if event is _EV_KEY or event is _EV_SCALAR:
+            fn(value)
+        elif fn() is False and (event is _EV_START_OBJECT or event is _EV_START_ARRAY):
+            events.skip()
+
+
+# ---------------------------------------------------------------------------
+# Columnar flattening.
+#
+# One pass over the rows builds a tree of key paths; every leaf path owns a column
+# that starts untyped and is promoted int64 -> float64 -> list as values require.
+# Numbers are written straight into array.array storage.
+# ---------------------------------------------------------------------------
+
+cdef enum:
+    _COL_EMPTY = 0
+    _COL_INT = 1
+    _COL_FLOAT = 2
+    _COL_OBJECT = 3
+
+
+@cython.final
+cdef class _FlatColumn:
+    cdef int kind
+    cdef carray.array ints
+    cdef carray.array floats
+    cdef list objs
+    cdef carray.array mask      # 1 where the row has no value (absent or null)
+    cdef Py_ssize_t n
+
+    def __cinit__(self):
+        self.mask = carray.array("B")
+
+    cdef inline void _push_mask(self, unsigned char missing) except *:
+        carray.resize_smart(self.mask, self.n + 1)
+        self.mask.data.as_uchars[self.n] = missing
+
+    cdef int _to_objects(self) except -1:
+        cdef Py_ssize_t j
+        cdef list objs = [None] * self.n
+        if self.kind == _COL_INT:
+            for j in range(self.n):
+                if not self.mask.data.as_uchars[j]:
+                    objs[j] = self.ints.data.as_longlongs[j]
+        elif self.kind == _COL_FLOAT:
+            for j in range(self.n):
+                if not self.mask.data.as_uchars[j]:
+                    objs[j] = self.floats.data.as_doubles[j]
+        self.objs = objs
+        self.ints = self.floats = None
+        self.kind = _COL_OBJECT
+        return 0
+
+    cdef int push_missing(self) except -1:
+        if self.kind == _COL_INT:
+            carray.resize_smart(self.ints, self.n + 1)
+            self.ints.data.as_longlongs[self.n] = 0
+        elif self.kind == _COL_FLOAT:
+            carray.resize_smart(self.floats, self.n + 1)
+            self.floats.data.as_doubles[self.n] = NAN
+        elif self.kind == _COL_OBJECT:
+            self.objs.append(None)
+        self._push_mask(1)
+        self.n += 1
+        return 0
+
+    cdef int push_int(self, int64_t i) except -1:
+        if self.kind == _COL_EMPTY:
+            self.ints = carray.clone(carray.array("q"), self.n, True)
+            self.kind = _COL_INT
+        if self.kind == _COL_INT:
+            carray.resize_smart(self.ints, self.n + 1)
+            self.ints.data.as_longlongs[self.n] = i
+        elif self.kind == _COL_FLOAT:
+            carray.resize_smart(self.floats, self.n + 1)
+            self.floats.data.as_doubles[self.n] = <double>i
+        else:
+            self.objs.append(i)
+        self._push_mask(0)
+        self.n += 1
+        return 0
+
+    cdef int push_float(self, double d) except -1:
+        cdef Py_ssize_t j
+        if self.kind == _COL_EMPTY or self.kind == _COL_INT:
+            self.floats = carray.clone(carray.array("d"), self.n, False)
+            for j in range(self.n):
+                if self.kind == _COL_INT and not self.mask.data.as_uchars[j]:
+                    self.floats.data.as_doubles[j] = <double>self.ints.data.as_longlongs[j]
+                else:
+                    self.floats.data.as_doubles[j] = NAN
+            self.ints = None
+            self.kind = _COL_FLOAT
+        if self.kind == _COL_FLOAT:
+            carray.resize_smart(self.floats, self.n + 1)
+            self.floats.data.as_doubles[self.n] = d
+        else:
+            self.objs.append(d)
+        self._push_mask(0)
+        self.n += 1
+        return 0
+
+    cdef int push_object(self, object value) except -1:
+        if self.kind != _COL_OBJECT:
+            self._to_objects()
+        self.objs.append(value)
+        self._push_mask(0)
+        self.n += 1
+        return 0
+
+    cdef object data(self):
+        if self.kind == _COL_INT:
+            return self.ints
+        if self.kind == _COL_FLOAT:
+            return self.floats
+        if self.kind == _COL_OBJECT:
+            return self.objs
+        return [None] * self.n
+
+
+@cython.final
+cdef class _FlatNode:
+    cdef str path
+    cdef dict children
+    cdef _FlatColumn column
+
+    def __cinit__(self, str path):
+        self.path = path
+        self.children = {}
+
+
+@cython.final
+cdef class _Flattener:
+    cdef Lite3Object doc
+    cdef str sep
+    cdef _FlatNode root
+    cdef list columns       # (path, _FlatColumn) in order of first appearance
+    cdef dict by_path       # joined path -> _FlatColumn
+
+    def __cinit__(self, Lite3Object doc, str sep):
+        self.doc = doc
+        self.sep = sep
+        self.root = _FlatNode(None)
+        self.columns = []
+        self.by_path = {}
+
+    cdef _FlatColumn _column(self, _FlatNode node, Py_ssize_t row):
+        cdef _FlatColumn col = node.column
+        if col is None:
+            # Columns are keyed by the joined path, so a key "a.b" and a nested
+            # {"a": {"b": ...}} fill the same column.
+            col = self.by_path.get(node.path)
+            if col is None:
+                col = self.by_path[node.path] = _FlatColumn()
+                self.columns.append((node.path, col))
+            node.column = col
+        while col.n < row:
+            col.push_missing()
+        return col
+
+    cdef int add_row(self, _FlatNode node, size_t ofs, Py_ssize_t row, int depth) except -1:
+        cdef Lite3Object doc = self.doc
+        cdef lite3_iter it
+        cdef lite3_str key
+        cdef size_t vofs, n
+        cdef lite3_val *val
+        cdef lite3_type t
+        cdef _FlatNode child
+        cdef _FlatColumn col
+        cdef const char *s
+        cdef const unsigned char *b
+        cdef int ret
+
+        if depth > _MAX_DEPTH:
+            raise ValueError("lite3 nesting too deep")
+        if lite3_iter_create(doc._ptr, doc._len, ofs, &it) < 0:
+            raise ValueError("Invalid lite3 object")
+        while True:
+            ret = lite3_iter_next(doc._ptr, doc._len, &it, &key, &vofs)
+            if ret == 0:
+                return 0
+            if ret < 0 or key.ptr == NULL:
+                raise RuntimeError("Lite3 iteration failed")
+            name = key.ptr[:_iter_key_len_excluding_nul(key)].decode("utf-8")
+            child = node.children.get(name)
+            if child is None:
+                child = _FlatNode(name if node.path is None else node.path + self.sep + name)
+                node.children[name] = child
+
+            val = <lite3_val *>(doc._ptr + vofs)
+            t = <lite3_type>val.type
+            if t == LITE3_TYPE_OBJECT:
+                self.add_row(child, vofs, row, depth + 1)
+                continue
+            col = self._column(child, row)
+            if col.n > row:
+                raise ValueError(f"Row {row} has more than one value for path {child.path!r}")
+            if t == LITE3_TYPE_I64:
+                col.push_int(lite3_val_i64(val))
+            elif t == LITE3_TYPE_F64:
+                col.push_float(lite3_val_f64(val))
+            elif t == LITE3_TYPE_NULL:
+                col.push_missing()
+            elif t == LITE3_TYPE_BOOL:
+                col.push_object(bool(lite3_val_bool(val)))
+            elif t == LITE3_TYPE_STRING:
+                s = lite3_val_str_n(val, &n)
+                if s == NULL:
+                    raise ValueError("Invalid lite3 string pointer")
+                col.push_object(s[:n].decode("utf-8"))
+            elif t == LITE3_TYPE_BYTES:
+                b = lite3_val_bytes(val, &n)
+                if b == NULL:
+                    raise ValueError("Invalid lite3 bytes pointer")
+                col.push_object(PyBytes_FromStringAndSize(<const char *>b, n))
+            elif t == LITE3_TYPE_ARRAY:
+                col.push_object(_child_proxy(doc, vofs, LITE3_TYPE_ARRAY).to_python())
+            else:
+                raise ValueError(f"Unknown type: {t}")
+
+    cdef tuple finish(self, Py_ssize_t nrows):
+        cdef _FlatColumn col
+        columns = {}
+        masks = {}
+        for path, col in self.columns:
+            while col.n < nrows:
+                col.push_missing()
+            columns[path] = col.data()
+            masks[path] = col.mask
+        return columns, masks
+
+
+def flatten(doc, str sep="."):
+    """
+    Flatten a lite3 object, or an array of objects, into dotted-path columns.
+
+    Nested objects are walked in a single pass; each leaf path becomes one column
+    with one entry per row. Paths are joined with `sep`, so a key that already
+    contains `sep` shares the column of the equivalent nested path; a row holding
+    both raises `ValueError`. Columns holding only ints are `array('q')`, columns of
+    ints and floats are `array('d')`, anything else is a list. Arrays inside rows
+    are kept as Python lists.
+
+    Arguments:
+        doc: Lite3Object, or lite3 bytes-like data.
+        sep (str): Separator joining nested keys (default: ".").
+
+    Returns:
+        tuple: `(columns, masks)`, both dicts keyed by path. `masks[path]` is an
+        `array('B')` holding 1 where the row has no value (absent or null); those
+        slots hold 0, NaN or None in the column.
+    """
+    cdef Lite3Object obj = _as_document(doc)
+    cdef _Flattener flat = _Flattener(obj, sep)
+    cdef lite3_iter it
+    cdef size_t ofs
+    cdef Py_ssize_t row = 0
+    cdef int ret
+
+    if obj._type_cache == LITE3_TYPE_OBJECT:
+        flat.add_row(flat.root, obj._ofs, 0, 0)
+        return flat.finish(1)
+    if obj._type_cache != LITE3_TYPE_ARRAY:
+        raise TypeError("flatten() requires a lite3 object or array of objects")
+    if lite3_iter_create(obj._ptr, obj._len, obj._ofs, &it) < 0:
+        raise RuntimeError("Failed to create iterator")
+    while True:
+        ret = lite3_iter_next(obj._ptr, obj._len, &it, NULL, &ofs)
+        if ret == 0:
+            break
+        if ret < 0:
+            raise RuntimeError("Lite3 iteration failed")
+        if obj._ptr[ofs] != LITE3_TYPE_OBJECT:
+            raise TypeError(f"flatten() rows must be objects (row {row})")
+        flat.add_row(flat.root, ofs, row, 1)
+        row += 1
+    return flat.finish(row)
+
+
+# ---------------------------------------------------------------------------
+# lite3 -> lite3 copy, document diff and patch.
+#
+# Offsets inside a lite3 buffer are absolute, so a subtree cannot be memcpy'd into
+# another document. It is re-emitted through the writer API instead, which still
+# never materializes Python objects.
+# ---------------------------------------------------------------------------
+
+cdef int _copy_value(const uint8_t *src, size_t srclen, size_t vofs,
+                     unsigned char *ptr, size_t *used_len, size_t ofs, size_t bufsz,
+                     const char *key, int depth) except -1:
+    """Write the value at `src[vofs]` into the container at `ofs`, under `key` (or appended if NULL)."""
+    cdef lite3_val *val = <lite3_val *>(src + vofs)
+    cdef lite3_type t = <lite3_type>val.type
+    cdef int ret
+    cdef size_t n = 0
+    cdef size_t new_ofs = 0
+    cdef const char *s
+    cdef const unsigned char *b
+
+    if t == LITE3_TYPE_NULL:
+        ret = lite3_set_null(ptr, used_len, ofs, bufsz, key) if key != NULL else \
+            lite3_arr_append_null(ptr, used_len, ofs, bufsz)
+    elif t == LITE3_TYPE_BOOL:
+        ret = lite3_set_bool(ptr, used_len, ofs, bufsz, key, lite3_val_bool(val)) if key != NULL else \
+            lite3_arr_append_bool(ptr, used_len, ofs, bufsz, lite3_val_bool(val))
+    elif t == LITE3_TYPE_I64:
+        ret = lite3_set_i64(ptr, used_len, ofs, bufsz, key, lite3_val_i64(val)) if key != NULL else \
+            lite3_arr_append_i64(ptr, used_len, ofs, bufsz, lite3_val_i64(val))
+    elif t == LITE3_TYPE_F64:
+        ret = lite3_set_f64(ptr, used_len, ofs, bufsz, key, lite3_val_f64(val)) if key != NULL else \
+            lite3_arr_append_f64(ptr, used_len, ofs, bufsz, lite3_val_f64(val))
+    elif t == LITE3_TYPE_STRING:
+        s = lite3_val_str_n(val, &n)
+        ret = lite3_set_str_n(ptr, used_len, ofs, bufsz, key, s, n) if key != NULL else \
+            lite3_arr_append_str_n(ptr, used_len, ofs, bufsz, s, n)
+    elif t == LITE3_TYPE_BYTES:
+        b = lite3_val_bytes(val, &n)
+        ret = lite3_set_bytes(ptr, used_len, ofs, bufsz, key, b, n) if key != NULL else \
+            lite3_arr_append_bytes(ptr, used_len, ofs, bufsz, b, n)
+    elif t == LITE3_TYPE_OBJECT or t == LITE3_TYPE_ARRAY:
+        if depth > _MAX_DEPTH:
+            raise ValueError("lite3 nesting too deep")
+        if t == LITE3_TYPE_OBJECT:
+            ret = lite3_set_obj(ptr, used_len, ofs, bufsz, key, &new_ofs) if key != NULL else \
+                lite3_arr_append_obj(ptr, used_len, ofs, bufsz, &new_ofs)
+        else:
+            ret = lite3_set_arr(ptr, used_len, ofs, bufsz, key, &new_ofs) if key != NULL else \
+                lite3_arr_append_arr(ptr, used_len, ofs, bufsz, &new_ofs)
+        _raise_lite3_write_error(ret, "lite3 write failed")
+        return _copy_entries(src, srclen, vofs, ptr, used_len, new_ofs, bufsz, depth + 1)
+    else:
+        raise ValueError(f"Unknown type: {t}")
+    _raise_lite3_write_error(ret, "lite3 write failed")
+    return 0
+
+
+cdef int _copy_entries(const uint8_t *src, size_t srclen, size_t srcofs,
+                       unsigned char *ptr, size_t *used_len, size_t ofs, size_t bufsz, int depth) except -1:
+    """Copy every entry of the container at `src[srcofs]` into the same-kind container at `ofs`."""
+    cdef lite3_iter it
+    cdef lite3_str key
+    cdef size_t vofs
+    cdef int ret
+    cdef bint is_object = src[srcofs] == LITE3_TYPE_OBJECT
+
+    if lite3_iter_create(src, srclen, srcofs, &it) < 0:
+        raise ValueError("Invalid lite3 container")
+    while True:
+        ret = lite3_iter_next(src, srclen, &it, &key if is_object else NULL, &vofs)
+        if ret == 0:
+            return 0
+        if ret < 0 or (is_object and key.ptr == NULL):
+            raise ValueError("Invalid lite3 container")
+        _copy_value(src, srclen, vofs, ptr, used_len, ofs, bufsz, key.ptr if is_object else NULL, depth)
+
+
+cdef inline bint _is_container(object v):
+    return isinstance(v, Lite3Object) and (<Lite3Object>v)._type_cache in (LITE3_TYPE_OBJECT, LITE3_TYPE_ARRAY)
+
+
+cdef int _diff_into(Lite3Object a, Lite3Object b, tuple path, list out, int depth) except -1:
+    cdef lite3_iter it
+    cdef lite3_str key
+    cdef size_t aofs, bofs
+    cdef lite3_val *found
+    cdef int ret, rb
+    cdef Py_ssize_t i, na, nb
+    cdef lite3_iter itb
+    cdef size_t klen
+
+    if depth > _MAX_DEPTH:
+        raise ValueError("lite3 nesting too deep")
+
+    if a._type_cache == LITE3_TYPE_OBJECT:
+        if lite3_iter_create(a._ptr, a._len, a._ofs, &it) < 0:
+            raise ValueError("Invalid lite3 container")
+        while True:
+            ret = lite3_iter_next(a._ptr, a._len, &it, &key, &aofs)
+            if ret == 0:
+                break
+            if ret < 0 or key.ptr == NULL:
+                raise ValueError("Invalid lite3 container")
+            if lite3_get_impl(b._ptr, b._len, b._ofs, key.ptr, lite3_get_key_data(key.ptr), &found) < 0:
+                klen = _iter_key_len_excluding_nul(key)
+                out.append(("remove", path + (key.ptr[:klen].decode("utf-8"),), None))
+                continue
+            bofs = <size_t>(<uint8_t *>found - b._ptr)
+            if _values_equal(a._ptr, a._len, aofs, b._ptr, b._len, bofs, depth + 1):
+                continue
+            klen = _iter_key_len_excluding_nul(key)
+            _diff_value(a, aofs, b, <lite3_val *>found, path + (key.ptr[:klen].decode("utf-8"),), out, depth)
+
+        # Keys only present in `b`.
+        if lite3_iter_create(b._ptr, b._len, b._ofs, &it) < 0:
+            raise ValueError("Invalid lite3 container")
+        while True:
+            ret = lite3_iter_next(b._ptr, b._len, &it, &key, &bofs)
+            if ret == 0:
+                break
+            if ret < 0 or key.ptr == NULL:
+                raise ValueError("Invalid lite3 container")
+            if lite3_get_impl(a._ptr, a._len, a._ofs, key.ptr, lite3_get_key_data(key.ptr), &found) < 0:
+                klen = _iter_key_len_excluding_nul(key)
+                out.append(("add", path + (key.ptr[:klen].decode("utf-8"),),
+                            b._materialize_val(<lite3_val *>(b._ptr + bofs))))
+        return 0
+
+    # Arrays are compared position by position: changed common prefix, then
+    # appends, then removals from the end (so the ops apply in order).
+    na = a._count()
+    nb = b._count()
+    if lite3_iter_create(a._ptr, a._len, a._ofs, &it) < 0 or lite3_iter_create(b._ptr, b._len, b._ofs, &itb) < 0:
+        raise ValueError("Invalid lite3 container")
+    for i in range(max(na, nb)):
+        ret = lite3_iter_next(a._ptr, a._len, &it, NULL, &aofs) if i < na else 0
+        rb = lite3_iter_next(b._ptr, b._len, &itb, NULL, &bofs) if i < nb else 0
+        if ret < 0 or rb < 0:
+            raise ValueError("Invalid lite3 container")
+        if i >= na:
+            out.append(("add", path + (i,), b._materialize_val(<lite3_val *>(b._ptr + bofs))))
+        elif i < nb and not _values_equal(a._ptr, a._len, aofs, b._ptr, b._len, bofs, depth + 1):
+            _diff_value(a, aofs, b, <lite3_val *>(b._ptr + bofs), path + (i,), out, depth)
+    for i in range(na - 1, nb - 1, -1):
+        out.append(("remove", path + (i,), None))
+    return 0
+
+
+cdef int _diff_value(Lite3Object a, size_t aofs, Lite3Object b, lite3_val *bval, tuple path, list out, int depth) except -1:
+    # Two unequal values: recurse into same-kind containers, otherwise replace.
+    cdef lite3_type ta = <lite3_type>a._ptr[aofs]
+    if ta == bval.type and (ta == LITE3_TYPE_OBJECT or ta == LITE3_TYPE_ARRAY):
+        return _diff_into(_child_proxy(a, aofs, ta), b._materialize_val(bval), path, out, depth + 1)
+    out.append(("replace", path, b._materialize_val(bval)))
+    return 0
+
+
+cdef Lite3Object _as_document(object doc, bint allow_scalar=False):
+    cdef Lite3Object obj
+    cdef const char *err
+    if isinstance(doc, Lite3Object):
+        obj = <Lite3Object>doc
+    else:
+        obj = Lite3Object(doc)
+        err = _check_root(obj._ptr, obj._len, 0)
+        if err != NULL:
+            raise ValueError((<bytes>err).decode("ascii"))
+    if allow_scalar:
+        return obj
+    if obj._type_cache != LITE3_TYPE_OBJECT and obj._type_cache != LITE3_TYPE_ARRAY:
+        raise TypeError("Expected a lite3 object or array")
+    return obj
+
+
+def diff(a, b):
+    """
+    Compute the changes that turn document `a` into document `b`.
+
+    Both trees are walked natively; unchanged subtrees are skipped with a C-level
+    structural comparison and nothing is materialized except the changed values.
+
+    Arguments:
+        a, b: `Lite3Object` containers or lite3 bytes.
+
+    Returns:
+        list: `(op, path, value)` tuples, where `op` is "add", "remove" or "replace",
+              `path` is a tuple of object keys and array indices, and `value` is the new
+              value (`None` for "remove"; containers are `Lite3Object` proxies into `b`).
+              `apply_patch(a, diff(a, b)) == b`.
+    """
+    cdef Lite3Object da = _as_document(a)
+    cdef Lite3Object db = _as_document(b)
+    cdef list out = []
+    if da._type_cache != db._type_cache:
+        return [("replace", (), db)]
+    if not _values_equal(da._ptr, da._len, da._ofs, db._ptr, db._len, db._ofs, 0):
+        _diff_into(da, db, (), out, 0)
+    return out
+
+
+# Patch plan: the containers touched by ops become `_PatchNode`s over their source
+# container; everything else is copied verbatim when the new buffer is emitted.
+cdef object _REMOVED = object()
+
+
+@cython.final
+cdef class _NewValue:
+    cdef object value
+    cdef bint owned     # True once `value` is a private Python copy that ops may edit
+
+    def __cinit__(self, value, bint owned=False):
+        self.value = value
+        self.owned = owned
+
+
+@cython.final
+cdef class _PatchNode:
+    cdef Lite3Object src
+    cdef dict changes   # objects: key -> _NewValue | _PatchNode | _REMOVED
+    cdef list slots     # arrays: int (source index) | _NewValue | _PatchNode
+
+    def __cinit__(self, Lite3Object src):
+        self.src = src
+        if src._type_cache == LITE3_TYPE_OBJECT:
+            self.changes = {}
+        else:
+            self.slots = list(range(src._count()))
+
+    cdef object _resolve(self, key):
+        """Return the current entry for `key`: a source value, `_NewValue` or `_PatchNode`."""
+        cdef Py_ssize_t i
+        if self.changes is not None:
+            if not isinstance(key, str):
+                raise TypeError(f"Object keys must be strings, got {key!r}")
+            entry = self.changes.get(key)
+            if entry is _REMOVED or (entry is None and key not in self.src):
+                raise KeyError(key)
+            return self.src._get_obj_item_by_key(key) if entry is None else entry
+        i = self._index(key, False)
+        entry = self.slots[i]
+        return self.src._get_arr_item_by_index(entry) if isinstance(entry, int) else entry
+
+    cdef Py_ssize_t _index(self, key, bint for_add) except -1:
+        cdef Py_ssize_t n = len(self.slots)
+        cdef Py_ssize_t i
+        if for_add and key == "-":
+            return n
+        if not isinstance(key, int) or isinstance(key, bool):
+            raise TypeError(f"Array indices must be integers, got {key!r}")
+        i = key + n if key < 0 else key
+        if i < 0 or i > n or (i == n and not for_add):
+            raise IndexError(f"Array index out of range: {key}")
+        return i
+
+    cdef object child(self, key):
+        entry = self._resolve(key)
+        if isinstance(entry, _PatchNode):
+            return entry
+        if isinstance(entry, _NewValue):
+            if (<_NewValue>entry).owned:
+                return entry
+            # Editing inside a value that the patch itself inserted: edit a Python copy.
+            entry = _NewValue(_private_copy((<_NewValue>entry).value), True)
+        elif _is_container(entry):
+            entry = _PatchNode(entry)
+        else:
+            raise TypeError(f"Cannot descend into scalar at {key!r}")
+        self._store(key, entry)
+        return entry
+
+    cdef void _store(self, key, entry):
+        if self.changes is not None:
+            self.changes[key] = entry
+        else:
+            self.slots[self._index(key, False)] = entry
+
+    cdef apply(self, str op, key, value):
+        cdef Py_ssize_t i
+        if op == "add":
+            if self.changes is not None:
+                _check_key(key)
+                self.changes[key] = _NewValue(value)
+            else:
+                self.slots.insert(self._index(key, True), _NewValue(value))
+        elif op == "replace":
+            self._resolve(key)
+            self._store(key, _NewValue(value))
+        elif op == "remove":
+            self._resolve(key)
+            if self.changes is not None:
+                if key in self.src:
+                    self.changes[key] = _REMOVED
+                else:
+                    del self.changes[key]
+            else:
+                del self.slots[self._index(key, False)]
+        else:
+            raise ValueError(f"Unknown patch op: {op!r}")
+
+
+cdef _check_key(key):
+    if not isinstance(key, str):
+        raise TypeError(f"Object keys must be strings, got {key!r}")
+    if "\x00" in key:
+        raise TypeError("Keys must not contain NUL bytes")
+
+
+cdef object _private_copy(value):
+    return value.to_python() if isinstance(value, Lite3Object) else copy.deepcopy(value)
+
+
+cdef _apply_python(target, str op, tuple path, value):
+    # Ops below a value inserted by the patch itself are applied to its Python copy.
+    for seg in path[:-1]:
+        target = target[seg]
+    key = path[-1]
+    if op == "add":
+        if isinstance(target, list):
+            target.insert(len(target) if key == "-" else key, value)
+        else:
+            target[key] = value
+    elif op == "replace":
+        target[key]
+        target[key] = value
+    elif op == "remove":
+        del target[key]
+    else:
+        raise ValueError(f"Unknown patch op: {op!r}")
+
+
+cdef int _emit_node(_PatchNode node, unsigned char *ptr, size_t *used_len, size_t ofs, size_t bufsz, int depth) except -1:
+    cdef Lite3Object src = node.src
+    cdef lite3_iter it
+    cdef lite3_str key
+    cdef size_t vofs
+    cdef size_t new_ofs
+    cdef lite3_val *found
+    cdef int ret
+    cdef bytes k_encoded
+    cdef set skip
+    cdef size_t *elems = NULL
+    cdef Py_ssize_t n, i
+
+    if depth > _MAX_DEPTH:
+        raise ValueError("lite3 nesting too deep")
+
+    if node.changes is not None:
+        # Copy untouched entries verbatim, then write the changed ones.
+        skip = set()
+        for k in node.changes:
+            k_encoded = (<str>k).encode("utf-8")
+            if lite3_get_impl(src._ptr, src._len, src._ofs, k_encoded, lite3_get_key_data(k_encoded), &found) == 0:
+                skip.add(<size_t>(<uint8_t *>found - src._ptr))
+        if lite3_iter_create(src._ptr, src._len, src._ofs, &it) < 0:
+            raise ValueError("Invalid lite3 container")
+        while True:
+            ret = lite3_iter_next(src._ptr, src._len, &it, &key, &vofs)
+            if ret == 0:
+                break
+            if ret < 0 or key.ptr == NULL:
+                raise ValueError("Invalid lite3 container")
+            if skip and vofs in skip:
+                continue
+            _copy_value(src._ptr, src._len, vofs, ptr, used_len, ofs, bufsz, key.ptr, depth + 1)
+        for k, entry in node.changes.items():
+            if entry is _REMOVED:
+                continue
+            k_encoded = (<str>k).encode("utf-8")
+            if isinstance(entry, _NewValue):
+                _emit_new_value(ptr, used_len, ofs, bufsz, k_encoded, (<_NewValue>entry).value)
+                continue
+            ret = lite3_set_obj(ptr, used_len, ofs, bufsz, k_encoded, &new_ofs) \
+                if (<_PatchNode>entry).changes is not None else \
+                lite3_set_arr(ptr, used_len, ofs, bufsz, k_encoded, &new_ofs)
+            _raise_lite3_write_error(ret, "lite3 write failed")
+            _emit_node(<_PatchNode>entry, ptr, used_len, new_ofs, bufsz, depth + 1)
+        return 0
+
+    # Arrays: collect the source element offsets once, then emit the slots in order.
+    n = src._count()
+    elems = <size_t *>PyMem_Malloc(max(n, 1) * sizeof(size_t))
+    if elems == NULL:
+        raise MemoryError()
+    try:
+        if lite3_iter_create(src._ptr, src._len, src._ofs, &it) < 0:
+            raise ValueError("Invalid lite3 container")
+        for i in range(n):
+            if lite3_iter_next(src._ptr, src._len, &it, NULL, &elems[i]) <= 0:
+                raise ValueError("Invalid lite3 container")
+        for entry in node.slots:
+            if isinstance(entry, int):
+                _copy_value(src._ptr, src._len, elems[<Py_ssize_t>entry], ptr, used_len, ofs, bufsz, NULL, depth + 1)
+            elif isinstance(entry, _NewValue):
+                _emit_new_value(ptr, used_len, ofs, bufsz, None, (<_NewValue>entry).value)
+            else:
+                ret = lite3_arr_append_obj(ptr, used_len, ofs, bufsz, &new_ofs) \
+                    if (<_PatchNode>entry).changes is not None else \
+                    lite3_arr_append_arr(ptr, used_len, ofs, bufsz, &new_ofs)
+                _raise_lite3_write_error(ret, "lite3 write failed")
+                _emit_node(<_PatchNode>entry, ptr, used_len, new_ofs, bufsz, depth + 1)
+    finally:
+        PyMem_Free(elems)
+    return 0
+
+
+cdef int _emit_new_value(unsigned char *ptr, size_t *used_len, size_t ofs, size_t bufsz, bytes key, object value) except -1:
+    if key is not None:
+        return _dumps_set_value(ptr, used_len, ofs, bufsz, key, value, None)
+    return _dumps_append_value(ptr, used_len, ofs, bufsz, value, None)
+
+
+def apply_patch(doc, ops):
+    """
+    Apply `(op, path, value)` operations (as returned by `diff()`) and return new lite3 bytes.
+
+    Ops are applied in order with JSON Patch semantics: "add" sets an object key or
+    inserts into an array (index `len` or "-" appends), "replace" requires an existing
+    target, "remove" deletes it. Untouched subtrees are copied natively from `doc`;
+    only the changed parts are encoded from `value` (Python values or `Lite3Object`).
+
+    Arguments:
+        doc: `Lite3Object` container or lite3 bytes.
+        ops: Iterable of `(op, path)` / `(op, path, value)` tuples.
+
+    Returns:
+        bytes: The patched document.
+
+    Raises:
+        KeyError/IndexError: If a path does not exist.
+        TypeError/ValueError: For malformed ops or values.
+    """
+    cdef Lite3Object src = _as_document(doc)
+    cdef _PatchNode root = _PatchNode(src)
+    cdef object replacement = None
+    cdef bint replaced = False
+    cdef bint owned = False
+    cdef tuple path
+    cdef size_t bufsz
+    cdef size_t used_len = 0
+    cdef size_t max_bufsz = 0xFFFFFFFF
+    cdef bytearray buf
+    cdef unsigned char *ptr
+    cdef Py_ssize_t i
+
+    for item in ops:
+        op = item[0]
+        path = tuple(item[1])
+        value = item[2] if len(item) > 2 else None
+        if not path:
+            if op not in ("add", "replace"):
+                raise ValueError("Cannot remove the document root")
+            replacement, replaced, owned = value, True, False
+            continue
+        if replaced:
+            if not owned:
+                replacement, owned = _private_copy(replacement), True
+            _apply_python(replacement, op, path, value)
+            continue
+        node = root
+        for i in range(len(path) - 1):
+            node = (<_PatchNode>node).child(path[i])
+            if isinstance(node, _NewValue):
+                _apply_python((<_NewValue>node).value, op, path[i + 1:], value)
+                break
+        else:
+            (<_PatchNode>node).apply(op, path[-1], value)
+
+    if replaced:
+        if isinstance(replacement, Lite3Object):
+            replacement = _as_document(replacement)
+            root = _PatchNode(replacement)
+        else:
+            return dumps(replacement, fallback="raise")
+
+    bufsz = max(<size_t>64 * 1024, 2 * root.src._len)
+    while True:
+        buf = bytearray(bufsz)
+        ptr = buf
+        used_len = 0
+        try:
+            if root.changes is not None:
+                if lite3_init_obj(ptr, &used_len, bufsz) < 0:
+                    raise RuntimeError("Failed to init object")
+            elif lite3_init_arr(ptr, &used_len, bufsz) < 0:
+                raise RuntimeError("Failed to init array")
+            _emit_node(root, ptr, &used_len, 0, bufsz, 1)
+            return PyBytes_FromStringAndSize(<const char *>ptr, used_len)
+        except BufferError:
+            if bufsz >= max_bufsz:
+                raise
+            bufsz = bufsz * 2 if bufsz < max_bufsz // 2 else max_bufsz
+
+
+cdef bytes _copy_document(Lite3Object src):
+    # Re-emit the container at `src._ofs` as a standalone, freshly laid out document.
+    cdef size_t bufsz = 4096 if src._ofs else max(<size_t>4096, src._len + src._len // 4)
+    cdef size_t used_len = 0
+    cdef size_t max_bufsz = 0xFFFFFFFF
+    cdef bytearray buf
+    cdef unsigned char *ptr
+    cdef int ret
+    while True:
+        buf = bytearray(bufsz)
+        ptr = buf
+        used_len = 0
+        try:
+            if src._type_cache == LITE3_TYPE_OBJECT:
+                ret = lite3_init_obj(ptr, &used_len, bufsz)
+            else:
+                ret = lite3_init_arr(ptr, &used_len, bufsz)
+            _raise_lite3_write_error(ret, "Failed to init root")
+            _copy_entries(src._ptr, src._len, src._ofs, ptr, &used_len, 0, bufsz, 1)
+            return PyBytes_FromStringAndSize(<const char *>ptr, used_len)
+        except BufferError:
+            if bufsz >= max_bufsz:
+                raise
+            bufsz = bufsz * 2 if bufsz < max_bufsz // 2 else max_bufsz
+
+
+def compact(doc):
+    """
+    Rewrite a lite3 document into a fresh buffer without unused slack.
+
+    Space left behind by overwritten or removed values (and any trailing capacity)
+    is dropped; the logical content is unchanged.
+
+    Arguments:
+        doc: lite3 bytes-like data or a `Lite3Object` container (a nested proxy
+             yields just that subtree).
+
+    Returns:
+        bytes: The compacted document.
+    """
+    return _copy_document(_as_document(doc))
+
+
+# ---------------------------------------------------------------------------
+# Schema-directed typed decoding.
+#
+# A target type is compiled once into a tree of plans. Record plans (dataclass,
+# NamedTuple, TypedDict) look their declared fields up by precomputed key hash,
+# so undeclared keys are never materialized; scalar types are checked against the
+# lite3 type tag before any Python object is built.
+# ---------------------------------------------------------------------------
+
+class _DecodeError(Exception):
+    """Internal: a decode failure plus the path (innermost last) where it happened."""
+
+    def __init__(self, exc_type, msg):
+        self.exc_type = exc_type
+        self.msg = msg
+        self.path = []
+
+
+cdef object _decode_fail(lite3_val *val, str expected):
+    return _DecodeError(TypeError, f"expected {expected}, got {_LITE3_TYPE_NAMES.get(val.type, 'invalid')}")
+
+
+_LITE3_TYPE_NAMES = {
+    LITE3_TYPE_NULL: "null",
+    LITE3_TYPE_BOOL: "bool",
+    LITE3_TYPE_I64: "int",
+    LITE3_TYPE_F64: "float",
+    LITE3_TYPE_BYTES: "bytes",
+    LITE3_TYPE_STRING: "str",
+    LITE3_TYPE_OBJECT: "object",
+    LITE3_TYPE_ARRAY: "array",
+}
+
+
+cdef class _TypePlan:
+    cdef str name
+
+    cdef object decode(self, Lite3Object doc, lite3_val *val):
+        # Abstract: every plan class overrides this.
+        raise NotImplementedError(f"{type(self).__name__} does not implement decode()")
+
+
+@cython.final
+cdef class _AnyPlan(_TypePlan):
+    cdef object decode(self, Lite3Object doc, lite3_val *val):
+        v = doc._materialize_val(val)
+        if isinstance(v, Lite3Object):
+            return (<Lite3Object>v).to_python()
+        return v
+
+
+@cython.final
+cdef class _ProxyPlan(_TypePlan):
+    cdef object decode(self, Lite3Object doc, lite3_val *val):
+        if val.type != LITE3_TYPE_OBJECT and val.type != LITE3_TYPE_ARRAY:
+            raise _decode_fail(val, "object or array")
+        return doc._materialize_val(val)
+
+
+@cython.final
+cdef class _ScalarPlan(_TypePlan):
+    cdef int tag            # lite3 type accepted as-is
+    cdef bint int_as_float  # float targets also accept ints
+
+    cdef object decode(self, Lite3Object doc, lite3_val *val):
+        if val.type == self.tag:
+            return doc._materialize_val(val)
+        if self.int_as_float and val.type == LITE3_TYPE_I64:
+            return <double>lite3_val_i64(val)
+        raise _decode_fail(val, self.name)
+
+
+@cython.final
+cdef class _OptionalPlan(_TypePlan):
+    cdef _TypePlan inner
+
+    cdef object decode(self, Lite3Object doc, lite3_val *val):
+        if val.type == LITE3_TYPE_NULL:
+            return None
+        return self.inner.decode(doc, val)
+
+
+@cython.final
+cdef class _UnionPlan(_TypePlan):
+    cdef list plans
+
+    cdef object decode(self, Lite3Object doc, lite3_val *val):
+        cdef _TypePlan plan
+        for plan in self.plans:
+            try:
+                return plan.decode(doc, val)
+            except _DecodeError:
+                pass
+        raise _decode_fail(val, self.name)
+
+
+@cython.final
+cdef class _LiteralPlan(_TypePlan):
+    cdef tuple values
+
+    cdef object decode(self, Lite3Object doc, lite3_val *val):
+        v = doc._materialize_val(val)
+        if isinstance(v, Lite3Object):
+            raise _decode_fail(val, self.name)
+        for allowed in self.values:
+            if v == allowed and type(v) is type(allowed):
+                return v
+        raise _DecodeError(ValueError, f"expected {self.name}, got {v!r}")
+
+
+@cython.final
+cdef class _EnumPlan(_TypePlan):
+    cdef object cls
+
+    cdef object decode(self, Lite3Object doc, lite3_val *val):
+        v = doc._materialize_val(val)
+        if isinstance(v, Lite3Object):
+            raise _decode_fail(val, self.name)
+        try:
+            member = self.cls(v)
+        except ValueError:
+            member = None
+        # Like Literal, a member only matches a value of its own type (`true` is not 1).
+        if member is None or type(v) is not type(member.value):
+            raise _DecodeError(ValueError, f"{v!r} is not a valid {self.name}")
+        return member
+
+
+@cython.final
+cdef class _SequencePlan(_TypePlan):
+    cdef _TypePlan item
+    cdef object factory     # None for list, else tuple/set/frozenset
+
+    cdef object decode(self, Lite3Object doc, lite3_val *val):
+        cdef lite3_iter it
+        cdef size_t vofs
+        cdef Py_ssize_t i = 0
+        cdef list out = []
+        cdef int ret
+        if val.type != LITE3_TYPE_ARRAY:
+            raise _decode_fail(val, self.name)
+        if lite3_iter_create(doc._ptr, doc._len, <size_t>(<uint8_t *>val - doc._ptr), &it) < 0:
+            raise ValueError("Invalid lite3 array")
+        while True:
+            ret = lite3_iter_next(doc._ptr, doc._len, &it, NULL, &vofs)
+            if ret == 0:
+                break
+            if ret < 0:
+                raise RuntimeError("Lite3 iteration failed")
+            try:
+                out.append(self.item.decode(doc, <lite3_val *>(doc._ptr + vofs)))
+            except _DecodeError as e:
+                e.path.append(i)
+                raise
+            i += 1
+        return out if self.factory is None else self.factory(out)
+
+
+@cython.final
+cdef class _TuplePlan(_TypePlan):
+    cdef list items
+
+    cdef object decode(self, Lite3Object doc, lite3_val *val):
+        cdef lite3_val *item
+        cdef Py_ssize_t i, n = len(self.items)
+        cdef uint32_t count = 0
+        if val.type != LITE3_TYPE_ARRAY:
+            raise _decode_fail(val, self.name)
+        lite3_count(doc._ptr, doc._len, <size_t>(<uint8_t *>val - doc._ptr), &count)
+        if count != n:
+            raise _DecodeError(ValueError, f"expected {n} items for {self.name}, got {count}")
+        out = []
+        for i in range(n):
+            if _lite3_get_by_index(doc._ptr, doc._len, <size_t>(<uint8_t *>val - doc._ptr), i, &item) < 0:
+                raise ValueError("Invalid lite3 array")
+            try:
+                out.append((<_TypePlan>self.items[i]).decode(doc, item))
+            except _DecodeError as e:
+                e.path.append(i)
+                raise
+        return tuple(out)
+
+
+@cython.final
+cdef class _MappingPlan(_TypePlan):
+    cdef _TypePlan value
+
+    cdef object decode(self, Lite3Object doc, lite3_val *val):
+        cdef lite3_iter it
+        cdef lite3_str key
+        cdef size_t vofs
+        cdef dict out = {}
+        cdef int ret
+        if val.type != LITE3_TYPE_OBJECT:
+            raise _decode_fail(val, self.name)
+        if lite3_iter_create(doc._ptr, doc._len, <size_t>(<uint8_t *>val - doc._ptr), &it) < 0:
+            raise ValueError("Invalid lite3 object")
+        while True:
+            ret = lite3_iter_next(doc._ptr, doc._len, &it, &key, &vofs)
+            if ret == 0:
+                return out
+            if ret < 0 or key.ptr == NULL:
+                raise RuntimeError("Lite3 iteration failed")
+            k = key.ptr[:_iter_key_len_excluding_nul(key)].decode("utf-8")
+            try:
+                out[k] = self.value.decode(doc, <lite3_val *>(doc._ptr + vofs))
+            except _DecodeError as e:
+                e.path.append(k)
+                raise
+
+
+cdef enum:
+    _RECORD_DATACLASS = 0
+    _RECORD_NAMEDTUPLE = 1
+    _RECORD_TYPEDDICT = 2
+
+
+@cython.final
+cdef class _RecordPlan(_TypePlan):
+    cdef object cls
+    cdef int kind
+    cdef list names
+    cdef list keys          # _FieldPath per field
+    cdef list plans
+    cdef list required
+
+    cdef object decode(self, Lite3Object doc, lite3_val *val):
+        cdef lite3_val *fval
+        cdef Py_ssize_t i
+        cdef size_t ofs = <size_t>(<uint8_t *>val - doc._ptr)
+        cdef dict kwargs = {}
+        if val.type == LITE3_TYPE_ARRAY and self.kind == _RECORD_NAMEDTUPLE:
+            return self._decode_items(doc, ofs)
+        if val.type != LITE3_TYPE_OBJECT:
+            raise _decode_fail(val, self.name)
+        for i in range(len(self.names)):
+            name = self.names[i]
+            fval = (<_FieldPath>self.keys[i]).lookup(doc._ptr, doc._len, ofs)
+            if fval == NULL:
+                if self.required[i]:
+                    raise _DecodeError(ValueError, f"missing required field {name!r} of {self.name}")
+                continue
+            try:
+                kwargs[name] = (<_TypePlan>self.plans[i]).decode(doc, fval)
+            except _DecodeError as e:
+                e.path.append(name)
+                raise
+        if self.kind == _RECORD_TYPEDDICT:
+            return kwargs
+        return self.cls(**kwargs)
+
+    cdef object _decode_items(self, Lite3Object doc, size_t ofs):
+        # NamedTuples are encoded as arrays by default: decode them positionally.
+        cdef lite3_val *item
+        cdef uint32_t i, count = 0
+        cdef Py_ssize_t n = len(self.names)
+        lite3_count(doc._ptr, doc._len, ofs, &count)
+        if count > n or (count < n and self.required[count]):
+            raise _DecodeError(ValueError, f"expected {n} items for {self.name}, got {count}")
+        out = []
+        for i in range(count):
+            if _lite3_get_by_index(doc._ptr, doc._len, ofs, i, &item) < 0:
+                raise ValueError("Invalid lite3 array")
+            try:
+                out.append((<_TypePlan>self.plans[i]).decode(doc, item))
+            except _DecodeError as e:
+                e.path.append(i)
+                raise
+        return self.cls(*out)
+
+
+_TYPE_PLANS = {}
+_UnionType = getattr(types, "UnionType", None)
+
+_SCALAR_TAGS = {
+    bool: LITE3_TYPE_BOOL,
+    int: LITE3_TYPE_I64,
+    float: LITE3_TYPE_F64,
+    str: LITE3_TYPE_STRING,
+    bytes: LITE3_TYPE_BYTES,
+}
+
+
+cdef str _type_name(tp):
+    if tp is None or tp is type(None):
+        return "None"
+    if isinstance(tp, type) and not typing.get_args(tp):
+        return tp.__name__
+    return repr(tp).replace("typing.", "")
+
+
+cdef _TypePlan _compile_type(tp):
+    # Plans are built in a private dict and only published once complete, so other
+    # threads never see a record plan whose fields are still being compiled.
+    cdef dict pending
+    cdef _TypePlan plan
+    try:
+        plan = _TYPE_PLANS.get(tp)
+    except TypeError:   # unhashable annotation
+        plan = None
+    if plan is not None:
+        return plan
+    pending = {}
+    plan = _build_plan(tp, pending)
+    with _plan_lock:
+        for key, value in pending.items():
+            _TYPE_PLANS.setdefault(key, value)
+    return plan
+
+
+cdef _TypePlan _build_plan(tp, dict pending):
+    cdef _TypePlan plan
+    cdef _ScalarPlan sp
+    cdef _RecordPlan rp
+    try:
+        plan = _TYPE_PLANS.get(tp) or pending.get(tp)
+    except TypeError:   # unhashable annotation
+        plan = None
+    if plan is not None:
+        return plan
+
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+    if tp is typing.Any or tp is object:
+        plan = _AnyPlan()
+    elif tp is None or tp is type(None):
+        sp = _ScalarPlan()
+        sp.tag = LITE3_TYPE_NULL
+        plan = sp
+    elif tp in _SCALAR_TAGS:
+        sp = _ScalarPlan()
+        sp.tag = _SCALAR_TAGS[tp]
+        sp.int_as_float = tp is float
+        plan = sp
+    elif tp is Lite3Object:
+        plan = _ProxyPlan()
+    elif origin is typing.Union or (_UnionType is not None and isinstance(tp, _UnionType)):
+        members = [a for a in args if a is not type(None)]
+        if len(members) == 1 and len(args) == 2:
+            plan = _OptionalPlan()
+            (<_OptionalPlan>plan).inner = _build_plan(members[0], pending)
+        else:
+            plan = _UnionPlan()
+            (<_UnionPlan>plan).plans = [_build_plan(a, pending) for a in args]
+    elif origin is typing.Literal:
+        plan = _LiteralPlan()
+        (<_LiteralPlan>plan).values = args
+    elif origin in (list, tuple, set, frozenset, collections.abc.Sequence,
+                    collections.abc.Set, collections.abc.MutableSequence) or tp in (list, tuple, set, frozenset):
+        container = origin or tp
+        if container is tuple and args and not (len(args) == 2 and args[1] is Ellipsis):
+            plan = _TuplePlan()
+            (<_TuplePlan>plan).items = [_build_plan(a, pending) for a in args]
+        else:
+            plan = _SequencePlan()
+            (<_SequencePlan>plan).item = _build_plan(args[0] if args else typing.Any, pending)
+            (<_SequencePlan>plan).factory = (
+                None if container in (list, collections.abc.Sequence, collections.abc.MutableSequence)
+                else frozenset if container is collections.abc.Set else container
+            )
+    elif origin in (dict, collections.abc.Mapping, collections.abc.MutableMapping) or tp is dict:
+        if args and args[0] is not str:
+            raise TypeError(f"Only str keys can be decoded from lite3 objects, got {_type_name(tp)}")
+        plan = _MappingPlan()
+        (<_MappingPlan>plan).value = _build_plan(args[1] if args else typing.Any, pending)
+    elif isinstance(tp, type) and issubclass(tp, enum.Enum):
+        plan = _EnumPlan()
+        (<_EnumPlan>plan).cls = tp
+    elif isinstance(tp, type) and (dataclasses.is_dataclass(tp)
+                                   or (issubclass(tp, tuple) and hasattr(tp, "_fields"))
+                                   or (issubclass(tp, dict) and hasattr(tp, "__required_keys__"))):
+        rp = _RecordPlan()
+        rp.cls = tp
+        rp.name = _type_name(tp)
+        # Registered before the fields are compiled so self-referencing types resolve.
+        pending[tp] = rp
+        _compile_record(rp, tp, pending)
+        return rp
+    else:
+        raise TypeError(f"Unsupported type for typed decoding: {_type_name(tp)}")
+
+    plan.name = _type_name(tp)
+    try:
+        pending[tp] = plan
+    except TypeError:
+        pass
+    return plan
+
+
+cdef int _compile_record(_RecordPlan rp, cls, dict pending) except -1:
+    hints = typing.get_type_hints(cls)
+    if dataclasses.is_dataclass(cls):
+        rp.kind = _RECORD_DATACLASS
+        fields = [(f.name, f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING)
+                  for f in dataclasses.fields(cls) if f.init]
+    elif issubclass(cls, tuple):
+        rp.kind = _RECORD_NAMEDTUPLE
+        fields = [(name, name not in cls._field_defaults) for name in cls._fields]
+    else:
+        rp.kind = _RECORD_TYPEDDICT
+        fields = [(name, name in cls.__required_keys__) for name in hints]
+    rp.names = [name for name, _ in fields]
+    rp.required = [req for _, req in fields]
+    rp.keys = [_FieldPath(name) for name in rp.names]
+    rp.plans = [_build_plan(hints.get(name, typing.Any), pending) for name in rp.names]
+    return 0
+
+
+cdef object _decode_python_typed(value, tp):
+    # JSON input: re-encode the decoded value (wrapped, so scalar roots work too)
+    # and run the same plan over it.
+    cdef Lite3Object wrapper = Lite3Object(dumps([value], fallback="raise"))
+    cdef lite3_val *val
+    if _lite3_get_by_index(wrapper._ptr, wrapper._len, wrapper._ofs, 0, &val) < 0:
+        raise ValueError("Invalid lite3 array")
+    return _decode_typed(wrapper, val, tp)
+
+
+cdef object _decode_typed(Lite3Object doc, lite3_val *val, tp):
+    cdef _TypePlan plan = _compile_type(tp)
+    try:
+        return plan.decode(doc, val)
+    except _DecodeError as e:
+        where = "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in reversed(e.path))
+        raise e.exc_type(f"{e.msg} at ${where}" if where else e.msg) from None
+
+
 # Register as Mapping
 collections.abc.Mapping.register(Lite3Object)
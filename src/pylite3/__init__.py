@@ -2,9 +2,49 @@ from __future__ import annotations
 
 from importlib import metadata
 
-from ._core import Lite3Object, dumps, loads
+from ._core import (
+    Lite3Events,
+    Lite3Object,
+    Lite3Slice,
+    apply_patch,
+    compact,
+    diff,
+    dumps,
+    dumps_many,
+    fallback_stats,
+    flatten,
+    from_json,
+    iter_framed,
+    loads,
+    loads_many,
+    reset_fallback_stats,
+    walk,
+)
+from .container import BlockReader, BlockWriter
+from .shared import SharedDocument
 
-__all__ = ["Lite3Object", "loads", "dumps", "__version__"]
+__all__ = [
+    "Lite3Object",
+    "Lite3Slice",
+    "Lite3Events",
+    "loads",
+    "loads_many",
+    "dumps",
+    "dumps_many",
+    "iter_framed",
+    "from_json",
+    "diff",
+    "apply_patch",
+    "compact",
+    "flatten",
+    "walk",
+    "fallback_stats",
+    "reset_fallback_stats",
+    "BlockReader",
+    "BlockWriter",
+    "SharedDocument",
+    "__version__",
+]
 
 
 try:
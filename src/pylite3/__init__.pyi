@@ -1,4 +1,10 @@
-from typing import Union, Optional, Any, Iterator, List, Dict, overload
+from array import array
+from typing import Union, Optional, Any, Callable, Iterable, Iterator, ItemsView, KeysView, List, Dict, Mapping, Sequence, Type, TypeVar, ValuesView, overload
+
+from .container import BlockReader as BlockReader, BlockWriter as BlockWriter
+from .shared import SharedDocument as SharedDocument
+
+_T = TypeVar("_T")
 
 Lite3Scalar = Union[int, float, str, bytes, bool, None]
 Lite3Value = Union['Lite3Object', Lite3Scalar]
@@ -21,39 +27,119 @@ class Lite3Object:
     @property
     def is_valid(self) -> bool: ...
     @property
+    def is_trusted(self) -> bool: ...
+    @property
     def is_bytes(self) -> bool: ...
     @property
     def is_object(self) -> bool: ...
     @property
     def is_array(self) -> bool: ...
     
+    @overload
     def __getitem__(self, key: Union[str, int]) -> Lite3Value: ...
+    @overload
+    def __getitem__(self, key: slice) -> Lite3Slice: ...
     def __len__(self) -> int: ...
     def __iter__(self) -> Iterator[Lite3Value]: ...
     
-    def keys(self) -> Iterator[str]: ...
-    def values(self) -> Iterator[Lite3Value]: ...
-    def items(self) -> Iterator[tuple[str, Lite3Value]]: ...
+    def __contains__(self, value: object) -> bool: ...
+    def index(self, value: Any, start: int = ..., stop: int = ...) -> int: ...
+    def count(self, value: Any) -> int: ...
+
+    def __eq__(self, other: object) -> bool: ...
+    def __hash__(self) -> int: ...
+    def fingerprint(self) -> int: ...
+    @property
+    def retained_nbytes(self) -> int: ...
+    def detach(self) -> Lite3Object: ...
+
+    def keys(self) -> KeysView[str]: ...
+    def values(self) -> ValuesView[Lite3Value]: ...
+    def items(self) -> ItemsView[str, Lite3Value]: ...
     
     def to_python(self, *, object_hook: Any = ..., parse_float: Any = ..., 
                   parse_int: Any = ..., parse_constant: Any = ..., 
-                  object_pairs_hook: Any = ...) -> Any: ...
+                  object_pairs_hook: Any = ..., fields: Optional[Mapping[str, Any]] = ...) -> Any: ...
+    def to_json(self, *, ensure_ascii: bool = ..., allow_nan: bool = ...) -> bytes: ...
+    def select(self, where: Optional[Iterable[tuple[Union[str, tuple[str, ...]], str, Any]]] = ...,
+               fields: Optional[Union[str, Iterable[str], Mapping[str, Any]]] = ...,
+               order_by: Optional[Union[str, tuple[str, ...]]] = ..., limit: Optional[int] = ...) -> List[Any]: ...
+    def get(self, key: str, default: Any = ...) -> Any: ...
+    def get_int(self, key: str, default: _T = ...) -> Union[int, _T]: ...
+    def get_float(self, key: str, default: _T = ...) -> Union[float, _T]: ...
+    def get_str(self, key: str, default: _T = ...) -> Union[str, _T]: ...
+    def get_bytes(self, key: str, default: _T = ...) -> Union[bytes, _T]: ...
+    def get_bool(self, key: str, default: _T = ...) -> Union[bool, _T]: ...
+    def events(self) -> Lite3Events: ...
+    def decode_as(self, tp: Type[_T]) -> _T: ...
+    def aggregate(self, field: Optional[Union[str, tuple[str, ...]]] = ...,
+                  ops: Union[str, Iterable[str]] = ...) -> Dict[str, Any]: ...
+    def group_by(self, key_field: Union[str, tuple[str, ...]],
+                 agg: Optional[Mapping[Union[str, tuple[str, ...]], Union[str, Iterable[str]]]] = ...) -> Dict[Any, Any]: ...
     def as_dict(self) -> Dict[str, Any]: ...
     def as_list(self) -> List[Any]: ...
 
+class Lite3Events(Iterator[tuple[str, Any]]):
+    @property
+    def depth(self) -> int: ...
+    def __iter__(self) -> Lite3Events: ...
+    def __next__(self) -> tuple[str, Any]: ...
+    def skip(self) -> None: ...
+
+class Lite3Slice(Sequence[Lite3Value]):
+    @overload
+    def __getitem__(self, key: int) -> Lite3Value: ...
+    @overload
+    def __getitem__(self, key: slice) -> Lite3Slice: ...
+    def __len__(self) -> int: ...
+    def __iter__(self) -> Iterator[Lite3Value]: ...
+    def __contains__(self, value: object) -> bool: ...
+    def index(self, value: Any, start: int = ..., stop: Optional[int] = ...) -> int: ...
+    def count(self, value: Any) -> int: ...
+    def to_python(self, *, object_hook: Any = ..., parse_float: Any = ...,
+                  parse_int: Any = ..., parse_constant: Any = ...,
+                  object_pairs_hook: Any = ..., fields: Optional[Mapping[str, Any]] = ...) -> List[Any]: ...
+
+@overload
+def loads(data: Union[bytes, str], *, type: Type[_T], recursive: bool = ..., format: str = ...,
+          json_loads: Optional[Callable[[Any], Any]] = ..., cls: Any = ..., object_hook: Any = ...,
+          parse_float: Any = ..., parse_int: Any = ..., parse_constant: Any = ...,
+          object_pairs_hook: Any = ..., validate: str = ..., **kwargs: Any) -> _T: ...
 @overload
-def loads(data: Union[bytes, str], *, recursive: bool = False, cls: Any = ..., object_hook: Any = ..., 
-          parse_float: Any = ..., parse_int: Any = ..., parse_constant: Any = ..., 
-          object_pairs_hook: Any = ..., **kwargs: Any) -> Lite3Object: ...
+def loads(data: Union[bytes, str], *, recursive: bool = False, format: str = ..., json_loads: Optional[Callable[[Any], Any]] = ...,
+          cls: Any = ..., object_hook: Any = ..., parse_float: Any = ..., parse_int: Any = ..., parse_constant: Any = ...,
+          object_pairs_hook: Any = ..., validate: str = ..., **kwargs: Any) -> Lite3Object: ...
 @overload
-def loads(data: Union[bytes, str], *, recursive: bool = True, cls: Any = ..., object_hook: Any = ..., 
-          parse_float: Any = ..., parse_int: Any = ..., parse_constant: Any = ..., 
-          object_pairs_hook: Any = ..., **kwargs: Any) -> Any: ...
+def loads(data: Union[bytes, str], *, recursive: bool = True, format: str = ..., json_loads: Optional[Callable[[Any], Any]] = ...,
+          cls: Any = ..., object_hook: Any = ..., parse_float: Any = ..., parse_int: Any = ..., parse_constant: Any = ...,
+          object_pairs_hook: Any = ..., validate: str = ..., **kwargs: Any) -> Any: ...
+
+def loads(data: Union[bytes, str], *, recursive: bool = False, format: str = ..., json_loads: Optional[Callable[[Any], Any]] = ...,
+          cls: Any = ..., object_hook: Any = ..., parse_float: Any = ..., parse_int: Any = ..., parse_constant: Any = ...,
+          object_pairs_hook: Any = ..., type: Any = ..., validate: str = ..., **kwargs: Any) -> Union[Lite3Object, Any]: ...
+
+def loads_many(buffers: Iterable[Union[bytes, bytearray, memoryview]], *, workers: int = ..., errors: str = ...,
+               executor: Optional[Any] = ..., validate: str = ...) -> List[Union[Lite3Object, Exception]]: ...
+
+def fallback_stats() -> Dict[str, int]: ...
+def reset_fallback_stats() -> None: ...
+
+def dumps_many(objs: Iterable[Any], *, framed: bool = ..., default: Any = ...,
+               namedtuple_as_object: bool = ...) -> tuple[bytearray, array]: ...
+def iter_framed(data: Union[bytes, bytearray, memoryview]) -> Iterator[Lite3Object]: ...
+
+def from_json(data: Union[bytes, bytearray, memoryview, str]) -> bytes: ...
+
+PatchPath = tuple[Union[str, int], ...]
+PatchOp = tuple[str, PatchPath, Any]
 
-def loads(data: Union[bytes, str], *, recursive: bool = False, cls: Any = ..., object_hook: Any = ..., 
-          parse_float: Any = ..., parse_int: Any = ..., parse_constant: Any = ..., 
-          object_pairs_hook: Any = ..., **kwargs: Any) -> Union[Lite3Object, Any]: ...
+def diff(a: Union[Lite3Object, bytes], b: Union[Lite3Object, bytes]) -> List[PatchOp]: ...
+def apply_patch(doc: Union[Lite3Object, bytes], ops: Iterable[Union[PatchOp, tuple[str, PatchPath]]]) -> bytes: ...
+def walk(doc: Union[Lite3Object, bytes], handler: Any) -> None: ...
+def compact(doc: Union[Lite3Object, bytes, bytearray, memoryview]) -> bytes: ...
+def flatten(doc: Union[Lite3Object, bytes], sep: str = ...) -> tuple[Dict[str, Union[array, List[Any]]], Dict[str, array]]: ...
 
 def dumps(obj: Any, *, skipkeys: bool = ..., ensure_ascii: bool = ..., check_circular: bool = ..., 
           allow_nan: bool = ..., cls: Any = ..., indent: Union[None, int, str] = ..., 
-          separators: Any = ..., default: Any = ..., sort_keys: bool = ..., fallback: str = ..., **kwargs: Any) -> Union[bytes, str]: ...
+          separators: Any = ..., default: Any = ..., sort_keys: bool = ..., fallback: str = ...,
+          namedtuple_as_object: bool = ..., **kwargs: Any) -> Union[bytes, str]: ...
@@ -0,0 +1,336 @@
+"""
+Block-compressed container for many lite3 documents.
+
+Documents are packed back to back into blocks, each block is compressed with a
+stdlib codec (`zlib`, `lzma`) or an optional faster one (`zstd`, `lz4`) when its
+package is installed, and a block index is written at the end of the file.
+
+Reading a single record only decompresses the block that holds it. Recently used
+blocks are kept in an LRU cache, and records are returned as `Lite3Object` proxies
+that point straight into the cached block (no per-record copy).
+
+File layout::
+
+    header   b"L3BC" | version:u8 | codec:u8 | reserved:u16
+    blocks   compressed block payloads, back to back
+    index    per block: file_offset:u64 | comp_len:u32 | raw_len:u32 | n_records:u32
+             then per record: start:u32 | length:u32 (relative to the raw block)
+    footer   index_offset:u64 | n_blocks:u32 | n_records:u32 | b"L3BC"
+"""
+
+from __future__ import annotations
+
+import bisect
+import collections
+import io
+import lzma
+import os
+import struct
+import threading
+import zlib
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from ._core import Lite3Object, compact, dumps, loads
+
+__all__ = ["BlockWriter", "BlockReader", "available_codecs"]
+
+_MAGIC = b"L3BC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBBH")
+_FOOTER = struct.Struct("<QII4s")
+_BLOCK_ENTRY = struct.Struct("<QIII")
+_RECORD_ENTRY = struct.Struct("<II")
+
+# lite3 nodes must sit on 4-byte boundaries, so every record inside a raw block
+# starts at a multiple of this alignment.
+_RECORD_ALIGNMENT = 4
+
+_DEFAULT_BLOCK_SIZE = 1024 * 1024
+_DEFAULT_CACHE_BLOCKS = 8
+
+PathOrFile = Union[str, bytes, "os.PathLike[str]", BinaryIO]
+
+# codec name -> (id, compress(data, level), decompress(data))
+_CODECS: Dict[str, Tuple[int, Callable[[bytes, Optional[int]], bytes], Callable[[bytes], bytes]]] = {
+    "none": (0, lambda data, level: bytes(data), bytes),
+    "zlib": (
+        1,
+        lambda data, level: zlib.compress(data, 6 if level is None else level),
+        zlib.decompress,
+    ),
+    "lzma": (
+        2,
+        lambda data, level: lzma.compress(data, preset=6 if level is None else level),
+        lzma.decompress,
+    ),
+}
+
+try:
+    import zstandard as _zstd
+except ImportError:  # pragma: no cover - optional dependency
+    _zstd = None
+else:
+    _CODECS["zstd"] = (
+        3,
+        lambda data, level: _zstd.ZstdCompressor(level=3 if level is None else level).compress(data),
+        lambda data: _zstd.ZstdDecompressor().decompress(data),
+    )
+
+try:
+    import lz4.frame as _lz4
+except ImportError:  # pragma: no cover - optional dependency
+    _lz4 = None
+else:
+    _CODECS["lz4"] = (
+        4,
+        lambda data, level: _lz4.compress(data, compression_level=0 if level is None else level),
+        _lz4.decompress,
+    )
+
+_CODEC_BY_ID = {codec_id: name for name, (codec_id, _, _) in _CODECS.items()}
+
+
+def available_codecs() -> List[str]:
+    """Return the codec names usable in this interpreter."""
+    return list(_CODECS)
+
+
+def _open(target: PathOrFile, mode: str) -> Tuple[BinaryIO, bool]:
+    if isinstance(target, (str, bytes, os.PathLike)):
+        return open(target, mode), True
+    return target, False
+
+
+class BlockWriter:
+    """
+    Append lite3 documents to a block-compressed container.
+
+    Arguments:
+        target: Path or binary file object opened for writing.
+        codec (str): One of `available_codecs()` (default: "zlib").
+        block_size (int): Raw bytes collected before a block is compressed and flushed.
+        level (int): Codec-specific compression level (default: codec default).
+    """
+
+    def __init__(self, target: PathOrFile, *, codec: str = "zlib",
+                 block_size: int = _DEFAULT_BLOCK_SIZE, level: Optional[int] = None) -> None:
+        if codec not in _CODECS:
+            raise ValueError(f"Unknown or unavailable codec: {codec!r} (available: {available_codecs()})")
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        self._codec_id, self._compress, _ = _CODECS[codec]
+        self._level = level
+        self._block_size = block_size
+        self._fp, self._owns_fp = _open(target, "wb")
+        self._pending = bytearray()
+        self._pending_records: List[Tuple[int, int]] = []
+        self._blocks: List[Tuple[int, int, int, List[Tuple[int, int]]]] = []
+        self._n_records = 0
+        self._closed = False
+        self._fp.write(_HEADER.pack(_MAGIC, _VERSION, self._codec_id, 0))
+
+    def append(self, doc: Any) -> int:
+        """
+        Append one document and return its record index.
+
+        `doc` may be lite3 bytes (`bytes`/`bytearray`/`memoryview`), a `Lite3Object`
+        root, or a Python `dict`/`list` that is encoded with `dumps(..., fallback="raise")`.
+        """
+        if self._closed:
+            raise ValueError("BlockWriter is closed")
+        if isinstance(doc, Lite3Object):
+            doc = compact(doc)
+        elif not isinstance(doc, (bytes, bytearray, memoryview)):
+            doc = dumps(doc, fallback="raise")
+        data = memoryview(doc).cast("B")
+
+        start = len(self._pending)
+        self._pending += data
+        pad = -len(self._pending) % _RECORD_ALIGNMENT
+        if pad:
+            self._pending += b"\x00" * pad
+        self._pending_records.append((start, len(data)))
+        index = self._n_records
+        self._n_records += 1
+        if len(self._pending) >= self._block_size:
+            self._flush_block()
+        return index
+
+    def extend(self, docs) -> None:
+        """Append every document from an iterable."""
+        for doc in docs:
+            self.append(doc)
+
+    def _flush_block(self) -> None:
+        if not self._pending_records:
+            return
+        raw = bytes(self._pending)
+        payload = self._compress(raw, self._level)
+        offset = self._fp.tell()
+        self._fp.write(payload)
+        self._blocks.append((offset, len(payload), len(raw), self._pending_records))
+        self._pending = bytearray()
+        self._pending_records = []
+
+    def close(self) -> None:
+        """Flush the last block, write the index and footer, and close owned files."""
+        if self._closed:
+            return
+        self._flush_block()
+        index = io.BytesIO()
+        for offset, comp_len, raw_len, records in self._blocks:
+            index.write(_BLOCK_ENTRY.pack(offset, comp_len, raw_len, len(records)))
+            for start, length in records:
+                index.write(_RECORD_ENTRY.pack(start, length))
+        index_offset = self._fp.tell()
+        self._fp.write(index.getvalue())
+        self._fp.write(_FOOTER.pack(index_offset, len(self._blocks), self._n_records, _MAGIC))
+        self._fp.flush()
+        self._closed = True
+        if self._owns_fp:
+            self._fp.close()
+
+    def __len__(self) -> int:
+        return self._n_records
+
+    def __enter__(self) -> "BlockWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class BlockReader:
+    """
+    Random-access reader for containers produced by `BlockWriter`.
+
+    `reader[i]` decompresses only the block holding record `i` and returns a
+    `Lite3Object` proxy over the cached block. Up to `cache_blocks` decompressed
+    blocks are kept in an LRU cache; proxies keep their block alive even after it
+    has been evicted.
+
+    Arguments:
+        source: Path or seekable binary file object opened for reading.
+        cache_blocks (int): Maximum number of decompressed blocks kept (default: 8).
+    """
+
+    def __init__(self, source: PathOrFile, *, cache_blocks: int = _DEFAULT_CACHE_BLOCKS) -> None:
+        if cache_blocks < 1:
+            raise ValueError("cache_blocks must be >= 1")
+        self._fp, self._owns_fp = _open(source, "rb")
+        self._lock = threading.Lock()
+        self._cache: "collections.OrderedDict[int, bytes]" = collections.OrderedDict()
+        self._cache_blocks = cache_blocks
+        self._hits = 0
+        self._misses = 0
+
+        try:
+            self._read_index()
+        except BaseException as exc:
+            if self._owns_fp:
+                self._fp.close()
+            if isinstance(exc, (struct.error, OSError)):
+                raise ValueError(f"Truncated or corrupt pylite3 block container: {exc}") from exc
+            raise
+
+    def _read_index(self) -> None:
+        self._fp.seek(0)
+        magic, version, codec_id, _ = _HEADER.unpack(self._fp.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError("Not a pylite3 block container")
+        if version != _VERSION:
+            raise ValueError(f"Unsupported container version: {version}")
+        if codec_id not in _CODEC_BY_ID:
+            raise ValueError(f"Container codec id {codec_id} is not available (install its package)")
+        self.codec = _CODEC_BY_ID[codec_id]
+        self._decompress = _CODECS[self.codec][2]
+
+        self._fp.seek(-_FOOTER.size, os.SEEK_END)
+        index_offset, n_blocks, n_records, magic = _FOOTER.unpack(self._fp.read(_FOOTER.size))
+        if magic != _MAGIC:
+            raise ValueError("Truncated pylite3 block container (missing footer)")
+
+        self._fp.seek(index_offset)
+        index = self._fp.read()
+        pos = 0
+        self._blocks: List[Tuple[int, int, int]] = []
+        self._records: List[List[Tuple[int, int]]] = []
+        self._first_record: List[int] = []
+        total = 0
+        for _ in range(n_blocks):
+            offset, comp_len, raw_len, count = _BLOCK_ENTRY.unpack_from(index, pos)
+            pos += _BLOCK_ENTRY.size
+            records = [_RECORD_ENTRY.unpack_from(index, pos + i * _RECORD_ENTRY.size) for i in range(count)]
+            pos += count * _RECORD_ENTRY.size
+            self._blocks.append((offset, comp_len, raw_len))
+            self._records.append(records)
+            self._first_record.append(total)
+            total += count
+        if total != n_records:
+            raise ValueError("Corrupt pylite3 block container index")
+        self._n_records = n_records
+
+    def __len__(self) -> int:
+        return self._n_records
+
+    @property
+    def n_blocks(self) -> int:
+        return len(self._blocks)
+
+    def _block(self, block_no: int) -> bytes:
+        with self._lock:
+            block = self._cache.get(block_no)
+            if block is not None:
+                self._cache.move_to_end(block_no)
+                self._hits += 1
+                return block
+            self._misses += 1
+            offset, comp_len, raw_len = self._blocks[block_no]
+            self._fp.seek(offset)
+            block = self._decompress(self._fp.read(comp_len))
+            if len(block) != raw_len:
+                raise ValueError(f"Corrupt block {block_no}: expected {raw_len} bytes, got {len(block)}")
+            self._cache[block_no] = block
+            if len(self._cache) > self._cache_blocks:
+                self._cache.popitem(last=False)
+            return block
+
+    def raw(self, index: int) -> memoryview:
+        """Return the lite3 bytes of record `index` as a zero-copy view into its block."""
+        if index < 0:
+            index += self._n_records
+        if not 0 <= index < self._n_records:
+            raise IndexError(f"Record index out of range: {index}")
+        block_no = bisect.bisect_right(self._first_record, index) - 1
+        start, length = self._records[block_no][index - self._first_record[block_no]]
+        return memoryview(self._block(block_no))[start:start + length]
+
+    def __getitem__(self, index: int) -> Lite3Object:
+        # Record bytes come from the file, so the root is checked like any other input.
+        return loads(self.raw(index), format="lite3")
+
+    def __iter__(self) -> Iterator[Lite3Object]:
+        for i in range(self._n_records):
+            yield self[i]
+
+    def cache_info(self) -> Dict[str, int]:
+        """Return LRU statistics: hits, misses, cached block count and capacity."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "cached": len(self._cache),
+                "capacity": self._cache_blocks,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._cache.clear()
+        if self._owns_fp:
+            self._fp.close()
+
+    def __enter__(self) -> "BlockReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,157 @@
+"""
+Lite3 documents in `multiprocessing.shared_memory` blocks.
+
+A `SharedDocument` copies a document into a named shared memory block once; any
+process can then attach to it by name and read it through a `Lite3Object` proxy
+that points straight into the block. Pickling a `SharedDocument` only sends its
+name, so handing a document to another process stage copies no data.
+
+Block layout::
+
+    header   b"L3SM" | reserved:u32 | length:u64
+    payload  lite3 bytes (the block itself may be rounded up to a page size)
+"""
+
+from __future__ import annotations
+
+import struct
+from multiprocessing import shared_memory
+from typing import Any, Optional
+
+from ._core import Lite3Object, dumps, loads
+
+__all__ = ["SharedDocument"]
+
+_MAGIC = b"L3SM"
+_HEADER = struct.Struct("<4sIQ")
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Consumers must not register the block with their resource tracker, or it may
+    # be unlinked when a (non-owning) consumer process exits. Python < 3.13 always
+    # registers; processes forked from the creator share its tracker, which is safe.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+def _encode(doc: Any) -> memoryview:
+    if isinstance(doc, Lite3Object):
+        doc = dumps(doc, fallback="raise") if doc.is_object or doc.is_array else None
+        if doc is None:
+            raise TypeError("SharedDocument requires a lite3 object or array")
+    elif not isinstance(doc, (bytes, bytearray, memoryview)):
+        doc = dumps(doc, fallback="raise")
+    return memoryview(doc).cast("B")
+
+
+class SharedDocument:
+    """
+    A lite3 document stored in a named shared memory block.
+
+    Use `SharedDocument.create(doc)` in the producer and `SharedDocument(name)` (or
+    unpickle a `SharedDocument`) in consumers. `doc` returns a zero-copy proxy over
+    the block; the block cannot be closed while such proxies are alive.
+
+    Arguments:
+        name (str): Name of an existing block created by `SharedDocument.create`.
+    """
+
+    _shm: Optional[shared_memory.SharedMemory] = None
+    _doc: Optional[Lite3Object] = None
+
+    def __init__(self, name: str) -> None:
+        self._init(_attach(name), owner=False)
+
+    def _init(self, shm: shared_memory.SharedMemory, *, owner: bool) -> None:
+        self._shm = shm
+        self._name = shm.name
+        self._owner = owner
+        magic, _, length = _HEADER.unpack_from(shm.buf, 0)
+        if magic != _MAGIC or _HEADER.size + length > shm.size:
+            shm.close()
+            raise ValueError(f"Shared memory block {shm.name!r} does not hold a lite3 document")
+        self._length = length
+
+    @classmethod
+    def create(cls, doc: Any, *, name: Optional[str] = None) -> "SharedDocument":
+        """
+        Copy `doc` into a new shared memory block and return its owner.
+
+        `doc` may be lite3 bytes, a `Lite3Object`, or a Python `dict`/`list` encoded
+        with `dumps(..., fallback="raise")`. The creating process is responsible for
+        calling `unlink()` once every consumer is done.
+        """
+        data = _encode(doc)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=_HEADER.size + len(data))
+        try:
+            _HEADER.pack_into(shm.buf, 0, _MAGIC, 0, len(data))
+            shm.buf[_HEADER.size:_HEADER.size + len(data)] = data
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        self = cls.__new__(cls)
+        self._init(shm, owner=True)
+        return self
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the lite3 payload in bytes."""
+        return self._length
+
+    @property
+    def doc(self) -> Lite3Object:
+        """Validated zero-copy proxy over the shared block."""
+        if self._doc is None:
+            if self._shm is None:
+                raise ValueError("SharedDocument is closed")
+            view = self._shm.buf[_HEADER.size:_HEADER.size + self._length]
+            self._doc = loads(view, format="lite3")
+        return self._doc
+
+    def close(self) -> None:
+        """
+        Detach from the block. Raises `BufferError` while proxies returned by `doc`
+        (or their children) are still alive.
+        """
+        if self._shm is None:
+            return
+        self._doc = None
+        self._shm.close()
+        self._shm = None
+
+    def __del__(self) -> None:
+        # Drop our proxy before the block so SharedMemory can unmap it; proxies the
+        # caller still holds keep the mapping alive instead.
+        self._doc = None
+        try:
+            self.close()
+        except BufferError:
+            pass
+
+    def unlink(self) -> None:
+        """Request destruction of the block. Only the creator should call this, once."""
+        if self._shm is None:
+            raise ValueError("SharedDocument is closed")
+        self._shm.unlink()
+
+    def __reduce__(self):
+        return (SharedDocument, (self.name,))
+
+    def __enter__(self) -> "SharedDocument":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        # The creator also destroys the block; consumers only detach.
+        if self._owner and self._shm is not None:
+            self._shm.unlink()
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"SharedDocument(name={self._name!r}, nbytes={self._length})"
@@ -0,0 +1,69 @@
+import math
+import random
+
+import pytest
+import pylite3
+
+_rng = random.Random(11)
+ROWS = [
+    {"region": _rng.choice(["eu", "us", "apac"]), "qty": _rng.randint(-50, 50),
+     "price": _rng.uniform(0, 10), "meta": {"w": _rng.randint(1, 5)}}
+    for i in range(500)
+]
+ROWS[0]["qty"] = "n/a"
+del ROWS[1]["price"]
+
+
+@pytest.fixture(scope="module")
+def arr():
+    return pylite3.loads(pylite3.dumps(ROWS))
+
+
+def test_aggregate_int_field(arr):
+    qty = [r["qty"] for r in ROWS if isinstance(r["qty"], int)]
+    out = arr.aggregate("qty")
+    assert out == {"sum": sum(qty), "min": min(qty), "max": max(qty),
+                   "count": len(qty), "mean": sum(qty) / len(qty)}
+    assert type(out["sum"]) is int and type(out["min"]) is int
+
+
+def test_aggregate_float_and_nested(arr):
+    prices = [r["price"] for r in ROWS if "price" in r]
+    out = arr.aggregate("price", ops=("sum", "count"))
+    assert out == {"sum": pytest.approx(math.fsum(prices)), "count": len(prices)}
+    assert arr.aggregate(("meta", "w"), ops="max") == {"max": max(r["meta"]["w"] for r in ROWS)}
+
+
+def test_aggregate_scalars_mixed_and_empty():
+    arr = pylite3.loads(pylite3.dumps([2**62, 2**62, 2**62, 1, True, "x", None, 0.5]))
+    out = arr.aggregate()
+    assert out["count"] == 5
+    assert out["sum"] == pytest.approx(3 * 2**62 + 1.5)
+    assert out["min"] == 0.5 and out["max"] == 2**62
+
+    big = pylite3.loads(pylite3.dumps([2**62] * 4)).aggregate(ops=("sum",))
+    assert big == {"sum": 2**64}
+
+    empty = pylite3.loads(pylite3.dumps([])).aggregate()
+    assert empty == {"sum": 0, "min": None, "max": None, "count": 0, "mean": None}
+
+
+def test_group_by(arr):
+    counts = {}
+    for r in ROWS:
+        counts[r["region"]] = counts.get(r["region"], 0) + 1
+    assert arr.group_by("region") == counts
+
+    out = arr.group_by("region", agg={"qty": ("sum", "count"), "price": "max"})
+    for region in counts:
+        rows = [r for r in ROWS if r["region"] == region]
+        qty = [r["qty"] for r in rows if isinstance(r["qty"], int)]
+        assert out[region]["qty"] == {"sum": sum(qty), "count": len(qty)}
+        assert out[region]["price"] == {"max": max(r["price"] for r in rows if "price" in r)}
+
+
+def test_aggregate_errors(arr):
+    with pytest.raises(ValueError):
+        arr.aggregate("qty", ops=("median",))
+    with pytest.raises(TypeError):
+        pylite3.loads(pylite3.dumps({"a": 1})).aggregate("a")
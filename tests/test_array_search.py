@@ -0,0 +1,44 @@
+import pytest
+import pylite3
+
+DATA = [None, True, 0, 1, 2, 2.0, 2.5, "a", "é", b"a", b"", 2**53, float(2**53), float("inf"), [1], {"a": 1}]
+PROBES = [None, True, False, 0, 1, -1, 2, 1.0, 2.5, float("nan"), float("inf"), "a", "", "é", b"a", b"",
+          2**53, 2**53 + 1, 2**70, "\ud800", 3]
+
+
+@pytest.fixture
+def arr():
+    return pylite3.loads(pylite3.dumps(DATA))
+
+
+@pytest.mark.parametrize("probe", PROBES, ids=repr)
+def test_membership_matches_list_semantics(arr, probe):
+    assert (probe in arr) == (probe in DATA)
+    assert arr.count(probe) == DATA.count(probe)
+    if probe in DATA:
+        assert arr.index(probe) == DATA.index(probe)
+    else:
+        with pytest.raises(ValueError):
+            arr.index(probe)
+
+
+def test_index_bounds_and_slices(arr):
+    assert arr.index(2, 5) == DATA.index(2, 5)
+    assert arr.index(2.0, -12, -9) == DATA.index(2.0, -12, -9)
+    with pytest.raises(ValueError):
+        arr.index("a", 0, 7)
+
+    view = arr[1::2]
+    expected = DATA[1::2]
+    for probe in (True, 1, 2, "a", b"a", b""):
+        assert (probe in view) == (probe in expected)
+        assert view.count(probe) == expected.count(probe)
+    assert arr[3:].index(2.5) == DATA[3:].index(2.5)
+
+
+def test_search_requires_array():
+    obj = pylite3.loads(pylite3.dumps({"a": 1}))
+    with pytest.raises(TypeError):
+        obj.index(1)
+    with pytest.raises(TypeError):
+        obj.count(1)
@@ -22,3 +22,17 @@ def test_loads_rejects_truncated_object_tag():
     data = bytes([6])
     with pytest.raises(Exception):
         pylite3.loads(data)
+
+
+def test_child_proxies_keep_buffer_pinned():
+    ba = bytearray(pylite3.dumps({"rows": [{"id": 1}, {"id": 2}], "meta": {"n": 2}}))
+    root = pylite3.loads(ba)
+    rows = root["rows"]
+    children = [r for r in rows] + [v for _, v in sorted(root.items())]
+    del root
+
+    # Children share the parent's export, so the bytearray still cannot be resized.
+    with pytest.raises(BufferError):
+        ba.append(0)
+    assert [r["id"] for r in rows] == [1, 2]
+    assert children[0].is_object and children[2]["n"] == 2 and children[3].is_array
@@ -0,0 +1,113 @@
+import io
+
+import pytest
+import pylite3
+from pylite3.container import BlockReader, BlockWriter, available_codecs
+
+
+def _docs(n):
+    return [{"id": i, "name": f"user-{i}", "tags": ["a", "b"], "score": i / 2} for i in range(n)]
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_container_roundtrip(tmp_path, codec):
+    path = tmp_path / "docs.l3bc"
+    docs = _docs(200)
+    with BlockWriter(path, codec=codec, block_size=2048) as w:
+        for d in docs:
+            w.append(d)
+
+    with BlockReader(path) as r:
+        assert len(r) == len(docs)
+        assert r.n_blocks > 1
+        assert r.codec == codec
+        assert r[123].to_python() == docs[123]
+        assert r[-1]["id"] == 199
+        assert [d.to_python() for d in r] == docs
+        with pytest.raises(IndexError):
+            _ = r[len(docs)]
+
+
+def test_container_lru_cache_and_raw_bytes():
+    buf = io.BytesIO()
+    raw = pylite3.dumps({"k": "v"})
+    with BlockWriter(buf, block_size=64) as w:
+        w.append(raw)
+        w.extend(_docs(20))
+
+    buf.seek(0)
+    r = BlockReader(buf, cache_blocks=2)
+    assert bytes(r.raw(0)) == raw
+
+    _ = r[0]
+    _ = r[0]
+    info = r.cache_info()
+    assert info["hits"] >= 1
+    assert info["cached"] <= 2
+
+    # Proxies keep their block alive after eviction.
+    first = r[1]
+    for i in range(len(r)):
+        _ = r[i]
+    assert first["id"] == 0
+
+
+def test_container_rejects_unknown_codec_and_bad_file(tmp_path):
+    with pytest.raises(ValueError):
+        BlockWriter(tmp_path / "x", codec="nope")
+    bad = tmp_path / "bad"
+    bad.write_bytes(b"not a container at all")
+    with pytest.raises(ValueError):
+        BlockReader(bad)
+
+
+def _corrupt(data, case):
+    if case == "short-header":
+        return data[:3]
+    if case == "short-footer":
+        return data[:12]
+    # Claim more blocks than the index holds: footer is index_offset:u64 | n_blocks:u32 | ...
+    footer = bytearray(data[-20:])
+    footer[8:12] = (1000).to_bytes(4, "little")
+    return data[:-20] + bytes(footer)
+
+
+@pytest.mark.parametrize("case", ["short-header", "short-footer", "short-index"])
+def test_container_truncated_raises_value_error_and_closes(tmp_path, monkeypatch, case):
+    path = tmp_path / "docs.l3bc"
+    with BlockWriter(path, block_size=256) as w:
+        w.extend(_docs(30))
+    data = _corrupt(path.read_bytes(), case)
+    path.write_bytes(data)
+
+    opened = []
+    real_open = open
+
+    def tracking_open(*args, **kwargs):
+        opened.append(real_open(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr("builtins.open", tracking_open)
+    with pytest.raises(ValueError):
+        BlockReader(path)
+    assert len(opened) == 1 and opened[0].closed
+
+    # Caller-owned file objects are left open.
+    fp = io.BytesIO(data)
+    with pytest.raises(ValueError):
+        BlockReader(fp)
+    assert not fp.closed
+
+
+def test_container_rejects_corrupt_record():
+    buf = io.BytesIO()
+    with BlockWriter(buf, codec="none") as w:
+        w.append({"k": "v"})
+        w.append({"n": 1})
+    data = bytearray(buf.getvalue())
+    data[8] = 0x7F  # first record's root type tag, right after the 8-byte header
+
+    r = BlockReader(io.BytesIO(bytes(data)))
+    with pytest.raises(ValueError):
+        r[0]
+    assert r[1]["n"] == 1
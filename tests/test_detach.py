@@ -0,0 +1,47 @@
+import io
+
+import pytest
+import pylite3
+
+BIG = {"meta": {"k": 1, "tags": ["a", "b"]}, "payload": "x" * 1_000_000}
+
+
+def test_detach_releases_parent_buffer():
+    data = pylite3.dumps(BIG)
+    meta = pylite3.loads(data)["meta"]
+    assert meta.retained_nbytes == len(data)
+
+    detached = meta.detach()
+    assert detached == meta and detached.to_python() == BIG["meta"]
+    assert detached.retained_nbytes < 1024
+    assert len(pylite3.compact(meta)) == detached.retained_nbytes
+
+
+def test_retained_nbytes_sees_sliced_base():
+    block = bytearray(pylite3.dumps([1, 2, 3]) + b"\0" * 4096)
+    obj = pylite3.Lite3Object(memoryview(block)[:64])
+    assert obj.retained_nbytes == len(block)
+
+
+def test_compact_drops_trailing_slack():
+    data = pylite3.dumps({"a": [1, {"b": None}]})
+    compacted = pylite3.compact(data + b"\0" * 4096)
+    assert len(compacted) == len(data)
+    assert pylite3.loads(compacted).to_python() == {"a": [1, {"b": None}]}
+
+
+def test_detach_and_compact_errors():
+    with pytest.raises(ValueError):
+        pylite3.compact(b"\x09garbage")
+    with pytest.raises(TypeError):
+        pylite3.Lite3Object(b"\x02" + b"\0" * 8).detach()
+
+
+def test_block_writer_copies_proxies_natively():
+    out = io.BytesIO()
+    with pylite3.BlockWriter(out, codec="none") as w:
+        w.append(pylite3.loads(pylite3.dumps(BIG))["meta"])
+    out.seek(0)
+    reader = pylite3.BlockReader(out)
+    assert reader[0].to_python() == BIG["meta"]
+    assert len(reader.raw(0)) < 1024
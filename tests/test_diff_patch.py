@@ -0,0 +1,81 @@
+import copy
+import random
+
+import pytest
+import pylite3
+
+
+def _load(value):
+    return pylite3.loads(pylite3.dumps(value))
+
+
+BASE = {"name": "svc", "ports": [80, 443], "opts": {"tls": True, "tags": ["a", "b"]}, "blob": b"\x01"}
+
+
+def test_diff_reports_paths():
+    new = copy.deepcopy(BASE)
+    new["ports"].append(8080)
+    new["opts"]["tls"] = False
+    del new["blob"]
+    new["owner"] = {"id": 1}
+
+    ops = pylite3.diff(_load(BASE), _load(new))
+    by_path = {path: (op, value) for op, path, value in ops}
+    assert by_path[("ports", 2)] == ("add", 8080)
+    assert by_path[("opts", "tls")] == ("replace", False)
+    assert by_path[("blob",)] == ("remove", None)
+    op, owner = by_path[("owner",)]
+    assert op == "add" and isinstance(owner, pylite3.Lite3Object) and owner == {"id": 1}
+    assert pylite3.diff(_load(BASE), _load(BASE)) == []
+
+
+def _random_doc(rng, depth=0):
+    r = rng.random()
+    if depth < 3 and r < 0.35:
+        return {f"k{rng.randint(0, 5)}": _random_doc(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+    if depth < 3 and r < 0.6:
+        return [_random_doc(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return rng.choice([None, True, 0, 7, 2.5, "s", b"b"])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_apply_patch_roundtrips_diff(seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        a, b = {"root": _random_doc(rng)}, {"root": _random_doc(rng)}
+        la, lb = _load(a), _load(b)
+        patched = pylite3.apply_patch(la, pylite3.diff(la, lb))
+        assert pylite3.loads(patched, recursive=True) == b
+
+
+def test_apply_patch_ops():
+    doc = _load(BASE)
+    out = pylite3.apply_patch(doc, [
+        ("add", ("ports", "-"), 8443),
+        ("add", ("ports", 0), 22),
+        ("remove", ("opts", "tags", 0)),
+        ("add", ("extra",), {"list": [1]}),
+        ("add", ("extra", "list", 1), 2),
+        ("replace", ("name",), doc["opts"]),
+    ])
+    assert pylite3.loads(out, recursive=True) == {
+        "name": {"tls": True, "tags": ["a", "b"]},
+        "ports": [22, 80, 443, 8443],
+        "opts": {"tls": True, "tags": ["b"]},
+        "blob": b"\x01",
+        "extra": {"list": [1, 2]},
+    }
+    assert pylite3.loads(pylite3.apply_patch(doc, [("replace", (), [1])]), recursive=True) == [1]
+
+
+@pytest.mark.parametrize("ops, exc", [
+    ([("remove", ("missing",))], KeyError),
+    ([("replace", ("ports", 5), 1)], IndexError),
+    ([("add", ("ports", "x"), 1)], TypeError),
+    ([("add", ("name", "x"), 1)], TypeError),
+    ([("move", ("name",), 1)], ValueError),
+    ([("add", ("k",), object())], TypeError),
+])
+def test_apply_patch_errors(ops, exc):
+    with pytest.raises(exc):
+        pylite3.apply_patch(_load(BASE), ops)
@@ -0,0 +1,47 @@
+import dataclasses
+
+import pytest
+import pylite3
+
+MSGS = [{"id": i, "user": f"u{i}", "vals": list(range(i % 7)), "ok": i % 2 == 0} for i in range(600)]
+
+
+def test_dumps_many_matches_dumps():
+    buf, offsets = pylite3.dumps_many(MSGS)
+    assert isinstance(buf, bytearray) and len(offsets) == len(MSGS) + 1
+    assert offsets[0] == 0 and offsets[-1] == len(buf)
+    for i, msg in enumerate(MSGS):
+        assert offsets[i] % 4 == 0
+        chunk = bytes(buf[offsets[i]:offsets[i + 1]])
+        ref = pylite3.dumps(msg)
+        assert chunk[:len(ref)] == ref and not any(chunk[len(ref):])
+        assert pylite3.loads(memoryview(buf)[offsets[i]:offsets[i + 1]]).to_python() == msg
+
+
+def test_framed_roundtrip_with_large_documents():
+    docs = [{"blob": "x" * 100_000}, [1, 2, 3], {"n": None}] * 3
+    buf, offsets = pylite3.dumps_many(docs, framed=True)
+    assert [d.to_python() for d in pylite3.iter_framed(buf)] == docs
+    assert int.from_bytes(buf[offsets[1]:offsets[1] + 4], "little") == len(pylite3.dumps(docs[1]))
+
+
+def test_dumps_many_accepts_records_proxies_and_default():
+    @dataclasses.dataclass
+    class Point:
+        x: int
+        y: object
+
+    proxy = pylite3.loads(pylite3.dumps({"a": [1]}))
+    buf, offsets = pylite3.dumps_many([Point(1, {2}), proxy["a"]], default=sorted)
+    docs = [pylite3.loads(buf[offsets[i]:offsets[i + 1]]).to_python() for i in range(2)]
+    assert docs == [{"x": 1, "y": [2]}, [1]]
+
+
+def test_dumps_many_errors_and_empty():
+    buf, offsets = pylite3.dumps_many([])
+    assert len(buf) == 0 and list(offsets) == [0]
+    with pytest.raises(TypeError):
+        pylite3.dumps_many([{"a": 1}, 5])
+    buf, _ = pylite3.dumps_many([{"a": 1}], framed=True)
+    with pytest.raises(ValueError):
+        list(pylite3.iter_framed(buf[:-4]))
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+import pylite3
+
+
+def _load(value):
+    return pylite3.loads(pylite3.dumps(value))
+
+
+def _shuffled(value, rng):
+    if isinstance(value, dict):
+        items = list(value.items())
+        rng.shuffle(items)
+        return {k: _shuffled(v, rng) for k, v in items}
+    if isinstance(value, list):
+        return [_shuffled(v, rng) for v in value]
+    return value
+
+
+DOC = {"id": 7, "tags": ["a", "b"], "meta": {"score": 1.5, "ok": True, "blob": b"\x00", "none": None},
+       "rows": [{"x": i, "y": str(i)} for i in range(20)]}
+
+
+def test_key_order_does_not_matter():
+    rng = random.Random(3)
+    a, b = _load(DOC), _load(_shuffled(DOC, rng))
+    assert a == b and not (a != b)
+    assert a.fingerprint() == b.fingerprint()
+    assert hash(a) == hash(b)
+    assert len({a, b}) == 1
+
+
+@pytest.mark.parametrize("left, right, equal", [
+    ({"a": 1}, {"a": 1.0}, True),
+    ({"a": 1}, {"a": True}, True),
+    ([0.5], [0.5], True),
+    ({"a": 1}, {"a": 2}, False),
+    ({"a": 1}, {"b": 1}, False),
+    ({"a": 1}, {"a": 1, "b": 2}, False),
+    ([1, 2], [2, 1], False),
+    (["a"], [b"a"], False),
+    ([None], [0], False),
+    ({"a": [1, {"b": "c"}]}, {"a": [1, {"b": "d"}]}, False),
+])
+def test_matches_python_equality(left, right, equal):
+    a, b = _load(left), _load(right)
+    assert (a == b) is equal
+    assert (a == right) is equal and (left == b) is equal
+    if equal:
+        assert a.fingerprint() == b.fingerprint()
+    else:
+        assert a.fingerprint() != b.fingerprint()
+
+
+def test_compares_with_python_containers():
+    doc = _load(DOC)
+    assert doc == DOC
+    assert doc["tags"] == ["a", "b"] and doc["tags"] != ("a", "b")
+    assert doc["tags"] == doc["tags"][:]
+    assert doc != [1] and doc != "x"
+    # Nested containers now compare natively during array membership checks.
+    assert {"x": 3, "y": "3"} in doc["rows"]
+
+
+class _FrozenMap(dict):
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+
+def test_equal_values_hash_alike():
+    # Hashable Python containers never compare equal, so dict/set lookups stay consistent.
+    arr, obj = _load([1, 2]), _load({"a": 1})
+    assert arr != (1, 2) and (1, 2) != arr
+    assert obj != _FrozenMap(a=1) and obj == {"a": 1}
+    assert len({arr, (1, 2)}) == 2
+    assert {arr: "x"}.get((1, 2)) is None
@@ -0,0 +1,67 @@
+import pytest
+import pylite3
+
+DOC = {"a": [1, {"b": None}, []], "c": "x"}
+
+
+def test_events_stream_matches_document():
+    events = list(pylite3.loads(pylite3.dumps({"a": [1, {"b": None}, []]})).events())
+    assert events == [
+        ("start_object", None), ("key", "a"), ("start_array", None), ("scalar", 1),
+        ("start_object", None), ("key", "b"), ("scalar", None), ("end_object", None),
+        ("start_array", None), ("end_array", None), ("end_array", None), ("end_object", None),
+    ]
+
+
+def test_events_skip_and_depth():
+    events = pylite3.loads(pylite3.dumps([[1, 2, 3], 4])).events()
+    assert next(events) == ("start_array", None)
+    assert next(events) == ("start_array", None)
+    assert events.depth == 2
+    events.skip()
+    assert list(events) == [("scalar", 4), ("end_array", None)]
+
+    events = pylite3.loads(pylite3.dumps({"secret": {"k": 1}})).events()
+    assert next(events) == ("start_object", None)
+    assert next(events) == ("key", "secret")
+    events.skip()
+    assert list(events) == [("end_object", None)]
+
+
+class Counter:
+    def __init__(self):
+        self.keys = []
+        self.scalars = []
+        self.depth = 0
+        self.max_depth = 0
+
+    def start_object(self):
+        self.depth += 1
+        self.max_depth = max(self.max_depth, self.depth)
+
+    def end_object(self):
+        self.depth -= 1
+
+    def key(self, name):
+        self.keys.append(name)
+
+    def scalar(self, value):
+        self.scalars.append(value)
+
+
+def test_walk_dispatches_to_handler():
+    h = Counter()
+    pylite3.walk(pylite3.dumps([{"x": 1, "y": {"z": "s"}}, True]), h)
+    assert sorted(h.keys) == ["x", "y", "z"]
+    assert sorted(h.scalars, key=repr) == ["s", 1, True]
+    assert h.depth == 0 and h.max_depth == 2
+
+
+def test_walk_start_false_skips_container():
+    class SkipArrays(Counter):
+        def start_array(self):
+            return False
+
+    h = SkipArrays()
+    pylite3.walk(pylite3.loads(pylite3.dumps(DOC)), h)
+    assert sorted(h.keys) == ["a", "c"] and h.scalars == ["x"]
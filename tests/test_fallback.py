@@ -76,3 +76,36 @@ def test_dumps_fallback_kwargs():
     # But usually it's insertion order.
     # space after separator is default.
     assert res == '{\n  "1": "custom"\n}'
+
+def test_loads_format_switch():
+    lite3_bytes = pylite3.dumps({"a": 1})
+    json_bytes = b'{"a": 1}'
+
+    assert pylite3.loads(lite3_bytes, format="lite3")["a"] == 1
+    assert pylite3.loads(json_bytes, format="json") == {"a": 1}
+    with pytest.raises(ValueError):
+        pylite3.loads(json_bytes, format="lite3")
+    with pytest.raises(TypeError):
+        pylite3.loads('{"a": 1}', format="lite3")
+    with pytest.raises(ValueError):
+        pylite3.loads(json_bytes, format="yaml")
+
+
+def test_loads_custom_json_decoder_and_fallback_counter():
+    calls = []
+
+    def decoder(data):
+        calls.append(data)
+        return json.loads(data)
+
+    pylite3.reset_fallback_stats()
+    assert pylite3.loads(b'[1, 2]', json_loads=decoder) == [1, 2]
+    assert calls == [b'[1, 2]']
+
+    # json.loads hooks force the stdlib decoder.
+    assert pylite3.loads(b'{"a": 1}', json_loads=decoder, object_hook=dict) == {"a": 1}
+    assert len(calls) == 1
+
+    _ = pylite3.loads(pylite3.dumps({"a": 1}))
+    _ = pylite3.dumps(1)
+    assert pylite3.fallback_stats() == {"loads": 2, "dumps": 1}
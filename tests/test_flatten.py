@@ -0,0 +1,62 @@
+import math
+
+import pytest
+import pylite3
+
+ROWS = [
+    {"id": 1, "user": {"name": "ann", "addr": {"city": "Oslo", "zip": 100}}, "score": 1, "tags": ["a"]},
+    {"id": 2, "user": {"name": "bob"}, "score": 2.5, "active": True},
+    {"id": 3, "user": {"name": "cy", "addr": {"city": "Rome", "zip": 200}}, "score": None},
+]
+
+
+def test_flatten_rows_into_typed_columns():
+    columns, masks = pylite3.flatten(pylite3.loads(pylite3.dumps(ROWS)))
+    assert set(columns) == {"id", "user.name", "user.addr.city", "user.addr.zip", "score", "tags", "active"}
+
+    assert columns["id"].typecode == "q" and list(columns["id"]) == [1, 2, 3]
+    assert columns["user.addr.zip"].typecode == "q" and list(columns["user.addr.zip"]) == [100, 0, 200]
+    assert list(masks["user.addr.zip"]) == [0, 1, 0]
+
+    score = columns["score"]
+    assert score.typecode == "d" and score[:2].tolist() == [1.0, 2.5] and math.isnan(score[2])
+    assert list(masks["score"]) == [0, 0, 1]
+
+    assert columns["user.addr.city"] == ["Oslo", None, "Rome"]
+    assert columns["tags"] == [["a"], None, None]
+    assert columns["active"] == [None, True, None]
+    assert list(masks["active"]) == [1, 0, 1]
+
+
+def test_flatten_promotes_numbers_to_objects():
+    columns, masks = pylite3.flatten(pylite3.dumps([{"v": 1}, {}, {"v": 2.5}, {"v": "x"}]))
+    assert columns["v"] == [1, None, 2.5, "x"]
+    assert list(masks["v"]) == [0, 1, 0, 0]
+
+
+def test_flatten_single_object_and_separator():
+    columns, masks = pylite3.flatten(pylite3.dumps({"a": {"b": 1}, "c": b"x"}), sep="/")
+    assert {k: list(v) for k, v in columns.items()} == {"a/b": [1], "c": [b"x"]}
+    assert all(list(m) == [0] for m in masks.values())
+
+
+def test_flatten_rejects_non_object_rows():
+    with pytest.raises(TypeError):
+        pylite3.flatten(pylite3.dumps([{"a": 1}, 2]))
+    with pytest.raises(TypeError):
+        pylite3.flatten(pylite3.dumps(5))
+
+
+def test_flatten_colliding_paths_share_a_column():
+    columns, masks = pylite3.flatten(pylite3.dumps([{"a.b": 1}, {"a": {"b": 3}}, {"c": 0}]))
+    assert list(columns["a.b"]) == [1, 3, 0] and list(masks["a.b"]) == [0, 0, 1]
+    with pytest.raises(ValueError):
+        pylite3.flatten(pylite3.dumps([{"a.b": 1, "a": {"b": 2}}, {"a": {"b": 3}}]))
+
+
+def test_flatten_and_walk_validate_raw_bytes():
+    bad = bytes([6]) + bytes(10)  # object tag, but no room for a node
+    with pytest.raises(ValueError):
+        pylite3.flatten(bad)
+    with pytest.raises(ValueError):
+        pylite3.walk(bad, object())
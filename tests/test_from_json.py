@@ -0,0 +1,41 @@
+import json
+
+import pytest
+import pylite3
+
+
+@pytest.mark.parametrize("text", [
+    "{}",
+    "[]",
+    ' {"a" : [1, -0, 2.5e3, -1.5E-2, true, false, null], "b": {"c": {}}} ',
+    '{"s": "x\\n\\t\\"\\\\\\/ \\u00e9 \\ud83d\\ude00 é€"}',
+    "[9223372036854775807, -9223372036854775808]",
+    '{"dup": 1, "dup": 2}',
+])
+def test_from_json_matches_json_loads(text):
+    data = pylite3.from_json(text)
+    assert isinstance(data, bytes)
+    assert pylite3.loads(data, recursive=True) == json.loads(text)
+    assert pylite3.from_json(text.encode("utf-8")) == data
+
+
+def test_from_json_large_document_grows_buffer():
+    doc = {"rows": [{"id": i, "name": f"row-{i}", "vals": [i, i / 3]} for i in range(5000)]}
+    text = json.dumps(doc)
+    assert pylite3.loads(pylite3.from_json(text), recursive=True) == doc
+
+
+@pytest.mark.parametrize("bad", [
+    "", "1", '"str"', "[1,]", '{"a":1,}', "[01]", "[1.]", '{"a" 1}',
+    '["\x01"]', "[1] x", '["a', b'["\xff"]', '{"a\\u0000": 1}',
+    # Unpaired surrogates have no UTF-8 encoding.
+    '["\\ud800"]', '["\\udc00"]', '["\\ud800x"]', '["\\ud800\\u0041"]', '{"\\ud83d": 1}',
+])
+def test_from_json_rejects_invalid_input(bad):
+    with pytest.raises(ValueError):
+        pylite3.from_json(bad)
+
+
+def test_from_json_int_overflow():
+    with pytest.raises(OverflowError):
+        pylite3.from_json("[9223372036854775808]")
@@ -0,0 +1,54 @@
+import pytest
+import pylite3
+
+DOC = {"i": 7, "f": 1.5, "s": "text", "b": b"\x00\x01", "t": True, "n": None, "o": {"x": 1}}
+
+
+@pytest.fixture(scope="module")
+def obj():
+    return pylite3.loads(pylite3.dumps(DOC))
+
+
+def test_get_hits_and_misses(obj):
+    assert obj.get("i") == 7 and obj.get("o")["x"] == 1
+    assert obj.get("n", "dflt") is None
+    assert obj.get("missing") is None and obj.get("missing", 3) == 3
+    assert obj.get(5, "dflt") == "dflt"
+    assert obj.get("s\x00", "dflt") == "dflt"
+
+
+@pytest.mark.parametrize(
+    "getter, key, expected",
+    [
+        ("get_int", "i", 7),
+        ("get_float", "f", 1.5),
+        ("get_float", "i", 7.0),
+        ("get_str", "s", "text"),
+        ("get_bytes", "b", b"\x00\x01"),
+        ("get_bool", "t", True),
+    ],
+)
+def test_typed_getters_match(obj, getter, key, expected):
+    value = getattr(obj, getter)(key)
+    assert value == expected and type(value) is type(expected)
+
+
+@pytest.mark.parametrize("getter", ["get_int", "get_float", "get_str", "get_bytes", "get_bool"])
+def test_typed_getters_default_on_mismatch(obj, getter):
+    fn = getattr(obj, getter)
+    assert fn("missing") is None
+    assert fn("missing", -1) == -1
+    assert fn("o", -1) == -1 and fn("n", -1) == -1
+    assert fn(("not", "a", "key"), -1) == -1
+
+
+def test_get_int_rejects_bool(obj):
+    assert obj.get_int("t", -1) == -1
+
+
+def test_getters_require_object():
+    arr = pylite3.loads(pylite3.dumps([1]))
+    with pytest.raises(TypeError):
+        arr.get("a")
+    with pytest.raises(TypeError):
+        arr.get_int("a")
@@ -0,0 +1,33 @@
+import concurrent.futures
+
+import pytest
+import pylite3
+
+
+def test_loads_many_parallel_matches_serial():
+    bufs = [pylite3.dumps({"i": i, "tags": ["a", i]}) for i in range(500)]
+    parallel = pylite3.loads_many(bufs, workers=4)
+    serial = pylite3.loads_many(bufs, workers=1)
+    assert [o["i"] for o in parallel] == list(range(500))
+    assert [o.to_python() for o in parallel] == [o.to_python() for o in serial]
+
+
+def test_loads_many_reports_errors_per_item():
+    good = pylite3.dumps([1, 2])
+    out = pylite3.loads_many([good, b'{"a": 1}', "text", bytes([6]), bytearray(good)], workers=2)
+    assert out[0][1] == 2
+    assert isinstance(out[1], ValueError)
+    assert isinstance(out[2], TypeError)
+    assert isinstance(out[3], ValueError)
+    assert out[4].to_python() == [1, 2]
+
+    with pytest.raises(ValueError, match="Item 1"):
+        pylite3.loads_many([good, b"{}"], errors="raise")
+
+
+def test_loads_many_with_executor():
+    bufs = [pylite3.dumps({"k": i}) for i in range(64)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+        out = pylite3.loads_many(bufs, workers=3, executor=pool)
+    assert [o["k"] for o in out] == list(range(64))
+    assert pylite3.loads_many([]) == []
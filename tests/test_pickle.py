@@ -0,0 +1,38 @@
+import copy
+import pickle
+
+import pytest
+import pylite3
+
+DOC = {"a": [1, {"b": "x"}], "n": list(range(100))}
+
+
+@pytest.mark.parametrize("protocol", range(2, pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle_roundtrip(protocol):
+    obj = pylite3.loads(pylite3.dumps(DOC))
+    restored = pickle.loads(pickle.dumps(obj, protocol=protocol))
+    assert isinstance(restored, pylite3.Lite3Object)
+    assert restored == obj and restored.to_python() == DOC
+
+    sub = pickle.loads(pickle.dumps(obj["a"][1], protocol=protocol))
+    assert sub.to_python() == {"b": "x"}
+
+
+def test_pickle_protocol5_out_of_band():
+    data = bytearray(pylite3.dumps(DOC))
+    obj = pylite3.loads(data)["a"]
+    buffers = []
+    payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    assert len(buffers) == 1 and len(payload) < 100
+    restored = pickle.loads(payload, buffers=buffers)
+    assert restored.to_python() == DOC["a"]
+
+
+def test_copy_returns_same_proxy():
+    obj = pylite3.loads(pylite3.dumps(DOC))
+    assert copy.copy(obj) is obj and copy.deepcopy(obj) is obj
+
+
+def test_dumps_proxy_root():
+    obj = pylite3.loads(pylite3.dumps(DOC))
+    assert pylite3.loads(pylite3.dumps(obj["a"], fallback="raise")).to_python() == DOC["a"]
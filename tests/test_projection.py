@@ -0,0 +1,44 @@
+import pytest
+import pylite3
+
+DOC = {
+    "user": {"id": 1, "name": "ada", "ssn": "x", "addr": {"city": "NYC", "zip": "10001"}},
+    "items": [{"sku": "a", "qty": 1}, {"sku": "b", "qty": 2}],
+    "big": list(range(100)),
+    "note": "n",
+}
+
+
+@pytest.fixture
+def doc():
+    return pylite3.loads(pylite3.dumps(DOC))
+
+
+def test_include_projection(doc):
+    out = doc.to_python(fields={"user": {"id": True, "name": True}, "items": {"*": {"sku": True}}, "missing": True})
+    assert out == {"user": {"id": 1, "name": "ada"}, "items": [{"sku": "a"}, {"sku": "b"}]}
+    assert type(out["user"]) is dict
+    # A spec applied to an array without "*" projects each element.
+    assert doc.to_python(fields={"items": {"qty": True}}) == {"items": [{"qty": 1}, {"qty": 2}]}
+
+
+def test_exclude_projection(doc):
+    expected = {k: v for k, v in DOC.items() if k != "big"}
+    expected["user"] = {k: v for k, v in DOC["user"].items() if k != "ssn"}
+    assert doc.to_python(fields={"big": False, "user": {"ssn": False}}) == expected
+    assert doc.to_python(fields={"*": True, "big": False, "user": False}) == {"items": DOC["items"], "note": "n"}
+
+
+def test_projection_with_hooks_and_slices(doc):
+    out = doc.to_python(fields={"user": {"addr": True}}, object_pairs_hook=lambda pairs: sorted(k for k, _ in pairs))
+    assert out == ["user"]
+    assert doc["items"][1:].to_python(fields={"sku": True}) == [{"sku": "b"}]
+    with pytest.raises(TypeError):
+        doc.to_python(fields={"user": "id"})
+
+
+def test_exclude_everything(doc):
+    assert doc.to_python(fields=False) == {}
+    assert doc["big"].to_python(fields=False) == []
+    assert doc["items"][:].to_python(fields=False) == [{}, {}]
+    assert doc.to_python(fields=False, object_pairs_hook=lambda pairs: ("pairs", pairs)) == ("pairs", [])
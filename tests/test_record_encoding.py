@@ -0,0 +1,109 @@
+import dataclasses
+import datetime
+import fractions
+import ipaddress
+import pathlib
+from typing import List, NamedTuple
+
+import pytest
+import pylite3
+
+
+@dataclasses.dataclass
+class Item:
+    sku: str
+    qty: int
+    tags: List[str] = dataclasses.field(default_factory=list)
+
+
+class Point(NamedTuple):
+    x: int
+    y: int
+
+
+class Slotted:
+    __slots__ = ("a", "__hidden", "unset")
+
+    def __init__(self):
+        self.a = 1
+        self.__hidden = "h"
+
+
+@dataclasses.dataclass
+class Order:
+    id: int
+    items: List[Item]
+    at: Point
+    when: object = None
+
+
+def test_dataclass_root_and_nesting_roundtrip():
+    order = Order(7, [Item("x", 2, ["t"]), Item("y", 1)], Point(1, 2))
+    data = pylite3.dumps(order, fallback="raise")
+    assert pylite3.loads(data).to_python() == {
+        "id": 7,
+        "items": [{"sku": "x", "qty": 2, "tags": ["t"]}, {"sku": "y", "qty": 1, "tags": []}],
+        "at": [1, 2],
+        "when": None,
+    }
+    assert pylite3.loads(data, type=Order) == order
+
+
+def test_records_inside_containers():
+    data = pylite3.dumps({"p": Point(3, 4), "list": [Item("z", 0), Point(5, 6)], "tuple": (1, 2)}, fallback="raise")
+    assert pylite3.loads(data).to_python() == {
+        "p": [3, 4],
+        "list": [{"sku": "z", "qty": 0, "tags": []}, [5, 6]],
+        "tuple": [1, 2],
+    }
+
+
+def test_namedtuple_as_object_opt_in():
+    data = pylite3.dumps({"p": Point(3, 4), "list": [Point(5, 6)]}, namedtuple_as_object=True, fallback="raise")
+    assert pylite3.loads(data).to_python() == {"p": {"x": 3, "y": 4}, "list": [{"x": 5, "y": 6}]}
+    buf, offsets = pylite3.dumps_many([Point(1, 2)], namedtuple_as_object=True)
+    assert pylite3.loads(bytes(buf[offsets[0]:offsets[1]])).to_python() == {"x": 1, "y": 2}
+    # Both shapes decode back into the NamedTuple.
+    assert pylite3.loads(pylite3.dumps(Point(1, 2)), type=Point) == Point(1, 2)
+    assert pylite3.loads(data, type=dict[str, object])["p"] == {"x": 3, "y": 4}
+
+
+def test_namedtuple_shape_matches_json_fallback():
+    # A non-str key forces the JSON fallback; the NamedTuple shape must not change.
+    assert pylite3.dumps([Point(1, 2), {1: 2}]) == '[[1, 2], {"1": 2}]'
+    assert pylite3.dumps([Point(1, 2), {1: 2}], namedtuple_as_object=True) == '[{"x": 1, "y": 2}, {"1": 2}]'
+
+
+def test_slots_skip_unset_and_unmangle_private_names():
+    data = pylite3.dumps([Slotted()], fallback="raise")
+    assert pylite3.loads(data).to_python() == [{"a": 1, "__hidden": "h"}]
+
+
+def test_record_fields_use_default_hook():
+    order = Order(1, [], Point(0, 0), when=datetime.date(2024, 1, 2))
+    data = pylite3.dumps(order, default=str, fallback="raise")
+    assert pylite3.loads(data)["when"] == "2024-01-02"
+    with pytest.raises(TypeError):
+        pylite3.dumps(order, fallback="raise")
+
+
+def test_default_wins_for_stdlib_slotted_types():
+    data = pylite3.dumps({"f": fractions.Fraction(1, 4), "ip": ipaddress.IPv4Address("1.2.3.4"),
+                          "p": [pathlib.PurePosixPath("/tmp")]}, default=str, fallback="raise")
+    assert pylite3.loads(data).to_python() == {"f": "1/4", "ip": "1.2.3.4", "p": ["/tmp"]}
+    assert pylite3.dumps(ipaddress.IPv4Address("1.2.3.4"), default=str) == '"1.2.3.4"'
+    # Dataclasses and NamedTuples keep their native encoding when a hook is given.
+    data = pylite3.dumps([Item("x", 1), Point(1, 2)], default=str, fallback="raise")
+    assert pylite3.loads(data).to_python() == [{"sku": "x", "qty": 1, "tags": []}, [1, 2]]
+
+
+def test_unencodable_types_are_not_cached():
+    import gc
+    import weakref
+
+    cls = type("Opaque", (), {})
+    ref = weakref.ref(cls)
+    assert pylite3.loads(pylite3.dumps([cls()], default=lambda o: "o", fallback="raise"))[0] == "o"
+    del cls
+    gc.collect()
+    assert ref() is None
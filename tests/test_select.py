@@ -0,0 +1,73 @@
+import random
+
+import pytest
+import pylite3
+
+_rng = random.Random(7)
+ROWS = [
+    {"id": i, "status": _rng.choice(["active", "idle"]), "score": _rng.random(),
+     "ts": _rng.randint(0, 1000), "user": {"age": _rng.randint(18, 80)}}
+    for i in range(300)
+]
+ROWS[3]["score"] = None
+del ROWS[4]["ts"]
+
+
+@pytest.fixture(scope="module")
+def arr():
+    return pylite3.loads(pylite3.dumps(ROWS + [7, "scalar"]))
+
+
+def test_select_filters_projects_and_sorts(arr):
+    out = arr.select(
+        where=[("status", "==", "active"), ("score", ">", 0.5), (("user", "age"), "<=", 40)],
+        fields=["id", "ts"],
+        order_by="-ts",
+        limit=10,
+    )
+    matching = [r for r in ROWS if r["status"] == "active" and isinstance(r["score"], float)
+                and r["score"] > 0.5 and r["user"]["age"] <= 40]
+    expected = sorted(({"id": r["id"], "ts": r["ts"]} for r in matching), key=lambda r: -r["ts"])[:10]
+    assert out == expected
+
+
+@pytest.mark.parametrize("op, value, check", [
+    ("!=", "active", lambda r: r.get("status") != "active"),
+    ("in", [1, 2, 3], lambda r: r.get("id") in (1, 2, 3)),
+    ("not in", ["idle"], lambda r: r.get("status") != "idle"),
+    (">=", 290, lambda r: r.get("id", -1) >= 290),
+    ("<", "b", lambda r: r.get("status", "z") < "b"),
+])
+def test_select_operators(arr, op, value, check):
+    field = "id" if op in ("in", ">=") else "status"
+    rows = arr.select(where=[(field, op, value)], fields="id")
+    assert [r["id"] for r in rows] == [r["id"] for r in ROWS if check(r)]
+
+
+def test_select_edge_cases(arr):
+    # Rows missing the sort field go last; limit stops early without order_by.
+    ordered = arr.select(where=[("id", "<", 6)], fields="id", order_by="ts")
+    assert ordered[-1] == {"id": 4}
+    assert len(arr.select(limit=3)) == 3
+    assert arr.select(where=[("score", ">", "x")]) == []
+    assert arr.select(where=[("id", "==", 0)])[0] == ROWS[0]
+    with pytest.raises(ValueError):
+        arr.select(where=[("id", "~", 1)])
+    with pytest.raises(TypeError):
+        pylite3.loads(pylite3.dumps({"a": 1})).select()
+
+
+def test_select_order_by_nulls_and_mixed_types(arr):
+    # Row 3 has a null score: it sorts with the rows that lack the field.
+    ordered = arr.select(where=[("id", "<", 6)], fields="id", order_by="score")
+    assert ordered[-1] == {"id": 3}
+    mixed = pylite3.loads(pylite3.dumps([{"v": "b"}, {"v": 2}, {"v": None}, {"v": 1.5}, {"v": "a"}, {}]))
+    assert [r.get("v") for r in mixed.select(order_by="v")] == [1.5, 2, "a", "b", None, None]
+    assert [r.get("v") for r in mixed.select(order_by="-v")] == [2, 1.5, "b", "a", None, None]
+
+
+def test_select_in_rejects_strings(arr):
+    with pytest.raises(TypeError):
+        arr.select(where=[("status", "in", "active")])
+    with pytest.raises(TypeError):
+        arr.select(where=[("status", "not in", b"idle")])
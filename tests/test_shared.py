@@ -0,0 +1,54 @@
+import concurrent.futures
+import pickle
+
+import pytest
+import pylite3
+
+DOC = {"id": 1, "rows": [{"v": i} for i in range(1000)]}
+
+
+def _consume(shared):
+    doc = shared.doc
+    return doc["id"], len(doc["rows"]), doc["rows"][-1]["v"]
+
+
+def test_create_attach_and_close():
+    with pylite3.SharedDocument.create(DOC) as owner:
+        assert owner.doc.to_python() == DOC
+        consumer = pylite3.SharedDocument(owner.name)
+        assert consumer.nbytes == owner.nbytes
+        assert consumer.doc["rows"][3]["v"] == 3
+
+        held = consumer.doc["rows"]
+        with pytest.raises(BufferError):
+            consumer.close()
+        del held
+        consumer.close()
+        consumer.close()
+
+
+def test_pickle_sends_only_the_name():
+    with pylite3.SharedDocument.create(pylite3.dumps(DOC)) as owner:
+        payload = pickle.dumps(owner)
+        assert len(payload) < 200
+        restored = pickle.loads(payload)
+        assert restored.name == owner.name and restored.doc == owner.doc
+        restored.close()
+
+
+def test_process_pool_handoff():
+    with pylite3.SharedDocument.create(pylite3.loads(pylite3.dumps(DOC))) as owner:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as pool:
+            assert pool.submit(_consume, owner).result() == (1, 1000, 999)
+
+
+def test_attach_rejects_foreign_block():
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(create=True, size=64)
+    try:
+        with pytest.raises(ValueError):
+            pylite3.SharedDocument(shm.name)
+    finally:
+        shm.close()
+        shm.unlink()
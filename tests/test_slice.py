@@ -0,0 +1,47 @@
+import collections.abc
+
+import pytest
+import pylite3
+
+
+@pytest.fixture
+def arr():
+    return pylite3.loads(pylite3.dumps(list(range(100)) + [{"x": 1}, [2, 3]]))
+
+
+def test_slice_is_lazy_sequence(arr):
+    view = arr[10:20]
+    assert isinstance(view, pylite3.Lite3Slice)
+    assert isinstance(view, collections.abc.Sequence)
+    assert len(view) == 10
+    assert view[0] == 10 and view[-1] == 19
+    assert view == list(range(10, 20))
+    assert list(reversed(view)) == list(range(19, 9, -1))
+    with pytest.raises(IndexError):
+        view[10]
+
+
+@pytest.mark.parametrize("outer, inner", [
+    (slice(None), slice(5, 50, 7)),
+    (slice(10, 90, 3), slice(None, None, -1)),
+    (slice(None, None, -2), slice(3, -3, 4)),
+    (slice(50, 10, -1), slice(-5, None)),
+])
+def test_nested_slicing_matches_list(arr, outer, inner):
+    expected = list(range(100))[outer][inner]
+    assert arr[:100][outer][inner].to_python() == expected
+
+
+def test_slice_to_python_converts_containers(arr):
+    tail = arr[-2:]
+    assert isinstance(tail[0], pylite3.Lite3Object)
+    assert tail.to_python() == [{"x": 1}, [2, 3]]
+    assert arr[5:5].to_python() == []
+
+
+def test_slice_equality_matches_arrays(arr):
+    small = pylite3.loads(pylite3.dumps([1, 2, 3]))
+    assert small[0:2] == [1, 2] and small[0:2] != (1, 2)
+    assert small != (1, 2, 3)
+    assert small[:] == small and small == small[:]
+    assert small[:] == small[0:3] and small[1:] != small
@@ -0,0 +1,37 @@
+import concurrent.futures
+import sys
+import sysconfig
+
+import pytest
+import pylite3
+
+
+def test_concurrent_reads_of_shared_proxy():
+    doc = pylite3.loads(pylite3.dumps({"rows": [{"id": i, "name": f"n{i}"} for i in range(2000)]}))
+    expected = sum(range(2000))
+
+    def work(_):
+        rows = doc["rows"]
+        return sum(row["id"] for row in rows)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+        assert list(pool.map(work, range(16))) == [expected] * 16
+
+
+def test_concurrent_fallback_counts_are_exact():
+    pylite3.reset_fallback_stats()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: pylite3.loads('{"a": 1}'), range(400)))
+    assert pylite3.fallback_stats()["loads"] == 400
+
+
+def test_proxy_cannot_be_reinitialized():
+    obj = pylite3.loads(pylite3.dumps({"a": 1}))
+    with pytest.raises(TypeError):
+        obj.__init__(pylite3.dumps([1]))
+    assert obj["a"] == 1
+
+
+@pytest.mark.skipif(not sysconfig.get_config_var("Py_GIL_DISABLED"), reason="requires a free-threaded build")
+def test_import_keeps_gil_disabled():
+    assert not sys._is_gil_enabled()
@@ -0,0 +1,36 @@
+import json
+import math
+
+import pytest
+import pylite3
+
+
+def test_to_json_matches_json_dumps():
+    doc = {
+        "a": [1, -2, 2.5, 1e100, None, True, False],
+        "s": 'quote " backslash \\ newline \n tab \t ctrl \x01',
+        "nested": {"x": {"y": []}, "empty": {}},
+        "big": 2**62,
+    }
+    obj = pylite3.loads(pylite3.dumps(doc))
+    out = obj.to_json()
+    assert isinstance(out, bytes)
+    assert json.loads(out) == doc
+    assert obj["a"].to_json() == json.dumps(doc["a"], separators=(",", ":")).encode()
+
+
+def test_to_json_unicode_and_ensure_ascii():
+    doc = {"k": "é😀"}
+    obj = pylite3.loads(pylite3.dumps(doc))
+    assert obj.to_json() == '{"k":"é😀"}'.encode("utf-8")
+    assert obj.to_json(ensure_ascii=True) == json.dumps(doc, separators=(",", ":")).encode()
+
+
+def test_to_json_bytes_as_base64_and_nan():
+    obj = pylite3.loads(pylite3.dumps({"b": b"hi!", "c": b"h", "n": float("nan")}))
+    decoded = json.loads(obj.to_json())
+    assert decoded["b"] == "aGkh"
+    assert decoded["c"] == "aA=="
+    assert math.isnan(decoded["n"])
+    with pytest.raises(ValueError):
+        obj.to_json(allow_nan=False)
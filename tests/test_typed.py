@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import dataclasses
+import enum
+import threading
+import time
+from typing import Any, Dict, List, Literal, NamedTuple, Optional, TypedDict, Union
+
+import pytest
+import pylite3
+
+
+class Color(enum.Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+@dataclasses.dataclass
+class Item:
+    sku: str
+    qty: int
+    price: float = 0.0
+
+
+class Point(NamedTuple):
+    x: int
+    y: int = 0
+
+
+class Meta(TypedDict, total=False):
+    tag: str
+
+
+@dataclasses.dataclass
+class Order:
+    id: int
+    items: List[Item]
+    color: Color
+    at: Point
+    meta: Meta
+    note: Optional[str] = None
+    kind: Literal["a", "b"] = "a"
+    tags: tuple = ()
+    extra: Any = None
+    children: List[Order] = dataclasses.field(default_factory=list)
+
+
+DOC = {
+    "id": 1,
+    "items": [{"sku": "x", "qty": 2, "price": 3}],
+    "color": "red",
+    "at": {"x": 5},
+    "meta": {"tag": "t"},
+    "kind": "b",
+    "tags": ["p"],
+    "extra": {"z": [1]},
+    "ignored": {"big": list(range(50))},
+    "children": [{"id": 2, "items": [], "color": "blue", "at": {"x": 1, "y": 2}, "meta": {}}],
+}
+
+
+def test_decode_nested_records():
+    order = pylite3.loads(pylite3.dumps(DOC), type=Order)
+    assert order == Order(
+        id=1,
+        items=[Item("x", 2, 3.0)],
+        color=Color.RED,
+        at=Point(5),
+        meta={"tag": "t"},
+        kind="b",
+        tags=("p",),
+        extra={"z": [1]},
+        children=[Order(id=2, items=[], color=Color.BLUE, at=Point(1, 2), meta={})],
+    )
+    assert type(order.items[0].price) is float
+
+
+def test_decode_as_containers_and_proxy():
+    obj = pylite3.loads(pylite3.dumps({"a": [1, 2], "b": [3]}))
+    assert obj.decode_as(Dict[str, List[int]]) == {"a": [1, 2], "b": [3]}
+    assert obj["a"].decode_as(tuple[int, int]) == (1, 2)
+    assert obj["a"].decode_as(set[Union[int, str]]) == {1, 2}
+    proxy = obj.decode_as(Dict[str, pylite3.Lite3Object])["a"]
+    assert isinstance(proxy, pylite3.Lite3Object) and list(proxy) == [1, 2]
+
+
+def test_decode_json_input():
+    assert pylite3.loads('{"x": 3}', type=Point) == Point(3)
+    assert pylite3.loads("[1, 2]", type=List[int]) == [1, 2]
+
+
+@pytest.mark.parametrize(
+    "patch, exc, message",
+    [
+        ({"id": "1"}, TypeError, "expected int, got str at $.id"),
+        ({"items": [{"sku": "x", "qty": 1.5}]}, TypeError, "at $.items[0].qty"),
+        ({"items": [{"sku": "x", "qty": True}]}, TypeError, "expected int, got bool"),
+        ({"color": "green"}, ValueError, "at $.color"),
+        ({"color": ["red"]}, TypeError, "expected Color, got array at $.color"),
+        ({"kind": "c"}, ValueError, "at $.kind"),
+        ({"at": {"y": 1}}, ValueError, "missing required field 'x' of Point at $.at"),
+    ],
+)
+def test_decode_errors(patch, exc, message):
+    with pytest.raises(exc, match=message.replace("$", r"\$").replace("[", r"\[").replace("]", r"\]")):
+        pylite3.loads(pylite3.dumps({**DOC, **patch}), type=Order)
+
+
+class Level(enum.Enum):
+    LOW = 1
+    HIGH = 2.5
+
+
+def test_enum_values_must_match_member_type():
+    assert pylite3.loads(pylite3.dumps([1, 2.5]), type=List[Level]) == [Level.LOW, Level.HIGH]
+    for bad in ([True], [1.0], [{"v": 1}]):
+        with pytest.raises((TypeError, ValueError), match=r"Level.* at \$\[0\]"):
+            pylite3.loads(pylite3.dumps(bad), type=List[Level])
+
+
+def test_unsupported_type():
+    with pytest.raises(TypeError):
+        pylite3.loads(pylite3.dumps({"a": 1}), type=Dict[int, int])
+
+
+def _slow_int():
+    time.sleep(0.05)  # widens the window while a record plan is being compiled
+    return int
+
+
+def test_concurrent_first_decode_sees_complete_plan():
+    @dataclasses.dataclass
+    class Rec:
+        a: _slow_int()  # evaluated by typing.get_type_hints
+        b: str
+
+    data = pylite3.dumps({"a": 1, "b": "x"})
+    barrier = threading.Barrier(8)
+    results, errors = [], []
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(pylite3.loads(data, type=Rec))
+        except Exception as exc:  # pragma: no cover - the failure being guarded against
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert results == [Rec(1, "x")] * 8
@@ -0,0 +1,104 @@
+import pytest
+import pylite3
+
+DOC = {
+    "items": [{"id": i, "name": f"n{i}", "tags": ["a", "b"]} for i in range(50)],
+    "meta": {"count": 50, "ok": True, "blob": b"\x00\x01", "none": None},
+    **{f"f{i}": i * 0.5 for i in range(30)},
+}
+
+
+def _pair(data):
+    return pylite3.loads(data, validate="deep"), pylite3.loads(data)
+
+
+def test_deep_marks_readonly_buffers_trusted():
+    data = bytes(pylite3.dumps(DOC))
+    trusted, checked = _pair(data)
+    assert trusted.is_trusted and not checked.is_trusted
+    assert trusted["items"][3].is_trusted and trusted["meta"].is_trusted
+    assert pylite3.loads(memoryview(data), validate="deep").is_trusted
+    # Writable buffers are checked but may change afterwards, so they are not trusted.
+    assert not pylite3.loads(bytearray(data), validate="deep").is_trusted
+
+
+def test_trusted_reads_match_checked_reads():
+    trusted, checked = _pair(bytes(pylite3.dumps(DOC)))
+    assert len(trusted) == len(checked)
+    assert list(trusted) == list(checked)
+    assert list(trusted.keys()) == list(checked.keys())
+    assert trusted.to_python() == checked.to_python() == DOC
+
+    items = trusted["items"]
+    assert len(items) == 50
+    assert [item["id"] for item in items] == list(range(50))
+    assert items[-1]["name"] == "n49" and list(items[7]["tags"]) == ["a", "b"]
+    with pytest.raises(IndexError):
+        items[50]
+    with pytest.raises(KeyError):
+        trusted["missing"]
+    assert "meta" in trusted and "missing" not in trusted and "meta\x00" not in trusted
+    assert trusted["meta"].get("blob") == b"\x00\x01" and trusted.get_float("f3") == 1.5
+    assert list(trusted["meta"].items()) == list(checked["meta"].items())
+
+
+def test_deep_rejects_what_root_check_accepts():
+    data = bytearray(pylite3.dumps({"s": "x" * 200}))
+    start = bytes(data).index(b"x" * 200)
+    data[start - 4:start] = (0xFFFFFF).to_bytes(4, "little")  # string length past the end
+    data = bytes(data)
+
+    shallow = pylite3.loads(data, format="lite3")
+    with pytest.raises(KeyError):  # only found out on access
+        shallow["s"]
+    with pytest.raises(ValueError):
+        pylite3.loads(data, format="lite3", validate="deep")
+    with pytest.raises(ValueError):
+        pylite3.loads(data[:120], format="lite3", validate="deep")
+
+
+def test_validate_argument_checked():
+    with pytest.raises(ValueError):
+        pylite3.loads(pylite3.dumps(DOC), validate="full")
+    with pytest.raises(ValueError):
+        pylite3.loads_many([pylite3.dumps(DOC)], validate="full")
+
+
+def test_loads_many_deep():
+    good = bytes(pylite3.dumps(DOC))
+    bad = good[:120]
+    out = pylite3.loads_many([good, bad, bytearray(good)] * 4, workers=2, validate="deep")
+    assert out[0].is_trusted and out[0]["items"][1]["id"] == 1
+    assert isinstance(out[1], ValueError)
+    assert not out[2].is_trusted and out[2] == out[0]
+    assert not pylite3.loads_many([good], workers=1)[0].is_trusted
+
+
+def test_readonly_view_of_mutable_buffer_is_not_trusted():
+    raw = bytearray(pylite3.dumps({f"k{i}": {"v": i} for i in range(40)}))
+    doc = pylite3.loads(memoryview(raw).toreadonly(), validate="deep")
+    assert not doc.is_trusted
+    # Rewrite the root's child offsets after validation; checked reads must cope.
+    raw[64:96] = (0x7FFFFFF0).to_bytes(4, "little") * 8
+    assert doc.get("k39") is None
+
+
+def _u32(buf, ofs):
+    return int.from_bytes(buf[ofs:ofs + 4], "little")
+
+
+def test_deep_rejects_empty_child_node():
+    # Node layout: gen_type @0, size_kc @32, kv_ofs[7] @36, child_ofs[8] @64.
+    raw = bytearray(pylite3.dumps(list(range(20))))
+    child = _u32(raw, 64)
+    assert child
+    child_kc = _u32(raw, child + 32) & 0x3F
+    raw[child + 32:child + 36] = (_u32(raw, child + 32) & ~0x3F).to_bytes(4, "little")
+    raw[child + 36:child + 40] = (0x7FFFFFF0).to_bytes(4, "little")
+    raw[32:36] = (_u32(raw, 32) - (child_kc << 6)).to_bytes(4, "little")
+    data = bytes(raw)
+
+    with pytest.raises(ValueError):
+        pylite3.loads(data, format="lite3", validate="deep")
+    with pytest.raises(RuntimeError):
+        list(pylite3.loads(data, format="lite3"))
@@ -0,0 +1,54 @@
+import collections.abc
+
+import pytest
+import pylite3
+
+
+@pytest.fixture
+def obj():
+    return pylite3.loads(pylite3.dumps({"a": 1, "b": "two", "c": [3], "d": None}))
+
+
+def test_views_are_sized_and_registered(obj):
+    keys, values, items = obj.keys(), obj.values(), obj.items()
+    assert isinstance(keys, collections.abc.KeysView)
+    assert isinstance(values, collections.abc.ValuesView)
+    assert isinstance(items, collections.abc.ItemsView)
+    assert len(keys) == len(values) == len(items) == 4
+    # Views are re-iterable, unlike the generators they replace.
+    assert sorted(keys) == sorted(keys) == ["a", "b", "c", "d"]
+
+
+def test_view_membership_and_set_ops(obj):
+    keys, items = obj.keys(), obj.items()
+    assert "c" in keys and "z" not in keys and 1 not in keys
+    assert ("a", 1) in items and ("a", 2) not in items and ("z", 1) not in items
+    assert keys == {"a", "b", "c", "d"}
+    assert keys & {"a", "z"} == {"a"}
+    assert {"z"} | keys == {"a", "b", "c", "d", "z"}
+    assert keys - {"a"} == {"b", "c", "d"}
+    assert keys.isdisjoint(["x", "y"])
+
+
+def test_iterators_over_objects_and_arrays(obj):
+    it = iter(obj)
+    assert iter(it) is it
+    assert sorted(it) == ["a", "b", "c", "d"]
+    assert next(it, "done") == "done"
+
+    arr = obj["c"]
+    assert list(arr) == [3]
+    with pytest.raises(TypeError):
+        arr.keys()
+    with pytest.raises(TypeError):
+        iter(pylite3.Lite3Object(b"\x02" + b"\x00" * 8))
+
+
+def test_values_and_items_materialize_scalars(obj):
+    items = dict(obj.items())
+    assert items["a"] == 1 and type(items["a"]) is int
+    assert items["b"] == "two" and items["d"] is None
+    assert isinstance(items["c"], pylite3.Lite3Object) and items["c"].is_array
+    assert sorted(v for v in obj.values() if isinstance(v, int)) == [1]
+    assert "two" in obj.values()
+    assert list(obj["c"].values()) == [3]